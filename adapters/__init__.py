@@ -2,19 +2,21 @@
 Adapter registry for AI Orchestra v02
 """
 
-from typing import Dict, Type, Optional
-from .base import BaseAdapter
+from typing import Dict, Type, Optional, Union
+from .base import BaseAdapter, AsyncBaseAdapter
+
+AdapterClass = Union[Type[BaseAdapter], Type[AsyncBaseAdapter]]
 
 # 어댑터 레지스트리
-_registry: Dict[str, Type[BaseAdapter]] = {}
+_registry: Dict[str, AdapterClass] = {}
 
 
-def register_adapter(name: str, adapter_class: Type[BaseAdapter]) -> None:
+def register_adapter(name: str, adapter_class: AdapterClass) -> None:
     """어댑터 등록"""
     _registry[name] = adapter_class
 
 
-def get_adapter(name: str) -> Optional[Type[BaseAdapter]]:
+def get_adapter(name: str) -> Optional[AdapterClass]:
     """어댑터 클래스 가져오기"""
     return _registry.get(name)
 
@@ -28,8 +30,9 @@ def _init_adapters():
     """기본 어댑터 초기화"""
     # Lazy import to avoid circular dependencies
     try:
-        from .tmux_adapter import TmuxAdapter
+        from .tmux_adapter import TmuxAdapter, AsyncTmuxAdapter
         register_adapter("tmux", TmuxAdapter)
+        register_adapter("tmux_async", AsyncTmuxAdapter)
     except ImportError:
         pass
     
@@ -46,6 +49,7 @@ _init_adapters()
 
 __all__ = [
     'BaseAdapter',
+    'AsyncBaseAdapter',
     'register_adapter',
     'get_adapter',
     'list_adapters'
@@ -2,6 +2,7 @@
 Base adapter interface for AI Orchestra v02
 """
 
+import asyncio
 from abc import ABC, abstractmethod
 from typing import Optional
 from dataclasses import dataclass
@@ -23,6 +24,9 @@ class AdapterConfig:
 class BaseAdapter(ABC):
     """어댑터 베이스 클래스"""
     
+    # 레지스트리에서 기본 설정으로 생성할 때 사용할 설정 클래스
+    config_class = AdapterConfig
+    
     def __init__(self, config: AdapterConfig):
         self.config = config
     
@@ -51,4 +55,41 @@ class BaseAdapter(ABC):
         return params
     
     def __repr__(self) -> str:
-        return f"{self.__class__.__name__}(name={self.config.name})"
\ No newline at end of file
+        return f"{self.__class__.__name__}(name={self.config.name})"
+
+
+class AsyncBaseAdapter(ABC):
+    """비동기 어댑터 베이스 클래스
+
+    하나의 이벤트 루프에서 수백 개 pane의 핸드셰이크를 동시에 감독하기 위한 인터페이스.
+    기존 동기 코드에서는 execute_with_handshake_sync로 호출.
+    """
+    
+    config_class = AdapterConfig
+    
+    def __init__(self, config: AdapterConfig):
+        self.config = config
+    
+    @abstractmethod
+    async def send(self, message: str) -> None:
+        """메시지 전송"""
+        pass
+    
+    @abstractmethod
+    async def receive(self, timeout: Optional[float] = None) -> str:
+        """메시지 수신"""
+        pass
+    
+    @abstractmethod
+    async def execute_with_handshake(self, exec_line: str, task_id: str) -> HandshakeResult:
+        """EXEC 명령 실행 with 3-way handshake"""
+        pass
+    
+    def execute_with_handshake_sync(self, exec_line: str, task_id: str) -> HandshakeResult:
+        """동기 호출용 래퍼 (하위 호환성)"""
+        return asyncio.run(self.execute_with_handshake(exec_line, task_id))
+    
+    parse_exec = BaseAdapter.parse_exec
+    
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.config.name})"
@@ -4,19 +4,94 @@ Gemini CLI 어댑터 - tmux를 통한 Gemini 제어
 
 import re
 import time
+import threading
 import subprocess
-import base64
-from typing import Optional
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar
 from dataclasses import dataclass
 
 from adapters.base import BaseAdapter, AdapterConfig
+from controllers.pane_reader import PaneReader
+from controllers.tmux_control import TmuxControlClient, TmuxControlError, get_control_client
 from core.types import HandshakeResult
+from core.kpi import kpi
+from core.protocol import Ack, Run, Eot, Token, scan
+
+
+# 프롬프트 전송용 tmux 버퍼 이름
+PROMPT_BUFFER = "orchestra-prompt"
+
+# 세션/pane 존재 확인 결과 재사용 시간 (초) - 같은 tmux 서버를 쓰는 어댑터끼리 공유
+EXISTS_TTL = 60.0
+_exists_cache: Dict[Tuple[str, str], float] = {}
+
+# 출력이 없을 때 폴링 간격 증가 배수
+POLL_BACKOFF = 1.5
+
+# pane 활동 시각 (pane_activity는 tmux 3.4+, 없으면 window_activity)
+ACTIVITY_FORMAT = "#{pane_activity} #{window_activity}"
+
+T = TypeVar("T")
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> "re.Pattern":
+    """대기 패턴 컴파일 (작업별 패턴을 폴링마다 다시 컴파일하지 않도록 캐시)"""
+    return re.compile(pattern, re.MULTILINE)
+
+
+def parse_activity(text) -> Optional[int]:
+    """ACTIVITY_FORMAT 출력에서 첫 번째 유효한 시각 (초)"""
+    if not isinstance(text, str):
+        return None
+    for part in text.split():
+        if part.isdigit():
+            return int(part)
+    return None
+
+
+def calc_result(eot: Eot):
+    """CALC EOT의 결과 값 (result= 또는 answer= 메타데이터)"""
+    return eot.meta.get("result", eot.meta.get("answer"))
+
+
+def is_calc_result(eot: Eot) -> bool:
+    """숫자 결과가 있는 CALC EOT인지 (프롬프트 에코의 자리표시자 제외)"""
+    return eot.status == "OK" and isinstance(calc_result(eot), (int, float))
+
+
+def batch_task_ids(count: int) -> List[str]:
+    """배치 작업 ID 생성 (batch-<ms>-<n>)"""
+    prefix = f"batch-{int(time.time() * 1000)}"
+    return [f"{prefix}-{i}" for i in range(count)]
+
+
+@dataclass
+class _BatchTask:
+    """배치 안 작업 하나의 진행 상태"""
+    task_id: str
+    verb: str
+    acked: Optional[float] = None  # ACK 확인 시각
+    ran: Optional[float] = None  # RUN 확인 시각
+    
+    @property
+    def phase(self) -> str:
+        """다음에 기다리는 단계"""
+        if self.acked is None:
+            return "ack"
+        return "run" if self.ran is None else "eot"
 
 
 @dataclass
 class GeminiConfig(AdapterConfig):
     """Gemini 어댑터 설정"""
     pane_id: str = "%1"  # tmux pane ID
+    use_control_mode: bool = False  # 공유 tmux 제어 모드 연결 사용
+    poll_min: float = 0.05  # 전송 직후/출력 발생 시 폴링 간격 (초)
+    poll_max: float = 0.5  # 응답 대기 중 백오프 상한 (초)
+    cli_command: str = "gemini"  # 새 세션/pane에서 실행할 CLI
+    ready_pattern: str = r"Type your message"  # CLI 입력 프롬프트 (준비 완료 표시)
+    ready_timeout: float = 30.0  # CLI 시작 대기 상한 (초)
 
 
 class GeminiAdapter(BaseAdapter):
@@ -26,6 +101,8 @@ class GeminiAdapter(BaseAdapter):
     프롬프트 엔지니어링으로 @@ACK/@@RUN/@@EOT 출력 강제
     """
     
+    config_class = GeminiConfig
+    
     # Gemini 프롬프트 템플릿
     CALC_PROMPT = """아래 세 줄을 정확히 복사해서 출력하세요. 단, result={placeholder} 부분만 계산 결과로 바꾸세요:
 
@@ -45,6 +122,18 @@ class GeminiAdapter(BaseAdapter):
 
 작업: {command}"""
     
+    # 여러 작업을 한 번에 보내는 프롬프트 (형식 예시는 실제 id가 아니라 에코돼도 토큰으로 매칭되지 않음)
+    BATCH_PROMPT = """아래 작업들을 순서대로 처리하세요. 작업마다 다음 3줄을 출력하고 <id>는 그 작업의 id로 바꾸세요:
+
+@@ACK id=<id>
+@@RUN id=<id>
+@@EOT id=<id> status=OK result=<결과>
+
+CALC 작업은 result=에 계산 결과 숫자를 넣고, 그 외 작업은 result= 없이 status=OK까지만 출력하세요.
+
+작업 목록:
+{tasks}"""
+    
     def __init__(self, config: GeminiConfig):
         super().__init__(config)
         self.pane_id = config.pane_id
@@ -55,113 +144,201 @@ class GeminiAdapter(BaseAdapter):
         self.logger = logging.getLogger(f"GeminiAdapter[{self.pane_id}]")
         self.logger.setLevel(logging.INFO)
         
+        # 제어 모드 연결 (실패 시 명령마다 tmux 프로세스 호출)
+        self._control: Optional[TmuxControlClient] = None
+        if getattr(config, 'use_control_mode', False):
+            try:
+                self._control = get_control_client()
+            except TmuxControlError as e:
+                self.logger.warning(f"tmux control mode unavailable: {e}")
+        
+        # 제어 모드면 %output 알림으로 대기 중인 폴링을 즉시 깨움
+        self._wake = threading.Event()
+        self._listening: Optional[str] = None
+        
         # 세션 확인 및 생성
         self.ensure_session()
         self.verify_pane_exists()
+        
+        # 토큰 대기가 공유하는 증분 리더 (ensure_session이 pane_id를 바꿀 수 있어 그 뒤에 생성)
+        self._reader = PaneReader(self.pane_id, lambda *args: self._tmux_query(*args),
+                                 lambda n: self.capture_output(n))
+        
+        if self._control is not None:
+            self._listen_output()
+    
+    def _listen_output(self) -> None:
+        """pane의 %output 알림 리스너 등록 (알림은 %id로 오므로 ID 조회)"""
+        try:
+            pane = self._control.command("display-message", "-p", "-t", self.pane_id, "#{pane_id}").strip()
+        except (TmuxControlError, TimeoutError) as e:
+            self.logger.debug(f"Output notifications unavailable: {e}")
+            return
+        if pane.startswith("%"):
+            self._control.add_output_listener(pane, self._on_output)
+            self._listening = pane
+    
+    def _on_output(self, data: str) -> None:
+        self._wake.set()
+    
+    def _tmux(self, *args: str, input: Optional[str] = None,
+              check: bool = True) -> subprocess.CompletedProcess:
+        """셸 없이 tmux 한 번 실행 (argv 직접 전달, 입력은 stdin)"""
+        return subprocess.run(
+            ["tmux", *args],
+            input=input,
+            capture_output=True,
+            text=True,
+            check=check
+        )
+    
+    def _tmux_query(self, *args: str) -> str:
+        """tmux 명령 stdout (제어 모드 우선, 실패 시 예외)"""
+        if self._control is not None:
+            return self._control.command(*args)
+        return self._tmux(*args).stdout
+    
+    def _exists(self, kind: str, target: str, probe: Callable[[], bool]) -> bool:
+        """세션/pane 존재 확인 결과를 EXISTS_TTL 동안 재사용 (없음은 캐시하지 않음)"""
+        key = (kind, target)
+        checked = _exists_cache.get(key)
+        if checked is not None and time.time() - checked < EXISTS_TTL:
+            return True
+        if not probe():
+            _exists_cache.pop(key, None)
+            return False
+        _exists_cache[key] = time.time()
+        return True
+    
+    def _forget(self) -> None:
+        """전송 실패 시 이 어댑터의 존재 확인 캐시 무효화"""
+        _exists_cache.pop(("session", self.session_name), None)
+        _exists_cache.pop(("pane", self.pane_id), None)
     
     def ensure_session(self):
         """tmux 세션이 없으면 자동 생성"""
         try:
             # 세션 존재 확인
-            result = subprocess.run(
-                f"tmux has-session -t {self.session_name} 2>/dev/null",
-                shell=True,
-                capture_output=True
-            )
+            if self._control is not None:
+                probe = lambda: self._control_ok([["has-session", "-t", self.session_name]])
+            else:
+                probe = lambda: self._tmux("has-session", "-t", self.session_name, check=False).returncode == 0
             
-            if result.returncode != 0:
+            if not self._exists("session", self.session_name, probe):
                 self.logger.info(f"Creating tmux session: {self.session_name}")
-                # 세션 생성
-                subprocess.run(
-                    f"tmux new-session -d -s {self.session_name}",
-                    shell=True,
-                    check=True
-                )
-                # Gemini CLI 시작
-                time.sleep(0.5)
-                subprocess.run(
-                    f"tmux send-keys -t {self.session_name}:0.0 'gemini' Enter",
-                    shell=True,
-                    check=True
+                # 세션 생성과 CLI 시작을 한 번에 (셸이 뜨기 전 입력은 tty에 쌓였다가 실행됨)
+                self._tmux(
+                    "new-session", "-d", "-s", self.session_name, ";",
+                    "send-keys", "-t", f"{self.session_name}:0.0", self.config.cli_command, "Enter"
                 )
-                time.sleep(1.0)  # CLI 초기화 대기
-                self.logger.info(f"Gemini CLI started in session {self.session_name}")
+                _exists_cache[("session", self.session_name)] = time.time()
                 
                 # pane_id 업데이트 (세션:윈도우.pane 형식으로)
                 if self.pane_id.startswith('%'):
                     self.pane_id = f"{self.session_name}:0.0"
+                
+                # 고정 대기 대신 CLI 프롬프트가 나타날 때까지 대기
+                if self.pane_id.startswith(f"{self.session_name}:"):
+                    if self.wait_until_ready():
+                        self.logger.info(f"Gemini CLI started in session {self.session_name}")
+                    else:
+                        self.logger.warning(f"Gemini CLI prompt not seen within {self.config.ready_timeout}s")
         except Exception as e:
             self.logger.warning(f"Could not ensure session: {e}")
     
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        pane에 CLI 입력 프롬프트(ready_pattern)가 나타날 때까지 대기
+        
+        Args:
+            timeout: 최대 대기 시간 (None이면 ready_timeout)
+        
+        Returns:
+            준비 완료 여부
+        """
+        timeout = self.config.ready_timeout if timeout is None else timeout
+        return self._poll(compile_pattern(self.config.ready_pattern).search, timeout) is not None
+    
     def health_check(self) -> bool:
         """세션 및 Gemini CLI 상태 확인"""
         try:
             # pane 출력 캡처
-            output = subprocess.check_output(
-                f"tmux capture-pane -t {self.pane_id} -p -S -3",
-                shell=True,
-                text=True,
-                stderr=subprocess.DEVNULL
-            )
+            if self._control is not None:
+                output = self._control.command("capture-pane", "-t", self.pane_id, "-p", "-S", "-3")
+            else:
+                output = self._tmux("capture-pane", "-t", self.pane_id, "-p", "-S", "-3").stdout
             # Gemini 프롬프트나 응답이 있는지 확인
             return bool(output and len(output.strip()) > 0)
         except Exception:
             return False
     
+    def _list_panes(self) -> str:
+        """전체 pane 목록 (pane ID와 세션:윈도우.pane 형식)"""
+        args = ("list-panes", "-a", "-F", "#{pane_id} #{session_name}:#{window_index}.#{pane_index}")
+        if self._control is not None:
+            return self._control.command(*args)
+        return self._tmux(*args, check=False).stdout
+    
     def verify_pane_exists(self):
         """tmux pane 존재 확인"""
         try:
-            # 세션:윈도우.pane 형식 또는 pane ID 형식 모두 지원
-            if ":" in self.pane_id or "." in self.pane_id:
-                # 세션 형식 확인 (예: gemini-cli:0.0)
-                result = subprocess.run(
-                    f"tmux list-panes -t {self.pane_id} 2>/dev/null",
-                    shell=True,
-                    capture_output=True
-                )
+            if self._control is not None:
+                # 제어 모드: 전체 pane 목록 한 번으로 두 형식 모두 확인
+                probe = lambda: self.pane_id in set(self._list_panes().split())
             else:
-                # pane ID 형식 확인 (예: %1)
-                result = subprocess.run(
-                    f"tmux list-panes -F '#{{pane_id}}' | grep -q {self.pane_id}",
-                    shell=True,
-                    capture_output=True
-                )
+                # 세션:윈도우.pane 형식(예: gemini-cli:0.0)과 pane ID 형식(예: %1) 모두 -t로 해석
+                probe = lambda: self._tmux(
+                    "list-panes", "-t", self.pane_id, "-F", "#{pane_id}", check=False
+                ).returncode == 0
             
-            if result.returncode != 0:
+            if not self._exists("pane", self.pane_id, probe):
                 # 디버깅을 위해 사용 가능한 pane 목록 출력
-                available = subprocess.run(
-                    "tmux list-panes -a -F '#{session_name}:#{window_index}.#{pane_index} (#{pane_id})'",
-                    shell=True,
-                    capture_output=True,
-                    text=True
-                )
-                self.logger.error(f"Available panes:\n{available.stdout}")
+                self.logger.error(f"Available panes:\n{self._list_panes()}")
                 raise RuntimeError(f"tmux pane {self.pane_id} not found")
         except Exception as e:
             raise RuntimeError(f"Failed to verify tmux pane: {e}")
     
+    def _control_ok(self, commands: list) -> bool:
+        """제어 모드 명령 실행 성공 여부"""
+        try:
+            self._control.commands(commands)
+            return True
+        except (TmuxControlError, TimeoutError):
+            return False
+    
     def send_to_pane(self, text: str, retry_count: int = 1) -> bool:
         """tmux pane에 텍스트 전송 (재시도 포함)"""
         for attempt in range(retry_count + 1):
             try:
                 # 세션 상태 확인
                 if attempt > 0:
+                    self._forget()
                     self.ensure_session()
                     time.sleep(0.5 * (2 ** attempt))  # 지수 백오프
                 
-                # base64 인코딩으로 안전하게 전송
-                b64 = base64.b64encode(text.encode()).decode()
-                
-                # tmux 버퍼에 로드
-                cmd = f"printf '%s' '{b64}' | base64 -d | tmux load-buffer -"
-                subprocess.run(cmd, shell=True, check=True)
-                
-                # 버퍼 내용을 pane에 붙여넣기
-                subprocess.run(f"tmux paste-buffer -t {self.pane_id}", shell=True, check=True)
-                
-                # Enter 키 전송
-                subprocess.run(f"tmux send-keys -t {self.pane_id} Enter", shell=True, check=True)
+                if self._control is not None:
+                    # 제어 모드: 버퍼 설정, 붙여넣기, Enter를 한 줄로 전송
+                    try:
+                        self._control.commands([
+                            ["set-buffer", "-b", PROMPT_BUFFER, text],
+                            ["paste-buffer", "-d", "-b", PROMPT_BUFFER, "-t", self.pane_id],
+                            ["send-keys", "-t", self.pane_id, "Enter"]
+                        ])
+                    except (TmuxControlError, TimeoutError) as e:
+                        if getattr(e, "written", True):
+                            # 이미 보낸 붙여넣기는 tmux가 실행했을 수 있으므로 다시 보내지 않음
+                            self.logger.error(f"Failed to send to tmux: {e}")
+                            return False
+                        raise subprocess.CalledProcessError(1, "tmux paste-buffer")
+                    return True
                 
+                # 프롬프트는 stdin으로 버퍼에 로드, 붙여넣기와 Enter까지 tmux 한 번 실행으로 처리
+                self._tmux(
+                    "load-buffer", "-b", PROMPT_BUFFER, "-", ";",
+                    "paste-buffer", "-d", "-b", PROMPT_BUFFER, "-t", self.pane_id, ";",
+                    "send-keys", "-t", self.pane_id, "Enter",
+                    input=text
+                )
                 return True
             except subprocess.CalledProcessError as e:
                 if attempt == retry_count:
@@ -172,32 +349,142 @@ class GeminiAdapter(BaseAdapter):
     
     def capture_output(self, lines: int = 200) -> str:
         """tmux pane 출력 캡처"""
+        if self._control is not None:
+            try:
+                return self._control.command("capture-pane", "-t", self.pane_id, "-p", "-S", f"-{lines}")
+            except (TmuxControlError, TimeoutError) as e:
+                self.logger.error(f"Failed to capture output: {e}")
+                return ""
         try:
-            result = subprocess.run(
-                f"tmux capture-pane -t {self.pane_id} -p -S -{lines}",
-                shell=True,
-                capture_output=True,
-                text=True,
-                check=True
-            )
-            return result.stdout
+            return self._tmux("capture-pane", "-t", self.pane_id, "-p", "-S", f"-{lines}").stdout
         except subprocess.CalledProcessError as e:
             self.logger.error(f"Failed to capture output: {e}")
             return ""
     
-    def wait_for_pattern(self, pattern: str, timeout: float) -> Optional[re.Match]:
-        """패턴이 나타날 때까지 대기"""
-        regex = re.compile(pattern, re.MULTILINE)
+    def _activity(self) -> Optional[int]:
+        """pane 마지막 활동 시각 (조회 불가 시 None)"""
+        try:
+            if self._control is not None:
+                output = self._control.command("display-message", "-p", "-t", self.pane_id, ACTIVITY_FORMAT)
+            else:
+                output = self._tmux("display-message", "-p", "-t", self.pane_id, ACTIVITY_FORMAT).stdout
+        except Exception:
+            return None
+        return parse_activity(output)
+    
+    def _read_new_lines(self) -> List[str]:
+        """PaneReader로 마지막 읽기 이후 새로 완성된 줄 (조회 실패 시 빈 목록)"""
+        try:
+            return self._reader.read_new()
+        except Exception as e:
+            self.logger.error(f"Failed to read pane output: {e}")
+            return []
+    
+    def _poll(self, find: Callable[[Any], Optional[T]], timeout: float,
+              read: Optional[Callable[[], Any]] = None) -> Optional[T]:
+        """
+        read 결과에서 find가 값을 돌려줄 때까지 적응형 폴링
+        
+        전송 직후에는 poll_min 간격으로 촘촘하게 확인하고, 변화가 없으면
+        poll_max까지 지수적으로 간격을 늘림. 활동 시각이 그대로면 읽기를
+        건너뛰고, 바뀌거나 %output 알림이 오면 즉시 읽은 후 간격을 초기화.
+        
+        Args:
+            find: read 결과 → 찾은 값 (없으면 None)
+            timeout: 최대 대기 시간 (초)
+            read: 출력 읽기 (기본: 화면 마지막 200줄 캡처)
+        
+        Returns:
+            find의 결과, 타임아웃 시 None
+        """
+        read = read or (lambda: self.capture_output(200))
         deadline = time.time() + timeout
+        interval = self.config.poll_min
+        seen: Optional[int] = None
+        captured_at = 0.0
+        
+        while True:
+            activity = self._activity()
+            # 활동 시각은 초 단위라 마지막 캡처와 같은 초의 출력은 구분할 수 없으므로 다시 확인
+            if activity is None or activity != seen or activity >= int(captured_at):
+                captured_at = time.time()
+                found = find(read())
+                if found is not None:
+                    return found
+                if seen is not None and activity != seen:
+                    interval = self.config.poll_min  # 출력이 이어지는 중
+                seen = activity
+            
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            self._wake.clear()
+            if self._wake.wait(min(interval, remaining)):
+                interval = self.config.poll_min
+                seen = None  # 알림을 받았으니 활동 시각과 관계없이 캡처
+            else:
+                interval = min(interval * POLL_BACKOFF, self.config.poll_max)
+    
+    def wait_for_pattern(self, pattern: str, timeout: float) -> Optional[re.Match]:
+        """패턴이 화면에 나타날 때까지 대기"""
+        return self._poll(compile_pattern(pattern).search, timeout)
+    
+    def wait_for_token(self, token_class: type, task_id: str, timeout: float,
+                       accept: Optional[Callable[[Token], bool]] = None) -> Optional[Token]:
+        """
+        특정 task_id의 ACK/RUN/EOT 토큰이 나타날 때까지 대기
         
-        while time.time() < deadline:
-            output = self.capture_output()
-            match = regex.search(output)
-            if match:
-                return match
-            time.sleep(0.5)
+        마지막 전송 이후 새로 완성된 줄만 PaneReader로 읽고, 토큰 뒤의 줄은
+        다음 대기(RUN, EOT)가 쓰도록 되돌림.
         
-        return None
+        Args:
+            token_class: Ack, Run, Eot 중 하나
+            task_id: 기다리는 작업 ID
+            timeout: 최대 대기 시간 (초)
+            accept: 추가 조건 (False면 무시하고 계속 대기)
+        
+        Returns:
+            찾은 토큰 (EOT는 같은 스캔에서 .meta로 결과 제공), 타임아웃 시 None
+        """
+        def find(lines: List[str]) -> Optional[Token]:
+            for i, line in enumerate(lines):
+                for token in scan(line):
+                    if (isinstance(token, token_class) and token.id == task_id
+                            and (accept is None or accept(token))):
+                        self._reader.unread(lines[i + 1:])
+                        return token
+            return None
+        
+        return self._poll(find, timeout, self._read_new_lines)
+    
+    def _record_phase(self, phase: str, started: Optional[float], task_id: str,
+                      verb: str, total_since: Optional[float] = None) -> float:
+        """
+        단계별 소요 시간 KPI 기록
+        
+        Args:
+            phase: ack/run/eot
+            started: 직전 단계 시각 (None이면 타임아웃으로 기록)
+            total_since: 전송 시각 (주면 전체 소요 시간도 기록)
+        
+        Returns:
+            현재 시각 (다음 단계의 시작 시각)
+        """
+        now = time.time()
+        if started is None:
+            kpi.record(kind='handshake', phase=phase, success=False,
+                       verb=verb, ai_agent='gemini', task_id=task_id)
+            kpi.record(kind='error', error_type=f'{phase}_timeout', success=False,
+                       verb=verb, ai_agent='gemini', task_id=task_id)
+            return now
+        kpi.record(kind='handshake', phase=phase, success=True,
+                   duration_ms=int((now - started) * 1000),
+                   verb=verb, ai_agent='gemini', task_id=task_id)
+        if total_since is not None:
+            kpi.record(kind='handshake', phase='total', success=True,
+                       duration_ms=int((now - total_since) * 1000),
+                       verb=verb, ai_agent='gemini', task_id=task_id)
+        return now
     
     def execute_with_handshake(self, exec_line: str, task_id: str) -> HandshakeResult:
         """EXEC 명령 실행 with 3-step handshake"""
@@ -232,7 +519,8 @@ class GeminiAdapter(BaseAdapter):
         
         self.logger.info(f"Executing {verb} for task {task_id}")
         
-        # 1. 프롬프트 전송
+        # 1. 프롬프트 전송 (전송 이후 출력만 토큰 대기 대상 - 이전 작업이 남긴 토큰 제외)
+        self._reader.mark()
         if not self.send_to_pane(prompt):
             return HandshakeResult(
                 success=False,
@@ -241,66 +529,46 @@ class GeminiAdapter(BaseAdapter):
                 task_id=task_id
             )
         
+        t_send = time.time()
+        
         # 2. ACK 대기
         self.logger.debug(f"Waiting for ACK (timeout={self.config.timeout_ack}s)")
-        ack_pattern = f"@@ACK\\s+id={re.escape(task_id)}"
-        if not self.wait_for_pattern(ack_pattern, self.config.timeout_ack):
+        if not self.wait_for_token(Ack, task_id, self.config.timeout_ack):
+            self._record_phase("ack", None, task_id, verb)
             return HandshakeResult(
                 success=False,
                 status="ACK_TIMEOUT",
                 error=f"No ACK received within {self.config.timeout_ack}s",
                 task_id=task_id
             )
+        t_ack = self._record_phase("ack", t_send, task_id, verb)
         self.logger.debug("ACK received")
         
         # 3. RUN 대기
         self.logger.debug(f"Waiting for RUN (timeout={self.config.timeout_run}s)")
-        run_pattern = f"@@RUN\\s+id={re.escape(task_id)}"
-        if not self.wait_for_pattern(run_pattern, self.config.timeout_run):
+        if not self.wait_for_token(Run, task_id, self.config.timeout_run):
+            self._record_phase("run", None, task_id, verb)
             return HandshakeResult(
                 success=False,
                 status="RUN_TIMEOUT",
                 error=f"No RUN received within {self.config.timeout_run}s",
                 task_id=task_id
             )
+        t_run = self._record_phase("run", t_ack, task_id, verb)
         self.logger.debug("RUN received")
         
-        # 4. EOT 대기 및 결과 추출
+        # 4. EOT 대기 - 결과는 EOT 메타데이터에서 바로 추출
         self.logger.debug(f"Waiting for EOT (timeout={self.config.timeout_eot}s)")
+        # 프롬프트 에코의 result={result} 자리표시자는 무시하고 CALC는 숫자 결과만 인정
+        accept = is_calc_result if verb == "CALC" else None
+        eot = self.wait_for_token(Eot, task_id, self.config.timeout_eot, accept)
         
-        if verb == "CALC":
-            # CALC의 경우 result 값 추출 - 더 유연한 패턴
-            # @ 1~2개, 공백 허용, answer/result 키 허용
-            eot_pattern = (
-                f"\\s*@{{1,2}}EOT\\s+id={re.escape(task_id)}\\s+"
-                f"status\\s*=\\s*OK\\s+"
-                f"(?:answer|result)\\s*=\\s*([\\d\\.\\-]+)\\s*"
-            )
-            match = self.wait_for_pattern(eot_pattern, self.config.timeout_eot)
-            
-            if match:
-                result_value = match.group(1)
-                self.logger.info(f"Task {task_id} completed with result: {result_value}")
-                return HandshakeResult(
-                    success=True,
-                    status=f"OK:RESULT={result_value}",
-                    task_id=task_id
-                )
-        else:
-            # 일반 명령 - 더 유연한 패턴
-            eot_pattern = f"\\s*@{{1,2}}EOT\\s+id={re.escape(task_id)}\\s+status\\s*=\\s*(\\w+)"
-            match = self.wait_for_pattern(eot_pattern, self.config.timeout_eot)
-            
-            if match:
-                status = match.group(1)
-                self.logger.info(f"Task {task_id} completed with status: {status}")
-                return HandshakeResult(
-                    success=True,
-                    status=status,
-                    task_id=task_id
-                )
+        if eot:
+            self._record_phase("eot", t_run, task_id, verb, total_since=t_send)
+            return self._eot_result(eot, verb)
         
         # EOT 타임아웃
+        self._record_phase("eot", None, task_id, verb)
         return HandshakeResult(
             success=False,
             status="EOT_TIMEOUT",
@@ -308,6 +576,138 @@ class GeminiAdapter(BaseAdapter):
             task_id=task_id
         )
     
+    def _eot_result(self, eot: Eot, verb: str) -> HandshakeResult:
+        """EOT 토큰 → HandshakeResult (CALC는 메타데이터의 결과 포함)"""
+        if verb == "CALC" and is_calc_result(eot):
+            result_value = calc_result(eot)
+            self.logger.info(f"Task {eot.id} completed with result: {result_value}")
+            return HandshakeResult(
+                success=True,
+                status=f"OK:RESULT={result_value}",
+                task_id=eot.id
+            )
+        self.logger.info(f"Task {eot.id} completed with status: {eot.status}")
+        return HandshakeResult(
+            success=True,
+            status=eot.status,
+            task_id=eot.id
+        )
+    
+    def iter_batch(self, exec_lines: Sequence[str],
+                   task_ids: Optional[Sequence[str]] = None) -> Iterator[HandshakeResult]:
+        """
+        여러 EXEC 명령을 한 프롬프트로 보내고 EOT가 도착하는 순서대로 결과 반환
+        
+        하나의 출력에 섞여 나오는 ACK/RUN/EOT를 task_id별로 나눠 추적.
+        타임아웃은 아직 끝나지 않은 첫 작업의 다음 단계 기준이며, 어떤
+        작업이든 토큰이 도착하면 다시 시작됨.
+        
+        Args:
+            exec_lines: EXEC 명령 목록
+            task_ids: 작업 ID 목록 (없으면 batch-<ms>-<n> 생성, 서로 달라야 함)
+        
+        Yields:
+            작업별 HandshakeResult (완료 순서, 파싱 실패는 먼저 반환)
+        """
+        from core.exec_parser import parse_exec
+        
+        if task_ids is None:
+            task_ids = batch_task_ids(len(exec_lines))
+        if len(task_ids) != len(exec_lines) or len(set(task_ids)) != len(task_ids):
+            raise ValueError("task_ids must be unique and match exec_lines")
+        
+        pending: Dict[str, _BatchTask] = {}
+        items = []
+        for exec_line, task_id in zip(exec_lines, task_ids):
+            try:
+                parsed = parse_exec(exec_line)
+            except ValueError:
+                parsed = None
+            if not parsed:
+                yield HandshakeResult(
+                    success=False,
+                    status="INVALID_EXEC",
+                    error=f"Failed to parse: {exec_line}",
+                    task_id=task_id
+                )
+                continue
+            pending[task_id] = _BatchTask(task_id, parsed.verb)
+            if parsed.verb == "CALC":
+                items.append(f"- id={task_id}: CALC {parsed.params.get('expr', '').strip(chr(34))}")
+            else:
+                items.append(f"- id={task_id}: {exec_line}")
+        if not pending:
+            return
+        
+        self.logger.info(f"Executing batch of {len(pending)} tasks")
+        self._reader.mark()
+        if not self.send_to_pane(self.BATCH_PROMPT.format(tasks="\n".join(items))):
+            for task_id in pending:
+                yield HandshakeResult(
+                    success=False,
+                    status="SEND_FAILED",
+                    error="Failed to send prompt to Gemini",
+                    task_id=task_id
+                )
+            return
+        t_send = time.time()
+        
+        def demux(lines: List[str]) -> Optional[List[HandshakeResult]]:
+            """새 줄의 토큰을 작업별로 반영 (진행이 없으면 None)"""
+            progressed = False
+            done = []
+            for token in scan("\n".join(lines)):
+                task = pending.get(token.id)
+                if task is None:
+                    continue
+                if isinstance(token, Ack) and task.acked is None:
+                    task.acked = self._record_phase("ack", t_send, task.task_id, task.verb)
+                    progressed = True
+                elif isinstance(token, Run) and task.ran is None:
+                    if task.acked is None:
+                        # ACK를 놓친 경우 (출력이 폴백 스냅샷 범위를 넘음 등)
+                        task.acked = t_send
+                    task.ran = self._record_phase("run", task.acked, task.task_id, task.verb)
+                    progressed = True
+                elif isinstance(token, Eot):
+                    started = task.ran or task.acked or t_send
+                    self._record_phase("eot", started, task.task_id, task.verb, total_since=t_send)
+                    done.append(self._eot_result(token, task.verb))
+                    del pending[token.id]
+                    progressed = True
+            return done if progressed else None
+        
+        while pending:
+            first = next(iter(pending.values()))
+            timeout = getattr(self.config, f"timeout_{first.phase}")
+            done = self._poll(demux, timeout, self._read_new_lines)
+            if done is None:
+                break
+            yield from done
+        
+        for task in pending.values():
+            phase = task.phase
+            self._record_phase(phase, None, task.task_id, task.verb)
+            yield HandshakeResult(
+                success=False,
+                status=f"{phase.upper()}_TIMEOUT",
+                error=f"No {phase.upper()} received in batch",
+                task_id=task.task_id
+            )
+    
+    def execute_batch(self, exec_lines: Sequence[str],
+                      task_ids: Optional[Sequence[str]] = None) -> List[HandshakeResult]:
+        """
+        여러 EXEC 명령을 한 프롬프트로 실행
+        
+        Returns:
+            exec_lines 순서의 HandshakeResult 목록
+        """
+        if task_ids is None:
+            task_ids = batch_task_ids(len(exec_lines))
+        results = {r.task_id: r for r in self.iter_batch(exec_lines, task_ids)}
+        return [results[task_id] for task_id in task_ids]
+    
     def send(self, message: str) -> None:
         """메시지 전송 (BaseAdapter 인터페이스)"""
         if not self.send_to_pane(message):
@@ -320,4 +720,7 @@ class GeminiAdapter(BaseAdapter):
     def cleanup(self):
         """리소스 정리"""
         self.logger.info(f"Gemini adapter cleanup for pane {self.pane_id}")
+        if self._listening is not None:
+            self._control.remove_output_listener(self._listening, self._on_output)
+            self._listening = None
         # tmux pane은 유지 (Gemini CLI 세션 보존)
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+Gemini pane 풀 - 미리 띄워 둔 CLI pane을 동시 핸드셰이크에 대여
+"""
+
+import logging
+import subprocess
+import threading
+from contextlib import contextmanager
+from dataclasses import replace
+from queue import Empty, Queue
+from typing import Dict, Iterator, List, Optional
+
+from adapters.gemini_adapter import GeminiAdapter, GeminiConfig
+from core.types import HandshakeResult
+
+logger = logging.getLogger(__name__)
+
+
+class PaneUnavailable(RuntimeError):
+    """대여 가능한 pane이 없음"""
+
+
+class GeminiPanePool:
+    """K개의 Gemini CLI pane을 미리 띄워 두고 작업마다 하나씩 대여
+
+    각 pane은 전용 세션의 창 하나이며 pane마다 GeminiAdapter가 붙음.
+    준비 여부는 고정 대기 대신 CLI 프롬프트(ready_pattern) 출현으로 판단.
+    반납 시 health_check에 실패한 pane은 종료하고 새 pane으로 교체.
+    close() 때 대여 중이던 pane은 반납 시점에 종료.
+    """
+
+    def __init__(self, config: GeminiConfig, size: int = 2, session: str = "gemini-pool"):
+        """
+        Args:
+            config: pane별 어댑터에 복사해 쓸 설정 (pane_id는 무시)
+            size: 유지할 pane 수
+            session: pane을 만들 tmux 세션 이름
+        """
+        self.config = config
+        self.size = size
+        self.session = session
+        self._idle: "Queue[GeminiAdapter]" = Queue()
+        self._all: Dict[str, GeminiAdapter] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self._recycling: List[threading.Thread] = []  # 교체 pane을 띄우는 스레드 (close에서 join)
+
+    def _tmux(self, *args: str) -> str:
+        return subprocess.run(
+            ["tmux", *args], capture_output=True, text=True, check=True
+        ).stdout
+
+    def _spawn(self) -> GeminiAdapter:
+        """새 창에서 CLI를 시작하고 프롬프트가 보일 때까지 대기"""
+        with self._lock:
+            exists = subprocess.run(
+                ["tmux", "has-session", "-t", self.session], capture_output=True
+            ).returncode == 0
+            if exists:
+                target = ("new-window", "-d", "-t", f"{self.session}:")
+            else:
+                target = ("new-session", "-d", "-s", self.session)
+            # CLI를 창의 명령으로 바로 실행 (셸 시작 대기 없음, CLI가 죽으면 pane도 닫힘)
+            pane_id = self._tmux(*target, "-P", "-F", "#{pane_id}", self.config.cli_command).strip()
+
+        config = replace(self.config, pane_id=pane_id)
+        config.tmux_session = self.session
+        adapter = GeminiAdapter(config)
+        if not adapter.wait_until_ready():
+            self._kill(adapter)
+            raise PaneUnavailable(f"{self.config.cli_command} not ready in {pane_id}")
+        return adapter
+
+    def _kill(self, adapter: GeminiAdapter) -> None:
+        adapter.cleanup()
+        try:
+            self._tmux("kill-pane", "-t", adapter.pane_id)
+        except subprocess.CalledProcessError as e:
+            logger.debug(f"kill-pane {adapter.pane_id} failed: {e}")
+
+    def _add(self) -> bool:
+        """pane 하나를 띄워 유휴 목록에 추가 (실패 시 False)"""
+        try:
+            adapter = self._spawn()
+        except Exception as e:
+            logger.warning(f"Failed to warm pane: {e}")
+            return False
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._all[adapter.pane_id] = adapter
+                self._idle.put(adapter)
+        if closed:
+            self._kill(adapter)
+            return False
+        return True
+
+    def start(self) -> int:
+        """
+        pane을 size개까지 병렬로 띄움
+
+        Returns:
+            준비된 pane 수
+        """
+        with self._lock:
+            missing = self.size - len(self._all)
+        threads = [threading.Thread(target=self._add, daemon=True) for _ in range(missing)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        ready = len(self._all)
+        logger.info(f"Pane pool {self.session}: {ready}/{self.size} ready")
+        return ready
+
+    def _recycle(self, adapter: GeminiAdapter) -> None:
+        """비정상 pane을 제거하고 백그라운드에서 교체 pane 준비"""
+        logger.warning(f"Recycling unhealthy pane {adapter.pane_id}")
+        with self._lock:
+            self._all.pop(adapter.pane_id, None)
+        self._kill(adapter)
+        with self._lock:
+            if self._closed:
+                return
+            thread = threading.Thread(target=self._add, daemon=True)
+            self._recycling = [t for t in self._recycling if t.is_alive()] + [thread]
+            thread.start()
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None) -> Iterator[GeminiAdapter]:
+        """
+        유휴 pane의 어댑터를 빌려 쓰고 반납
+
+        Args:
+            timeout: 유휴 pane 대기 시간 (None이면 무한 대기)
+
+        Raises:
+            PaneUnavailable: timeout 안에 빌릴 pane이 없음
+        """
+        try:
+            adapter = self._idle.get(timeout=timeout)
+        except Empty:
+            raise PaneUnavailable(f"No idle pane in {self.session} within {timeout}s")
+        try:
+            yield adapter
+        finally:
+            healthy = adapter.health_check()
+            with self._lock:
+                closed = self._closed
+                if closed:
+                    self._all.pop(adapter.pane_id, None)
+                elif healthy:
+                    self._idle.put(adapter)
+            if closed:
+                # 대여 중에 풀이 닫혔으면 유휴 목록에 되돌리지 않고 종료
+                self._kill(adapter)
+            elif not healthy:
+                self._recycle(adapter)
+
+    def execute_with_handshake(self, exec_line: str, task_id: str,
+                               lease_timeout: Optional[float] = None) -> HandshakeResult:
+        """빌린 pane에서 핸드셰이크 실행 (GeminiAdapter와 같은 인터페이스)"""
+        try:
+            with self.lease(lease_timeout) as adapter:
+                return adapter.execute_with_handshake(exec_line, task_id)
+        except PaneUnavailable as e:
+            return HandshakeResult(success=False, status="NO_PANE", error=str(e), task_id=task_id)
+
+    @property
+    def panes(self) -> List[str]:
+        """풀에 속한 pane ID 목록"""
+        with self._lock:
+            return list(self._all)
+
+    def close(self) -> None:
+        """유휴 pane과 교체 중인 pane 종료 (대여 중인 pane은 반납 시 종료)"""
+        with self._lock:
+            self._closed = True
+            recycling, self._recycling = self._recycling, []
+            idle = []
+            while not self._idle.empty():
+                idle.append(self._idle.get_nowait())
+            for adapter in idle:
+                self._all.pop(adapter.pane_id, None)
+        # 띄우던 pane은 _add가 닫힌 풀을 보고 종료
+        for thread in recycling:
+            thread.join()
+        for adapter in idle:
+            self._kill(adapter)
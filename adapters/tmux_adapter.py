@@ -3,8 +3,9 @@ Tmux adapter for testing and simulation
 """
 
 from typing import Optional
-from .base import BaseAdapter, AdapterConfig
+from .base import BaseAdapter, AsyncBaseAdapter, AdapterConfig
 from controllers.tmux_controller import TmuxController
+from controllers.async_tmux_controller import AsyncTmuxController
 from core.types import HandshakeResult
 
 
@@ -15,6 +16,7 @@ class TmuxAdapter(BaseAdapter):
         super().__init__(config)
         self.pane_id = pane_id
         self.controller = TmuxController(pane_id)
+        self.controller.ai_agent = config.name
     
     def send(self, message: str) -> None:
         """tmux pane에 메시지 전송"""
@@ -36,4 +38,32 @@ class TmuxAdapter(BaseAdapter):
             timeout_ack=self.config.timeout_ack,
             timeout_run=self.config.timeout_run,
             timeout_eot=self.config.timeout_eot
-        )
\ No newline at end of file
+        )
+
+
+class AsyncTmuxAdapter(AsyncBaseAdapter):
+    """Tmux pane 기반 비동기 어댑터"""
+    
+    def __init__(self, config: AdapterConfig, pane_id: str):
+        super().__init__(config)
+        self.pane_id = pane_id
+        self.controller = AsyncTmuxController(pane_id)
+        self.controller.ai_agent = config.name
+    
+    async def send(self, message: str) -> None:
+        """tmux pane에 메시지 전송"""
+        await self.controller.send_keys(message)
+    
+    async def receive(self, timeout: Optional[float] = None) -> str:
+        """tmux pane에서 출력 캡처"""
+        return await self.controller.capture_tail(200)
+    
+    async def execute_with_handshake(self, exec_line: str, task_id: str) -> HandshakeResult:
+        """EXEC 실행 with handshake"""
+        return await self.controller.execute_with_handshake(
+            command=exec_line,
+            task_id=task_id,
+            timeout_ack=self.config.timeout_ack,
+            timeout_run=self.config.timeout_run,
+            timeout_eot=self.config.timeout_eot
+        )
@@ -1,5 +1,6 @@
 """Controller modules for AI Orchestra v02"""
 
 from .tmux_controller import TmuxController
+from .scheduler import HandshakeScheduler
 
-__all__ = ['TmuxController']
\ No newline at end of file
+__all__ = ['TmuxController', 'HandshakeScheduler']
\ No newline at end of file
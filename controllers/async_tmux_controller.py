@@ -0,0 +1,189 @@
+"""
+asyncio 기반 tmux 컨트롤러 - 하나의 이벤트 루프에서 다수 pane 동시 감독
+"""
+
+import asyncio
+import functools
+import logging
+import time
+from typing import Any, Callable, List, Optional
+
+from core.handshake import HandshakeTracker
+from core.types import HandshakeResult
+from controllers.pane_stream import PaneStream
+from controllers.pane_reader import AsyncPaneReader
+from controllers.tmux_controller import (
+    needs_safe_send, safe_send_command, infer_verb, record_phase_kpi, record_timeout_kpi
+)
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTmuxController:
+    """TmuxController의 비동기 버전
+
+    tmux 호출은 asyncio.create_subprocess_exec, 대기는 asyncio.sleep 또는
+    pipe-pane FIFO의 add_reader로 처리하므로 작업당 OS 스레드가 필요 없음.
+    동기 API만 있는 pipe-pane 연결/해제와 KPI 기록은 executor에서 실행.
+    """
+    
+    def __init__(self, pane_id: str, poll_interval: float = 0.2, use_pipe: bool = False):
+        """
+        Args:
+            pane_id: tmux pane 식별자 (예: '%3', 'session:window.pane')
+            poll_interval: 토큰 확인 간격 (초)
+            use_pipe: pipe-pane 스트리밍 사용 여부 (실패 시 capture-pane 폴링)
+        """
+        self.pane_id = pane_id
+        self.poll_interval = poll_interval
+        self.ai_agent: Optional[str] = None  # KPI 집계용 에이전트 이름
+        self._stream: Optional[PaneStream] = PaneStream(pane_id) if use_pipe else None
+        # 폴링 모드의 모든 대기가 공유하는 증분 리더
+        self._reader = AsyncPaneReader(pane_id, lambda *args: self._tmux(*args), lambda n: self.capture_tail(n))
+    
+    async def _tmux(self, *args: str) -> str:
+        """tmux 명령 실행 후 stdout 반환"""
+        proc = await asyncio.create_subprocess_exec(
+            "tmux", *args,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await proc.communicate()
+        if proc.returncode != 0:
+            raise RuntimeError(
+                f"tmux {args[0]} failed for pane {self.pane_id}: {stderr.decode(errors='replace').strip()}"
+            )
+        return stdout.decode(errors="replace")
+    
+    async def send_keys(self, text: str, enter: bool = True, safe_mode: bool = True) -> None:
+        """
+        tmux pane에 텍스트 전송
+        
+        Args:
+            text: 전송할 텍스트
+            enter: Enter 키 추가 여부
+            safe_mode: 특수문자 안전 처리 여부
+        """
+        if safe_mode and needs_safe_send(text):
+            text, enter = safe_send_command(text), True
+        await self._tmux("send-keys", "-t", self.pane_id, text)
+        if enter:
+            await self._tmux("send-keys", "-t", self.pane_id, "Enter")
+    
+    async def capture_output(self, last_lines: Optional[int] = None) -> str:
+        """tmux pane의 현재 출력 캡처"""
+        args = ["capture-pane", "-t", self.pane_id, "-p"]
+        if last_lines:
+            args.extend(["-S", f"-{last_lines}"])
+        return await self._tmux(*args)
+    
+    async def capture_tail(self, lines: int = 200) -> str:
+        """tmux pane의 마지막 N줄만 캡처"""
+        return await self.capture_output(last_lines=lines)
+    
+    async def _blocking(self, func: Callable[..., Any], *args: Any) -> Any:
+        """블로킹 호출을 executor에서 실행 (이벤트 루프를 막지 않음)"""
+        return await asyncio.get_running_loop().run_in_executor(None, functools.partial(func, *args))
+    
+    async def attach_stream(self) -> bool:
+        """pipe-pane 스트림 연결 (실패 시 폴링으로 폴백)"""
+        if self._stream is None:
+            return False
+        if not self._stream.attached:
+            try:
+                await self._blocking(self._stream.attach)
+            except (RuntimeError, OSError) as e:
+                logger.warning(f"pipe-pane unavailable, falling back to polling: {e}")
+                self._stream = None
+                return False
+        return True
+    
+    async def close(self) -> None:
+        """pipe-pane 스트림 해제"""
+        if self._stream is not None:
+            await self._blocking(self._stream.detach)
+    
+    async def _read_stream(self, timeout: float) -> List[str]:
+        """FIFO가 읽기 가능해질 때까지 이벤트 루프에서 대기"""
+        lines = self._stream.read_lines(timeout=0)
+        if lines or timeout <= 0:
+            return lines
+        
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fd = self._stream.fileno()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, timeout)
+        except asyncio.TimeoutError:
+            return []
+        finally:
+            loop.remove_reader(fd)
+        return self._stream.read_lines(timeout=0)
+    
+    async def _poll_lines(self, timeout: float) -> List[str]:
+        """새 출력 줄 가져오기 (스트림이면 새 줄만, 아니면 AsyncPaneReader로 마지막 읽기 이후 완성된 줄만)"""
+        if self._stream is not None and self._stream.attached:
+            return await self._read_stream(timeout)
+        return await self._reader.read_new()
+    
+    async def execute_with_handshake(
+        self,
+        command: str,
+        task_id: str,
+        timeout_ack: float = 5,
+        timeout_run: float = 10,
+        timeout_eot: float = 30
+    ) -> HandshakeResult:
+        """
+        3단계 핸드셰이크로 명령 실행 (KPI 추적 포함)
+        
+        Returns:
+            HandshakeResult 객체
+        """
+        start_time = time.time()
+        # 스트리밍 모드면 전송 전에 pipe-pane 연결, 폴링 모드면 현재 위치를 기준선으로
+        # (이전 실행이 남긴 같은 task_id의 토큰을 다시 매칭하지 않도록)
+        streaming = await self.attach_stream()
+        if not streaming:
+            await self._reader.mark()
+        
+        await self.send_keys(command)
+        
+        tracker = HandshakeTracker(task_id, timeout_ack, timeout_run, timeout_eot)
+        tracker.start(start_time)
+        verb = infer_verb(command)
+        
+        while not tracker.done and not tracker.expired():
+            lines = await self._poll_lines(tracker.remaining())
+            for phase in tracker.feed_lines(lines):
+                await self._blocking(record_phase_kpi, tracker, phase, verb, self.ai_agent)
+            if not tracker.done and not streaming:
+                await asyncio.sleep(self.poll_interval)
+        
+        duration = time.time() - start_time
+        
+        if not tracker.done:
+            phase = tracker.phase
+            await self._blocking(record_timeout_kpi, tracker, verb, self.ai_agent)
+            snapshot = (await self.capture_tail(50))[-1024:]
+            return HandshakeResult(
+                success=False,
+                status="TIMEOUT" if phase == "EOT" else "FAILED",
+                task_id=task_id,
+                error=f"NO_{phase}|snapshot={snapshot}",
+                duration=duration,
+                phases=dict(tracker.timestamps)
+            )
+        
+        return HandshakeResult(
+            success=True,
+            status=tracker.status,
+            task_id=task_id,
+            duration=duration,
+            phases=dict(tracker.timestamps)
+        )
+    
+    def execute_with_handshake_sync(self, *args, **kwargs) -> HandshakeResult:
+        """동기 호출용 래퍼 (하위 호환성)"""
+        return asyncio.run(self.execute_with_handshake(*args, **kwargs))
@@ -0,0 +1,233 @@
+"""
+오프셋 추적 pane 리더 - 폴링마다 이미 읽은 스크롤백을 다시 훑지 않음
+"""
+
+import logging
+from collections import deque
+from typing import Any, Callable, Deque, Generator, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# display-message로 조회하는 위치 정보
+POSITION_FORMAT = "#{history_size} #{history_limit} #{cursor_y}"
+
+
+def parse_position(text) -> Optional[Tuple[int, int, int]]:
+    """
+    POSITION_FORMAT 출력 파싱
+
+    Returns:
+        (history_size, history_limit, cursor_y) 또는 해석 불가 시 None
+    """
+    if not isinstance(text, str):
+        return None
+    parts = text.split()
+    if len(parts) != 3 or not all(p.isdigit() for p in parts):
+        return None
+    return int(parts[0]), int(parts[1]), int(parts[2])
+
+
+class SnapshotDiff:
+    """연속된 capture-pane 스냅샷에서 새 줄만 추출
+
+    직전까지 본 줄의 꼬리가 새 스냅샷의 앞부분과 겹치는 위치를 찾아
+    그 뒤만 반환. 위치 정보를 쓸 수 없을 때의 폴백.
+    """
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._seen: List[str] = []
+
+    def remember(self, lines: List[str]) -> None:
+        """다른 경로로 읽은 줄을 기준선에 반영"""
+        self._seen = (self._seen + lines)[-self.window:]
+
+    def reset(self, lines: Optional[List[str]] = None) -> None:
+        self._seen = list(lines or [])[-self.window:]
+
+    def feed(self, snapshot: List[str]) -> List[str]:
+        """스냅샷에서 아직 보지 않은 줄 반환"""
+        # 화면 아래쪽 빈 행은 출력이 아니므로 제외
+        end = len(snapshot)
+        while end and not snapshot[end - 1].strip():
+            end -= 1
+        snapshot = snapshot[:end]
+
+        overlap = self._overlap(self._seen, snapshot)
+        if overlap is None and self._seen:
+            # 직전 마지막 줄이 입력 중이던 줄(프롬프트 등)이면 내용이 바뀌었을 수 있음
+            overlap = self._overlap(self._seen[:-1], snapshot)
+            if overlap is not None:
+                self._seen = self._seen[:-1]
+        new = snapshot[overlap or 0:]
+        self.remember(new)
+        return new
+
+    @staticmethod
+    def _overlap(seen: List[str], snapshot: List[str]) -> Optional[int]:
+        """seen의 접미사 == snapshot의 접두사인 최대 길이 (없으면 None)"""
+        if not seen:
+            return None
+        last = seen[-1]
+        for j in range(min(len(seen), len(snapshot)) - 1, -1, -1):
+            if snapshot[j] == last and snapshot[:j + 1] == seen[len(seen) - j - 1:]:
+                return j + 1
+        return None
+
+
+# PaneReader 단계가 요청하는 tmux 호출: ("tmux", 인자 튜플) 또는 ("tail", 줄 수)
+_Request = Tuple[str, Any]
+
+
+class PaneReader:
+    """pane의 절대 줄 위치를 기억해 새로 완성된 줄만 반환
+
+    절대 위치 = history_size + cursor_y. 커서 줄(아직 입력/출력 중)은
+    완성될 때까지 보류하고, 읽은 만큼만 capture-pane -S/-E로 가져옴.
+    히스토리가 history_limit에 도달해 위치가 더 이상 증가하지 않거나
+    위치 조회가 불가능하면 SnapshotDiff로 폴백. 같은 pane을 기다리는
+    모든 호출이 하나의 리더를 공유해야 중복/누락이 없음.
+
+    읽기 로직은 tmux 호출을 요청하는 제너레이터(_mark_steps/_read_steps)로
+    작성되어 있어 AsyncPaneReader가 같은 로직을 await로 실행함.
+    """
+
+    def __init__(
+        self,
+        pane_id: str,
+        tmux: Callable[..., Any],
+        capture_tail: Callable[[int], Any],
+        window: int = 200,
+        max_lines: int = 2000
+    ):
+        """
+        Args:
+            pane_id: tmux pane 식별자
+            tmux: tmux 인자 → stdout (실패 시 예외)
+            capture_tail: 마지막 N줄 캡처 (폴백용)
+            window: 폴백 스냅샷 크기 및 첫 읽기 범위
+            max_lines: 한 번에 가져올 최대 새 줄 수
+        """
+        self.pane_id = pane_id
+        self._tmux = tmux
+        self._capture_tail = capture_tail
+        self.window = window
+        self.max_lines = max_lines
+        self._next: Optional[int] = None  # 다음에 읽을 절대 줄 위치
+        self._positional: Optional[bool] = None  # 위치 조회 가능 여부 (None: 미확인)
+        self._diff = SnapshotDiff(window)
+        self._pending: Deque[str] = deque()
+
+    def _call(self, request: _Request) -> Any:
+        kind, arg = request
+        return self._tmux(*arg) if kind == "tmux" else self._capture_tail(arg)
+
+    def _drive(self, steps: Generator[_Request, Any, T]) -> T:
+        """단계 제너레이터의 tmux 요청을 실행하며 끝까지 진행 (호출 예외는 제너레이터로 전달)"""
+        result: Any = None
+        error: Optional[Exception] = None
+        while True:
+            try:
+                request = steps.throw(error) if error is not None else steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                result, error = self._call(request), None
+            except Exception as e:
+                result, error = None, e
+
+    def _position_steps(self) -> Generator[_Request, Any, Optional[Tuple[int, int, int]]]:
+        """현재 위치 조회 (한 번 실패하면 다음 mark() 전까지 다시 묻지 않음)"""
+        if self._positional is False:
+            return None
+        try:
+            position = parse_position(
+                (yield ("tmux", ("display-message", "-p", "-t", self.pane_id, POSITION_FORMAT)))
+            )
+        except Exception as e:
+            logger.debug(f"pane position unavailable for {self.pane_id}: {e}")
+            position = None
+        self._positional = position is not None
+        return position
+
+    def _mark_steps(self) -> Generator[_Request, Any, None]:
+        self._pending.clear()
+        self._positional = None
+        position = yield from self._position_steps()
+        if position is None:
+            # 위치를 모르면 기준선 없이 첫 읽기에서 최근 window줄부터 봄
+            self._next = None
+            self._diff.reset()
+            return
+        history_size, history_limit, cursor_y = position
+        self._next = history_size + cursor_y
+        if history_size >= history_limit:
+            self._diff.reset((yield ("tail", self.window)).splitlines())
+
+    def _read_steps(self) -> Generator[_Request, Any, List[str]]:
+        if self._pending:
+            lines = list(self._pending)
+            self._pending.clear()
+            return lines
+
+        position = yield from self._position_steps()
+        if position is None or position[0] >= position[1]:
+            return self._diff.feed((yield ("tail", self.window)).splitlines())
+
+        history_size, _, cursor_y = position
+        end = history_size + cursor_y
+        if self._next is None or end < self._next:
+            # 첫 읽기이거나 clear-history 등으로 위치가 줄어든 경우
+            start = max(0, end - self.window)
+        else:
+            start = max(self._next, end - self.max_lines)
+        self._next = end
+        if start >= end:
+            return []
+
+        text = yield ("tmux", (
+            "capture-pane", "-p", "-t", self.pane_id,
+            "-S", str(start - history_size), "-E", str(end - 1 - history_size)
+        ))
+        lines = text.splitlines()
+        self._diff.remember(lines)
+        return lines
+
+    def mark(self) -> None:
+        """현재 끝 위치를 기준선으로 설정 (이후 출력만 새 줄로 취급)"""
+        self._drive(self._mark_steps())
+
+    def read_new(self) -> List[str]:
+        """마지막 읽기 이후 새로 완성된 줄"""
+        return self._drive(self._read_steps())
+
+    def unread(self, lines: List[str]) -> None:
+        """소비하지 않은 줄을 되돌려 다음 read_new에서 먼저 반환"""
+        self._pending.extendleft(reversed(lines))
+
+
+class AsyncPaneReader(PaneReader):
+    """PaneReader의 asyncio 버전 (tmux/capture_tail은 코루틴 함수)"""
+
+    async def _drive(self, steps):
+        result: Any = None
+        error: Optional[Exception] = None
+        while True:
+            try:
+                request = steps.throw(error) if error is not None else steps.send(result)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                result, error = await self._call(request), None
+            except Exception as e:
+                result, error = None, e
+
+    async def mark(self) -> None:
+        """현재 끝 위치를 기준선으로 설정"""
+        await self._drive(self._mark_steps())
+
+    async def read_new(self) -> List[str]:
+        """마지막 읽기 이후 새로 완성된 줄"""
+        return await self._drive(self._read_steps())
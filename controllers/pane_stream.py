@@ -0,0 +1,153 @@
+"""
+tmux pipe-pane 기반 스트리밍 리더 - capture-pane 폴링 없이 출력 즉시 감지
+"""
+
+import codecs
+import os
+import re
+import select
+import shlex
+import subprocess
+import tempfile
+from collections import deque
+from typing import Deque, List, Optional
+
+
+class PaneStream:
+    """pane 출력을 FIFO로 흘려받아 줄 단위로 전달
+
+    pane당 한 번 `tmux pipe-pane`을 연결해 두면 이후 대기는
+    select()로 FIFO를 기다리기만 하므로 폴링마다 프로세스를 띄우지 않음.
+    """
+
+    def __init__(self, pane_id: str, path: Optional[str] = None):
+        """
+        Args:
+            pane_id: tmux pane 식별자 (예: '%3')
+            path: FIFO 경로 (None이면 임시 디렉토리에 자동 생성)
+        """
+        self.pane_id = pane_id
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', pane_id)
+        self.path = path or os.path.join(
+            tempfile.gettempdir(), f"orchestra-pane-{os.getpid()}-{safe_name}.fifo"
+        )
+        self._read_fd: Optional[int] = None
+        self._keepalive_fd: Optional[int] = None
+        self._partial = ""
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending: Deque[str] = deque()
+
+    @property
+    def attached(self) -> bool:
+        """pipe-pane 연결 여부"""
+        return self._read_fd is not None
+
+    def fileno(self) -> Optional[int]:
+        """FIFO 읽기 fd (asyncio add_reader 등 이벤트 루프 연동용)"""
+        return self._read_fd
+
+    def attach(self) -> None:
+        """FIFO 생성 후 pipe-pane 연결 (이미 연결되어 있으면 무시)"""
+        if self.attached:
+            return
+
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        os.mkfifo(self.path, 0o600)
+
+        # 읽기 끝을 먼저 열고, writer가 없을 때 EOF로 select가 깨어나지 않도록
+        # 자체 쓰기 끝을 하나 유지
+        self._read_fd = os.open(self.path, os.O_RDONLY | os.O_NONBLOCK)
+        self._keepalive_fd = os.open(self.path, os.O_WRONLY | os.O_NONBLOCK)
+
+        try:
+            subprocess.run(
+                ["tmux", "pipe-pane", "-t", self.pane_id, f"cat > {shlex.quote(self.path)}"],
+                check=True,
+                capture_output=True
+            )
+        except (subprocess.CalledProcessError, OSError) as e:
+            self._close_fds()
+            raise RuntimeError(f"Failed to attach pipe-pane to {self.pane_id}: {e}")
+
+    def detach(self) -> None:
+        """pipe-pane 해제 및 FIFO 정리"""
+        if not self.attached:
+            return
+        try:
+            # 명령 없이 호출하면 기존 파이프가 닫힘
+            subprocess.run(
+                ["tmux", "pipe-pane", "-t", self.pane_id],
+                check=False,
+                capture_output=True
+            )
+        finally:
+            self._close_fds()
+
+    def _close_fds(self) -> None:
+        for fd in (self._read_fd, self._keepalive_fd):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._read_fd = None
+        self._keepalive_fd = None
+        self._partial = ""
+        self._decoder.reset()
+        self._pending.clear()
+        if os.path.exists(self.path):
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def read_lines(self, timeout: float = 0.0) -> List[str]:
+        """새로 완성된 줄 반환 (없으면 timeout까지 대기)
+
+        Args:
+            timeout: 새 출력이 없을 때 대기할 최대 시간 (초)
+
+        Returns:
+            마지막 호출 이후 새로 들어온 완성된 줄 목록
+        """
+        if self._pending:
+            lines = list(self._pending)
+            self._pending.clear()
+            return lines
+
+        if not self.attached:
+            return []
+
+        ready, _, _ = select.select([self._read_fd], [], [], max(timeout, 0.0))
+        if not ready:
+            return []
+
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(self._read_fd, 65536)
+            except BlockingIOError:
+                break
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+        if not chunks:
+            return []
+
+        # 청크 경계에서 잘린 멀티바이트 문자는 다음 읽기로 이월
+        data = self._partial + self._decoder.decode(b"".join(chunks))
+        *lines, self._partial = data.split("\n")
+        return [line.rstrip("\r") for line in lines]
+
+    def unread(self, lines: List[str]) -> None:
+        """소비하지 않은 줄을 되돌려 다음 read_lines에서 먼저 반환"""
+        self._pending.extendleft(reversed(lines))
+
+    def __enter__(self) -> "PaneStream":
+        self.attach()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.detach()
@@ -0,0 +1,284 @@
+"""
+멀티 pane 핸드셰이크 스케줄러 - pane별 큐 + 동시 실행 제한
+"""
+
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from core.exec_parser import parse_exec
+from core.idempotency import IdempotencyManager
+from core.types import HandshakeResult
+
+logger = logging.getLogger(__name__)
+
+# EXEC priority 파라미터 → 정렬 순위 (낮을수록 먼저)
+PRIORITY_ORDER = {"high": 0, "normal": 1, "low": 2}
+
+
+@dataclass(order=True)
+class ScheduledTask:
+    """큐에 대기 중인 EXEC 작업"""
+    sort_key: tuple
+    exec_line: str = field(compare=False)
+    task_id: str = field(compare=False)
+    target: str = field(compare=False)
+    future: Future = field(compare=False, default_factory=Future)
+    submitted_at: float = field(compare=False, default_factory=time.time)
+
+
+def registry_adapter_factory(
+    configs: Optional[Dict[str, object]] = None,
+    **defaults
+) -> Callable[[str], object]:
+    """
+    어댑터 레지스트리 기반 팩토리 생성
+
+    대상이 pane ID(%3) 또는 session:window.pane 형식이면 tmux 어댑터,
+    그 외에는 역할 이름으로 레지스트리에서 어댑터 클래스를 찾음.
+
+    Args:
+        configs: 대상별 어댑터 설정 (없으면 어댑터의 config_class로 생성)
+        **defaults: config_class 생성 시 넘길 기본값 (예: timeout_eot=60)
+    """
+    configs = configs or {}
+
+    def factory(target: str):
+        # 순환 import 방지를 위해 지연 import
+        from adapters import get_adapter
+
+        if target.startswith('%') or ':' in target:
+            adapter_class = get_adapter("tmux")
+            config = configs.get(target) or adapter_class.config_class(name="tmux", **defaults)
+            return adapter_class(config, target)
+
+        adapter_class = get_adapter(target)
+        if adapter_class is None:
+            raise ValueError(f"Unknown target: {target}")
+        config = configs.get(target) or adapter_class.config_class(name=target, **defaults)
+        return adapter_class(config)
+
+    return factory
+
+
+def _as_result(value, task_id: str) -> HandshakeResult:
+    """실행/저장된 결과를 HandshakeResult로 변환 (이전 형식의 문자열 등 포함)"""
+    if isinstance(value, HandshakeResult):
+        return value
+    success = bool(getattr(value, "success", value))
+    status = getattr(value, "status", None)
+    if status is None:
+        status = value if isinstance(value, str) else ("OK" if success else "FAILED")
+    return HandshakeResult(success=success, status=status, task_id=task_id)
+
+
+class HandshakeScheduler:
+    """EXEC 작업을 대상(pane/역할)별로 큐잉하여 디스패치
+
+    tmux pane은 한 번에 하나의 대화만 가능하므로 대상당 in-flight 작업은 1개.
+    나머지는 대상별 큐에서 priority(기본) 또는 FIFO 순서로 대기하고,
+    전체 동시 실행 수는 max_concurrency로 제한. 대상 간에는 라운드로빈.
+    대기/실행 중인 task_id가 다시 제출되면 새로 실행하지 않고 같은 Future를 반환.
+    """
+
+    def __init__(
+        self,
+        adapter_factory: Optional[Callable[[str], object]] = None,
+        max_concurrency: int = 8,
+        policy: str = "priority",
+        idempotency: Optional[IdempotencyManager] = None
+    ):
+        """
+        Args:
+            adapter_factory: 대상 이름 → 어댑터 인스턴스 (기본: 레지스트리)
+            max_concurrency: 동시에 실행할 최대 핸드셰이크 수
+            policy: "priority" 또는 "fifo"
+            idempotency: 지정 시 완료/최근 실패 결과 재사용 및 프로세스 간 중복 실행 방지
+        """
+        if policy not in ("priority", "fifo"):
+            raise ValueError(f"Unknown policy: {policy}")
+        self.adapter_factory = adapter_factory or registry_adapter_factory()
+        self.max_concurrency = max_concurrency
+        self.policy = policy
+        self.idempotency = idempotency
+
+        self._lock = threading.Lock()
+        self._queues: "OrderedDict[str, List[ScheduledTask]]" = OrderedDict()
+        self._busy: Dict[str, ScheduledTask] = {}
+        self._adapters: Dict[str, object] = {}
+        self._by_task: Dict[str, Future] = {}  # 대기/실행 중 task_id → Future
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="handshake")
+        self._seq = itertools.count()
+        self._started_at: Optional[float] = None
+        self._completed = 0
+        self._failed = 0
+        self._coalesced = 0
+        self._closed = False
+
+    def submit(
+        self,
+        exec_line: str,
+        target: Optional[str] = None,
+        task_id: Optional[str] = None,
+        priority: Optional[str] = None
+    ) -> Future:
+        """
+        EXEC 작업 제출
+
+        대상/작업ID/우선순위를 인자로 주지 않으면 EXEC 파라미터
+        (pane 또는 target, task_id 또는 task, priority)에서 읽음.
+
+        Returns:
+            HandshakeResult를 돌려줄 Future
+
+        Raises:
+            ValueError: 대상 또는 task_id를 알 수 없는 경우
+        """
+        params = parse_exec(exec_line).params
+        target = target or params.get("pane") or params.get("target")
+        task_id = task_id or params.get("task_id") or params.get("task")
+        if not target:
+            raise ValueError(f"No target pane or role for EXEC: {exec_line}")
+        if not task_id:
+            raise ValueError(f"Missing task_id for EXEC: {exec_line}")
+
+        seq = next(self._seq)
+        if self.policy == "priority":
+            rank = PRIORITY_ORDER.get(priority or params.get("priority", "normal"), PRIORITY_ORDER["normal"])
+            sort_key = (rank, seq)
+        else:
+            sort_key = (seq,)
+
+        task = ScheduledTask(sort_key=sort_key, exec_line=exec_line, task_id=task_id, target=target)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Scheduler is shut down")
+            if task_id in self._by_task:
+                # 같은 작업이 이미 대기/실행 중이면 그 결과를 공유
+                self._coalesced += 1
+                return self._by_task[task_id]
+            self._by_task[task_id] = task.future
+            if self._started_at is None:
+                self._started_at = task.submitted_at
+            heapq.heappush(self._queues.setdefault(target, []), task)
+        self._dispatch()
+        return task.future
+
+    def submit_many(self, exec_lines: Iterable[str]) -> List[Future]:
+        """여러 EXEC 줄 제출 (빈 줄/주석 무시)"""
+        futures = []
+        for line in exec_lines:
+            line = line.strip()
+            if line and not line.startswith("#"):
+                futures.append(self.submit(line))
+        return futures
+
+    def _dispatch(self) -> None:
+        """유휴 대상의 다음 작업을 실행 슬롯에 배정"""
+        with self._lock:
+            for target in list(self._queues):
+                if len(self._busy) >= self.max_concurrency:
+                    break
+                queue = self._queues[target]
+                if target in self._busy or not queue:
+                    continue
+                task = heapq.heappop(queue)
+                self._busy[target] = task
+                # 방금 배정한 대상은 뒤로 보내 대상 간 공정성 유지
+                self._queues.move_to_end(target)
+                self._executor.submit(self._run, task)
+
+    def _adapter_for(self, target: str):
+        with self._lock:
+            adapter = self._adapters.get(target)
+        if adapter is None:
+            adapter = self.adapter_factory(target)
+            with self._lock:
+                adapter = self._adapters.setdefault(target, adapter)
+        return adapter
+
+    def _execute(self, task: ScheduledTask) -> HandshakeResult:
+        adapter = self._adapter_for(task.target)
+        if hasattr(adapter, "execute_with_handshake_sync"):
+            return adapter.execute_with_handshake_sync(task.exec_line, task.task_id)
+        return adapter.execute_with_handshake(task.exec_line, task.task_id)
+    
+    def _run(self, task: ScheduledTask) -> None:
+        result = None
+        try:
+            if self.idempotency is not None:
+                result = self.idempotency.execute_once(task.task_id, lambda: self._execute(task))
+            else:
+                result = self._execute(task)
+            result = _as_result(result, task.task_id)
+        except Exception as e:
+            logger.error(f"Task {task.task_id} on {task.target} failed: {e}")
+            result = HandshakeResult(success=False, status="ERROR", error=str(e), task_id=task.task_id)
+        finally:
+            # 어떤 경우에도 Future를 완료하고 대상을 풀어줘야 큐가 멈추지 않음
+            if result is None:
+                result = HandshakeResult(success=False, status="ERROR", error="aborted", task_id=task.task_id)
+            with self._lock:
+                if result.success:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+                self._by_task.pop(task.task_id, None)
+            try:
+                task.future.set_result(result)
+            finally:
+                with self._lock:
+                    self._busy.pop(task.target, None)
+                self._dispatch()
+
+    def stats(self) -> dict:
+        """큐 깊이, 실행 중 작업, 처리량 (tasks/s)"""
+        with self._lock:
+            depth = {target: len(queue) for target, queue in self._queues.items() if queue}
+            done = self._completed + self._failed
+            elapsed = time.time() - self._started_at if self._started_at else 0.0
+            return {
+                "queue_depth": depth,
+                "queued": sum(depth.values()),
+                "in_flight": len(self._busy),
+                "completed": self._completed,
+                "failed": self._failed,
+                "coalesced": self._coalesced,
+                "throughput_per_s": done / elapsed if elapsed > 0 else 0.0,
+            }
+
+    def drain(self, timeout: Optional[float] = None) -> bool:
+        """
+        모든 대기/실행 중 작업이 끝날 때까지 대기
+
+        Returns:
+            timeout 전에 모두 끝났는지 여부
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            with self._lock:
+                pending = [t.future for q in self._queues.values() for t in q]
+                pending += [t.future for t in self._busy.values() if not t.future.done()]
+            if not pending:
+                return True
+            remaining = None if deadline is None else deadline - time.time()
+            if remaining is not None and remaining <= 0:
+                return False
+            try:
+                pending[0].result(timeout=remaining)
+            except TimeoutError:
+                return False
+
+    def shutdown(self, wait: bool = True) -> None:
+        """새 작업 접수 중단 (wait=True면 남은 작업 완료 대기)"""
+        with self._lock:
+            self._closed = True
+        if wait:
+            self.drain()
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,281 @@
+"""
+tmux 제어 모드(-C) 장기 연결 - 명령마다 tmux 클라이언트를 띄우지 않음
+"""
+
+import atexit
+import logging
+import re
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# %output 데이터의 8진수 이스케이프 (\015 등)
+_OCTAL_ESCAPE = re.compile(rb'\\([0-7]{3})')
+
+
+def quote_arg(arg: str) -> str:
+    """tmux 명령 인자 인용 (제어 모드는 한 줄 = 한 명령이므로 개행도 이스케이프)"""
+    if arg and re.fullmatch(r'[A-Za-z0-9_.,:%@/=+-]+', arg):
+        return arg
+    escaped = (
+        arg.replace('\\', '\\\\')
+        .replace('"', '\\"')
+        .replace('$', '\\$')
+        .replace('\n', '\\n')
+        .replace('\r', '\\r')
+        .replace('\t', '\\t')
+    )
+    return f'"{escaped}"'
+
+
+def build_command(*commands: Sequence[str]) -> str:
+    """여러 tmux 명령을 ' ; '로 연결한 한 줄 생성"""
+    return " ; ".join(" ".join(quote_arg(a) for a in cmd) for cmd in commands)
+
+
+def decode_output(data: str) -> str:
+    """%output 알림 데이터 디코딩"""
+    raw = _OCTAL_ESCAPE.sub(lambda m: bytes([int(m.group(1), 8)]), data.encode("utf-8", "surrogateescape"))
+    return raw.decode("utf-8", errors="replace")
+
+
+class TmuxControlError(RuntimeError):
+    """제어 모드 명령 실패 (%error 응답 또는 연결 종료)"""
+
+    def __init__(self, message: str, results: Optional[List[Optional[str]]] = None,
+                 written: bool = True):
+        """
+        Args:
+            message: 오류 메시지
+            results: commands()의 명령별 출력 (실패한 명령은 None)
+            written: 명령을 tmux에 보냈는지 여부 (False면 실행되지 않았음이 확실)
+        """
+        super().__init__(message)
+        self.results = results
+        self.written = written
+
+
+class TmuxControlClient:
+    """tmux 서버당 하나의 제어 모드 클라이언트
+
+    명령은 한 줄에 하나씩 보내고 응답 블록(%begin ... %end/%error)은 보낸 순서대로
+    대기 중인 Future에 연결. ' ; '로 묶은 줄은 중간 명령이 실패하면 나머지 블록이
+    오지 않아 Future와 블록의 짝이 어긋나므로 묶지 않음.
+    블록 밖의 %output 알림은 pane별 리스너에 전달.
+    """
+
+    def __init__(self, socket_name: Optional[str] = None):
+        """
+        Args:
+            socket_name: tmux -L 소켓 이름 (None이면 기본 서버)
+        """
+        self.socket_name = socket_name
+        self._proc: Optional[subprocess.Popen] = None
+        self._reader: Optional[threading.Thread] = None
+        self._write_lock = threading.Lock()
+        self._pending: Deque[Future] = deque()
+        self._exited = False  # 리더가 EOF를 본 뒤에는 새 명령을 받지 않음
+        self._listeners: Dict[str, List[Callable[[str], None]]] = {}
+
+    @property
+    def alive(self) -> bool:
+        """연결 유지 여부"""
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self, timeout: float = 5.0) -> None:
+        """
+        제어 모드 클라이언트 시작 (가장 최근 세션에 attach)
+
+        Raises:
+            TmuxControlError: 실행 실패 또는 attach 실패 (세션 없음 등)
+        """
+        if self.alive:
+            return
+        cmd = ["tmux"]
+        if self.socket_name:
+            cmd += ["-L", self.socket_name]
+        cmd += ["-C", "attach-session"]
+        try:
+            self._proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                bufsize=0
+            )
+        except OSError as e:
+            raise TmuxControlError(f"Failed to start tmux control client: {e}", written=False)
+        self._exited = False
+        self._reader = threading.Thread(target=self._read_loop, name="tmux-control-reader", daemon=True)
+        self._reader.start()
+        # attach에 실패하면 tmux가 바로 종료하므로 첫 명령 응답으로 확인
+        try:
+            self._send([["display-message", "-p", "ok"]], timeout)
+        except (TmuxControlError, TimeoutError) as e:
+            self.close()
+            raise TmuxControlError(f"tmux attach-session failed: {e}", written=False)
+
+    def close(self) -> None:
+        """연결 종료"""
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            if proc.poll() is None:
+                proc.stdin.close()
+                proc.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+        with self._write_lock:
+            self._fail_pending("control client closed")
+
+    def command(self, *args: str, timeout: float = 5.0) -> str:
+        """
+        단일 tmux 명령 실행
+
+        Returns:
+            명령 출력 (개행으로 연결)
+        """
+        return self.commands([args], timeout=timeout)[-1]
+
+    def commands(self, commands: Sequence[Sequence[str]], timeout: float = 5.0) -> List[str]:
+        """
+        여러 명령을 한 번의 쓰기로 실행 (명령마다 한 줄)
+
+        Returns:
+            명령별 출력 목록
+
+        Raises:
+            TmuxControlError: 하나라도 %error로 끝났거나 응답이 없는 경우
+                (results에 명령별 출력, 실패한 명령은 None. written이 False면
+                연결/쓰기 실패로 어떤 명령도 보내지 않음)
+        """
+        if not self.alive:
+            self.start()
+        return self._send(commands, timeout)
+
+    def _send(self, commands: Sequence[Sequence[str]], timeout: float) -> List[str]:
+        futures = [Future() for _ in commands]
+        data = "".join(build_command(cmd) + "\n" for cmd in commands).encode("utf-8")
+        written = False
+        with self._write_lock:
+            self._pending.extend(futures)
+            if self._exited:
+                self._fail_pending("tmux control client exited")
+            else:
+                try:
+                    self._proc.stdin.write(data)
+                    written = True
+                except (OSError, AttributeError) as e:
+                    self._fail_pending(f"write failed: {e}")
+
+        results: List[Optional[str]] = []
+        error: Optional[Exception] = None
+        for future in futures:
+            try:
+                results.append(future.result(timeout=timeout))
+            except (TmuxControlError, TimeoutError) as e:
+                # 응답이 늦은 Future도 _pending에 남아 자기 블록을 받으므로 순서는 유지됨
+                results.append(None)
+                error = error or e
+        if error is not None:
+            raise TmuxControlError(str(error) or "tmux command timed out", results, written)
+        return results
+
+    def add_output_listener(self, pane_id: str, callback: Callable[[str], None]) -> None:
+        """pane의 %output 알림 리스너 등록 (attach된 세션의 pane만 전달됨)"""
+        self._listeners.setdefault(pane_id, []).append(callback)
+
+    def remove_output_listener(self, pane_id: str, callback: Callable[[str], None]) -> None:
+        """리스너 해제"""
+        callbacks = self._listeners.get(pane_id, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _read_loop(self) -> None:
+        proc = self._proc
+        block: Optional[List[str]] = None
+        block_id = None
+        ours = False
+
+        for raw in iter(proc.stdout.readline, b""):
+            line = raw.decode("utf-8", errors="surrogateescape").rstrip("\n")
+
+            if block is not None:
+                parts = line.split(" ")
+                if parts[0] in ("%end", "%error") and len(parts) >= 3 and parts[2] == block_id:
+                    if ours:
+                        self._resolve(parts[0] == "%end", block)
+                    block = None
+                else:
+                    block.append(line)
+                continue
+
+            if line.startswith("%begin "):
+                parts = line.split(" ")
+                block, block_id = [], parts[2] if len(parts) > 2 else None
+                # flags=1이면 이 클라이언트가 보낸 명령 (attach 초기 블록은 0)
+                ours = len(parts) > 3 and parts[3] == "1"
+            elif line.startswith("%output "):
+                _, pane_id, data = (line.split(" ", 2) + [""])[:3]
+                for callback in list(self._listeners.get(pane_id, [])):
+                    try:
+                        callback(decode_output(data))
+                    except Exception as e:
+                        logger.warning(f"Output listener failed for {pane_id}: {e}")
+            elif line.startswith("%exit"):
+                break
+
+        with self._write_lock:
+            # close() 후 재시작된 연결의 대기 명령은 건드리지 않음
+            if self._proc is proc or self._proc is None:
+                self._exited = True
+                self._fail_pending("tmux control client exited")
+
+    def _resolve(self, ok: bool, lines: List[str]) -> None:
+        with self._write_lock:
+            future = self._pending.popleft() if self._pending else None
+        if future is None:
+            return
+        text = "\n".join(lines)
+        if ok:
+            future.set_result(text)
+        else:
+            future.set_exception(TmuxControlError(text or "tmux command failed"))
+
+    def _fail_pending(self, reason: str) -> None:
+        """대기 중인 명령 모두 실패 처리 (호출자가 _write_lock 보유)"""
+        while self._pending:
+            future = self._pending.popleft()
+            if not future.done():
+                future.set_exception(TmuxControlError(reason))
+
+
+# tmux 서버(소켓)별 공유 클라이언트
+_clients: Dict[Optional[str], TmuxControlClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_control_client(socket_name: Optional[str] = None) -> TmuxControlClient:
+    """서버별 공유 제어 모드 클라이언트 (필요 시 시작/재시작)"""
+    with _clients_lock:
+        client = _clients.get(socket_name)
+        if client is None:
+            client = TmuxControlClient(socket_name)
+            _clients[socket_name] = client
+        if not client.alive:
+            client.start()
+        return client
+
+
+@atexit.register
+def close_all() -> None:
+    """모든 제어 모드 연결 종료"""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
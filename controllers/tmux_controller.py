@@ -2,24 +2,126 @@ import subprocess
 import time
 import shlex
 import base64
-from typing import Optional, Tuple
+import logging
+from typing import List, Optional, Tuple
 
-from core.protocol import parse_ack, parse_run, parse_eot
+from core.protocol import Ack, Run, Eot, match_token
+from core.exec_parser import parse_exec
+from core.handshake import HandshakeTracker
 from core.types import HandshakeResult
 from core.kpi import kpi  # KPI 추적 추가
+from controllers.pane_stream import PaneStream
+from controllers.pane_reader import PaneReader
+from controllers.tmux_control import TmuxControlClient, TmuxControlError, get_control_client
+
+logger = logging.getLogger(__name__)
+
+# 안전 모드 전송이 필요한 특수문자
+SPECIAL_CHARS = ['"', "'", '`', '\\', '$', '\n', '\t', ';', '&', '|', '>', '<']
+
+# 제어 모드 응답이 없어도 프로세스 호출로 다시 실행해도 되는 (pane을 바꾸지 않는) 명령
+READ_ONLY_COMMANDS = frozenset({"capture-pane", "display-message", "list-panes"})
+
+
+def needs_safe_send(text: str) -> bool:
+    """특수문자 포함 여부 확인"""
+    return any(char in text for char in SPECIAL_CHARS)
+
+
+def safe_send_command(text: str) -> str:
+    """특수문자 텍스트를 base64로 감싼 셸 명령 생성"""
+    # base64로 인코딩
+    b64 = base64.b64encode(text.encode()).decode()
+    
+    # tmux에서 디코드하여 실행
+    # printf로 정확한 텍스트 출력
+    return f"printf '%s' '{b64}' | base64 -d | bash"
+
+
+def infer_verb(command: str) -> Optional[str]:
+    """EXEC 명령이면 동사 반환 (일반 셸 명령이면 None)"""
+    try:
+        return parse_exec(command).verb
+    except ValueError:
+        return None
+
+
+# 단계 → (시작 시점, 끝 시점): ACK는 전송부터, 이후는 직전 단계부터
+PHASE_SPANS = {"ACK": ("send", "ack"), "RUN": ("ack", "run"), "EOT": ("run", "eot")}
+
+
+def record_phase_kpi(tracker: HandshakeTracker, phase: str,
+                     verb: Optional[str] = None, ai_agent: Optional[str] = None) -> None:
+    """단계 도달 시점에 단계별 소요 시간 KPI 기록 (EOT면 전체 소요 시간도)"""
+    timestamps = tracker.timestamps
+    start, end = PHASE_SPANS[phase]
+    kpi.record(kind='handshake', phase=phase.lower(), success=True,
+               duration_ms=int((timestamps[end] - timestamps[start]) * 1000),
+               verb=verb, ai_agent=ai_agent, task_id=tracker.task_id)
+    if phase == "EOT":
+        kpi.record(kind='handshake', phase='total', success=True,
+                   duration_ms=int((timestamps["eot"] - timestamps["send"]) * 1000),
+                   verb=verb, ai_agent=ai_agent, task_id=tracker.task_id)
+
+
+def record_timeout_kpi(tracker: HandshakeTracker,
+                       verb: Optional[str] = None, ai_agent: Optional[str] = None) -> None:
+    """단계 타임아웃 KPI 기록"""
+    phase = tracker.phase.lower()
+    kpi.record(kind='handshake', phase=phase, success=False,
+               verb=verb, ai_agent=ai_agent, task_id=tracker.task_id)
+    kpi.record(kind='error', error_type=f'{phase}_timeout', success=False,
+               verb=verb, ai_agent=ai_agent, task_id=tracker.task_id)
 
 
 class TmuxController:
     """tmux pane_id 기반 제어 (예: '%3'). 출력은 capture-pane로 가져옴."""
     
-    def __init__(self, pane_id: str, poll_interval: float = 0.2):
+    def __init__(self, pane_id: str, poll_interval: float = 0.2, use_pipe: bool = False,
+                 use_control: bool = False):
         """
         Args:
             pane_id: tmux pane 식별자 (예: '%3', 'session:window.pane')
             poll_interval: 토큰 확인 간격 (초)
+            use_pipe: pipe-pane 스트리밍 사용 여부 (실패 시 capture-pane 폴링)
+            use_control: 공유 tmux 제어 모드 연결 사용 여부 (실패 시 프로세스 호출)
         """
         self.pane_id = pane_id
         self.poll_interval = poll_interval
+        self.ai_agent: Optional[str] = None  # KPI 집계용 에이전트 이름
+        self._stream: Optional[PaneStream] = PaneStream(pane_id) if use_pipe else None
+        self._control: Optional[TmuxControlClient] = None
+        if use_control:
+            try:
+                self._control = get_control_client()
+            except TmuxControlError as e:
+                logger.warning(f"tmux control mode unavailable, using subprocess: {e}")
+        # 폴링 모드의 모든 대기가 공유하는 증분 리더
+        self._reader = PaneReader(pane_id, self._tmux_query, lambda n: self.capture_tail(n))
+    
+    def attach_stream(self) -> bool:
+        """
+        pipe-pane 스트림 연결 (pane당 한 번)
+        
+        Returns:
+            스트리밍 모드 사용 가능 여부
+        """
+        if self._stream is None:
+            return False
+        if not self._stream.attached:
+            try:
+                self._stream.attach()
+            except (RuntimeError, OSError) as e:
+                # 스트리밍 불가 시 capture-pane 폴링으로 폴백
+                logger.warning(f"pipe-pane unavailable, falling back to polling: {e}")
+                self._stream = None
+                return False
+        return True
+    
+    def close(self) -> None:
+        """pipe-pane 스트림 해제"""
+        if self._stream is not None:
+            self._stream.detach()
     
     def send_keys(self, text: str, enter: bool = True, safe_mode: bool = True) -> None:
         """
@@ -34,6 +136,12 @@ class TmuxController:
             if safe_mode and self._needs_safe_send(text):
                 # 특수문자가 있으면 안전 모드로 전송
                 self._safe_send(text)
+            elif self._control is not None:
+                # 제어 모드: 텍스트와 Enter를 한 줄로 전송
+                commands = [["send-keys", "-t", self.pane_id, text]]
+                if enter:
+                    commands.append(["send-keys", "-t", self.pane_id, "Enter"])
+                self._control_commands(commands)
             else:
                 # 일반 전송
                 subprocess.run(
@@ -52,17 +160,18 @@ class TmuxController:
     
     def _needs_safe_send(self, text: str) -> bool:
         """특수문자 포함 여부 확인"""
-        special_chars = ['"', "'", '`', '\\', '$', '\n', '\t', ';', '&', '|', '>', '<']
-        return any(char in text for char in special_chars)
+        return needs_safe_send(text)
     
     def _safe_send(self, text: str) -> None:
         """특수문자를 안전하게 전송 (base64 인코딩)"""
-        # base64로 인코딩
-        b64 = base64.b64encode(text.encode()).decode()
+        cmd = safe_send_command(text)
         
-        # tmux에서 디코드하여 실행
-        # printf로 정확한 텍스트 출력
-        cmd = f"printf '%s' '{b64}' | base64 -d | bash"
+        if self._control is not None:
+            self._control_commands([
+                ["send-keys", "-t", self.pane_id, cmd],
+                ["send-keys", "-t", self.pane_id, "Enter"]
+            ])
+            return
         
         subprocess.run(
             ["tmux", "send-keys", "-t", self.pane_id, cmd],
@@ -92,6 +201,9 @@ class TmuxController:
             if last_lines:
                 cmd.extend(["-S", f"-{last_lines}"])
             
+            if self._control is not None:
+                return self._control_commands([cmd[1:]])[0] + "\n"
+            
             result = subprocess.run(
                 cmd,
                 check=True,
@@ -102,6 +214,46 @@ class TmuxController:
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Failed to capture tmux pane {self.pane_id}: {e}")
     
+    def _tmux_query(self, *args: str) -> str:
+        """tmux 명령 실행 후 stdout 반환"""
+        if self._control is not None:
+            return self._control_commands([list(args)])[0]
+        return subprocess.run(
+            ["tmux", *args],
+            check=True,
+            capture_output=True,
+            text=True
+        ).stdout
+    
+    def _control_commands(self, commands: List[List[str]]) -> List[str]:
+        """
+        제어 모드 연결로 명령 실행
+
+        보내지 못한 명령과 읽기 전용 명령만 프로세스 호출로 재실행. 이미 보낸
+        send-keys 등은 응답이 늦어도 tmux가 실행했을 수 있으므로 재실행하지 않음
+        (같은 입력이 pane에 두 번 들어감).
+
+        Raises:
+            TmuxControlError: 보낸 쓰기 명령이 실패했거나 응답이 없는 경우
+        """
+        try:
+            return self._control.commands(commands)
+        except (TmuxControlError, TimeoutError) as e:
+            results = getattr(e, "results", None) or [None] * len(commands)
+            if getattr(e, "written", True) and any(
+                output is None and cmd[0] not in READ_ONLY_COMMANDS
+                for cmd, output in zip(commands, results)
+            ):
+                raise
+            logger.debug(f"tmux control command failed, retrying with subprocess: {e}")
+        # 재실행도 실패하면 CalledProcessError (호출자가 RuntimeError로 변환)
+        return [
+            output if output is not None else subprocess.run(
+                ["tmux", *cmd], check=True, capture_output=True, text=True
+            ).stdout.rstrip("\n")
+            for cmd, output in zip(commands, results)
+        ]
+    
     def capture_tail(self, lines: int = 200) -> str:
         """
         tmux pane의 마지막 N줄만 캡처 (성능 최적화)
@@ -131,39 +283,26 @@ class TmuxController:
         Returns:
             (성공 여부, 상태/에러 메시지)
         """
+        token_class = {"ACK": Ack, "RUN": Run, "EOT": Eot}[token_type]
+        streaming = self._stream is not None and self._stream.attached
         deadline = time.time() + timeout
-        seen_tokens = set()  # 중복 토큰 방지
         
-        while time.time() < deadline:
-            # 성능 최적화: 마지막 200줄만 캡처
-            output = self.capture_tail(200)
-            lines = output.splitlines()
-            
-            for line in lines:
-                # 이미 본 토큰은 건너뛰기
-                line_hash = hash(line)
-                if line_hash in seen_tokens:
-                    continue
-                    
-                if token_type == "ACK":
-                    parsed = parse_ack(line)
-                    if parsed and parsed.id == task_id:
-                        seen_tokens.add(line_hash)
-                        return True, "ACK_RECEIVED"
-                        
-                elif token_type == "RUN":
-                    parsed = parse_run(line)
-                    if parsed and parsed.id == task_id:
-                        seen_tokens.add(line_hash)
-                        return True, "RUN_RECEIVED"
-                        
-                elif token_type == "EOT":
-                    parsed = parse_eot(line)
-                    if parsed and parsed.id == task_id:
-                        seen_tokens.add(line_hash)
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            # 새 줄만 읽으므로 반복된 줄도 그대로 보임 (줄 해시로 거르지 않음)
+            lines = self._poll_lines(remaining)
+            for i, line in enumerate(lines):
+                parsed = match_token(line)
+                if isinstance(parsed, token_class) and parsed.id == task_id:
+                    # 같은 묶음의 나머지 줄은 다음 대기에서 사용
+                    self._unread(lines[i + 1:])
+                    if token_type == "EOT":
                         return True, parsed.status
-            
-            time.sleep(self.poll_interval)
+                    return True, f"{token_type}_RECEIVED"
+            if not streaming:
+                time.sleep(self.poll_interval)
         
         # 타임아웃 시 디버깅용 스냅샷 추가
         snapshot = self.capture_tail(50)[-1024:]  # 마지막 1KB
@@ -192,52 +331,65 @@ class TmuxController:
         """
         start_time = time.time()
         
+        # 스트리밍 모드면 전송 전에 pipe-pane 연결 (출력 누락 방지),
+        # 폴링 모드면 현재 위치를 기준선으로 (이전 출력 재검사 방지)
+        streaming = self.attach_stream()
+        if not streaming:
+            self._reader.mark()
+        
         # 명령 전송
         self.send_keys(command)
         
-        # 1. ACK 대기
-        success, msg = self.wait_for_token(task_id, "ACK", timeout_ack)
-        kpi.record(kind='handshake', phase='ack', success=success, task_id=task_id)
+        # ACK→RUN→EOT를 한 번의 스캔으로 진행 (단계별 마감은 직전 단계 기준)
+        tracker = HandshakeTracker(task_id, timeout_ack, timeout_run, timeout_eot)
+        tracker.start(start_time)
+        verb = infer_verb(command)
         
-        if not success:
-            kpi.record(kind='error', error_type='ack_timeout', success=False, task_id=task_id)
-            return HandshakeResult(
-                success=False,
-                status="FAILED",
-                task_id=task_id,
-                error=msg
-            )
+        while not tracker.done and not tracker.expired():
+            lines = self._poll_lines(tracker.remaining())
+            for phase in tracker.feed_lines(lines):
+                record_phase_kpi(tracker, phase, verb, self.ai_agent)
+            if not tracker.done and not streaming:
+                time.sleep(self.poll_interval)
         
-        # 2. RUN 대기
-        success, msg = self.wait_for_token(task_id, "RUN", timeout_run)
-        kpi.record(kind='handshake', phase='run', success=success, task_id=task_id)
+        duration = time.time() - start_time
         
-        if not success:
-            kpi.record(kind='error', error_type='run_timeout', success=False, task_id=task_id)
+        if not tracker.done:
+            phase = tracker.phase
+            record_timeout_kpi(tracker, verb, self.ai_agent)
+            # 타임아웃 시 디버깅용 스냅샷 추가
+            snapshot = self.capture_tail(50)[-1024:]  # 마지막 1KB
             return HandshakeResult(
                 success=False,
-                status="FAILED",
+                status="TIMEOUT" if phase == "EOT" else "FAILED",
                 task_id=task_id,
-                error=msg
-            )
-        
-        # 3. EOT 대기
-        success, status = self.wait_for_token(task_id, "EOT", timeout_eot)
-        duration_ms = int((time.time() - start_time) * 1000)
-        kpi.record(kind='handshake', phase='eot', success=success, 
-                  duration_ms=duration_ms, task_id=task_id)
-        
-        if not success:
-            kpi.record(kind='error', error_type='eot_timeout', success=False, task_id=task_id)
-            return HandshakeResult(
-                success=False,
-                status="TIMEOUT",
-                task_id=task_id,
-                error=status
+                error=f"NO_{phase}|snapshot={snapshot}",
+                duration=duration,
+                phases=dict(tracker.timestamps)
             )
         
         return HandshakeResult(
             success=True,
-            status=status,
-            task_id=task_id
-        )
\ No newline at end of file
+            status=tracker.status,
+            task_id=task_id,
+            duration=duration,
+            phases=dict(tracker.timestamps)
+        )
+    
+    def _poll_lines(self, timeout: float) -> List[str]:
+        """
+        새 출력 줄 가져오기
+        
+        스트리밍 모드면 pipe-pane에서 (timeout까지 대기),
+        폴링 모드면 PaneReader로 마지막 읽기 이후 완성된 줄만
+        """
+        if self._stream is not None and self._stream.attached:
+            return self._stream.read_lines(timeout=timeout)
+        return self._reader.read_new()
+    
+    def _unread(self, lines: List[str]) -> None:
+        """소비하지 않은 줄 되돌리기"""
+        if self._stream is not None and self._stream.attached:
+            self._stream.unread(lines)
+        else:
+            self._reader.unread(lines)
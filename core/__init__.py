@@ -1,13 +1,18 @@
 """Core communication modules for AI Orchestra v02"""
 
-from .protocol import format_ack, format_run, format_eot, parse_ack, parse_run, parse_eot, strip_ansi_codes
-from .idempotency import IdempotencyManager
+from .protocol import (
+    format_ack, format_run, format_eot, parse_ack, parse_run, parse_eot, strip_ansi_codes,
+    match_token, scan, parse_meta
+)
+from .idempotency import IdempotencyManager, SQLiteIdempotencyStore
 from .retry import exponential_backoff_with_jitter
+from .handshake import HandshakeTracker
 
 __all__ = [
     'format_ack', 'format_run', 'format_eot',
     'parse_ack', 'parse_run', 'parse_eot',
-    'strip_ansi_codes',
-    'IdempotencyManager', 
-    'exponential_backoff_with_jitter'
+    'strip_ansi_codes', 'match_token', 'scan', 'parse_meta',
+    'IdempotencyManager', 'SQLiteIdempotencyStore',
+    'exponential_backoff_with_jitter',
+    'HandshakeTracker'
 ]
\ No newline at end of file
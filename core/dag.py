@@ -0,0 +1,316 @@
+"""
+DAG 파이프라인 엔진 - 에이전트 호출을 의존 관계대로 병렬 실행
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 조인 정책
+JOIN_ALL = "all"            # 모든 선행 노드 성공 시 실행 (하나라도 실패하면 건너뜀)
+JOIN_ANY = "any"            # 선행 노드 하나가 성공하면 바로 실행
+JOIN_ALL_DONE = "all_done"  # 성공/실패와 관계없이 모두 끝나면 실행
+JOIN_QUORUM = "quorum"      # 선행 노드 quorum개가 성공하면 바로 실행 (남은 노드로 불가능하면 건너뜀)
+JOIN_POLICIES = (JOIN_ALL, JOIN_ANY, JOIN_ALL_DONE, JOIN_QUORUM)
+
+# 노드 상태
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+CANCELLED = "cancelled"
+
+
+@dataclass
+class NodeContext:
+    """노드 실행 시 전달되는 입력과 제어 수단"""
+    node: str
+    inputs: Dict[str, Any]  # 선행 노드 이름 → 출력 (부분 출력 의존이면 게시된 값)
+    cancel: threading.Event
+    _publish: Callable[[str, Any], None] = field(repr=False, default=lambda key, value: None)
+
+    def publish(self, key: str, value: Any) -> None:
+        """중간 결과 게시 ('노드:키' 의존을 가진 후속 노드가 먼저 시작됨)"""
+        self._publish(key, value)
+
+
+@dataclass
+class Node:
+    """에이전트 호출 하나
+
+    depends_on의 항목은 노드 이름 또는 '노드:키'. 후자는 그 노드가
+    ctx.publish(키, 값)을 호출하는 즉시 충족되며, 이후 그 노드가 실패하면
+    먼저 시작한 후속 노드는 취소됨.
+    """
+    name: str
+    agent: str
+    run: Callable[[NodeContext], Any]
+    depends_on: Sequence[str] = ()
+    join: str = JOIN_ALL
+    succeeded: Callable[[Any], bool] = lambda output: True  # 출력 → 성공 여부
+    quorum: Optional[int] = None  # join="quorum"일 때 필요한 성공 수
+
+    def deps(self) -> List[Tuple[str, Optional[str]]]:
+        """(노드, 키) 목록"""
+        return [tuple(d.split(":", 1)) if ":" in d else (d, None) for d in self.depends_on]
+
+
+@dataclass
+class NodeResult:
+    """노드 실행 결과"""
+    name: str
+    status: str
+    output: Any = None
+    error: Optional[str] = None
+    started: Optional[float] = None
+    finished: Optional[float] = None
+
+    @property
+    def success(self) -> bool:
+        return self.status == SUCCEEDED
+
+    @property
+    def duration(self) -> Optional[float]:
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+class Pipeline:
+    """노드 집합 (생성 시 의존 관계와 순환 검사)"""
+
+    def __init__(self, nodes: Sequence[Node]):
+        self.nodes: Dict[str, Node] = {}
+        for node in nodes:
+            if node.name in self.nodes:
+                raise ValueError(f"Duplicate node: {node.name}")
+            if node.join not in JOIN_POLICIES:
+                raise ValueError(f"Unknown join policy for {node.name}: {node.join}")
+            if node.join == JOIN_QUORUM and not 1 <= (node.quorum or 0) <= len(node.depends_on):
+                raise ValueError(f"Invalid quorum for {node.name}: {node.quorum}")
+            self.nodes[node.name] = node
+        for node in nodes:
+            for dep, _ in node.deps():
+                if dep not in self.nodes:
+                    raise ValueError(f"{node.name} depends on unknown node {dep}")
+        self.order = self._toposort()
+
+    def _toposort(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1: 방문 중, 2: 완료
+
+        def visit(name: str) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Cycle detected at {name}")
+            state[name] = 1
+            for dep, _ in self.nodes[name].deps():
+                visit(dep)
+            state[name] = 2
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name)
+        return order
+
+    def dependents(self, name: str) -> Set[str]:
+        """name에 직간접적으로 의존하는 노드"""
+        found: Set[str] = set()
+        frontier = [name]
+        while frontier:
+            current = frontier.pop()
+            for node in self.nodes.values():
+                if node.name not in found and any(dep == current for dep, _ in node.deps()):
+                    found.add(node.name)
+                    frontier.append(node.name)
+        return found
+
+
+def load_pipeline(spec: Mapping[str, Any], actions: Mapping[str, Callable[..., Callable[[NodeContext], Any]]]) -> Pipeline:
+    """
+    선언형 정의(dict 또는 YAML을 읽은 결과)로 파이프라인 생성
+
+    Args:
+        spec: {"nodes": [{"name", "agent", "action", "depends_on", "join", "quorum", "params"}, ...]}
+        actions: action 이름 → params를 받아 노드 실행 함수를 돌려주는 팩토리
+
+    Returns:
+        Pipeline
+    """
+    nodes = []
+    for item in spec.get("nodes", []):
+        action = item.get("action", item["name"])
+        if action not in actions:
+            raise ValueError(f"Unknown action for {item['name']}: {action}")
+        nodes.append(Node(
+            name=item["name"],
+            agent=item.get("agent", item["name"]),
+            run=actions[action](**item.get("params", {})),
+            depends_on=tuple(item.get("depends_on", ())),
+            join=item.get("join", JOIN_ALL),
+            quorum=item.get("quorum")
+        ))
+    return Pipeline(nodes)
+
+
+def load_pipeline_file(path: str, actions: Mapping[str, Callable[..., Callable[[NodeContext], Any]]]) -> Pipeline:
+    """YAML 파일에서 파이프라인 생성 (PyYAML 필요)"""
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("PyYAML is required to load pipeline definitions from YAML")
+    with open(path, encoding="utf-8") as f:
+        return load_pipeline(yaml.safe_load(f) or {}, actions)
+
+
+class DagExecutor:
+    """준비된 노드를 에이전트별 동시 실행 제한 안에서 병렬 실행"""
+
+    def __init__(self, limits: Optional[Mapping[str, int]] = None, default_limit: int = 1,
+                 max_workers: int = 8):
+        """
+        Args:
+            limits: 에이전트 → 동시 실행 수
+            default_limit: limits에 없는 에이전트의 동시 실행 수
+            max_workers: 전체 스레드 수
+        """
+        self.limits = dict(limits or {})
+        self.default_limit = default_limit
+        self.max_workers = max_workers
+
+    def run(self, pipeline: Pipeline, inputs: Optional[Mapping[str, Any]] = None) -> Dict[str, NodeResult]:
+        """
+        파이프라인 실행
+
+        Args:
+            inputs: 선행 노드가 없는 노드에 전달할 입력 (ctx.inputs에 그대로 포함)
+
+        Returns:
+            노드 이름 → NodeResult (정의 순서)
+        """
+        lock = threading.Lock()
+        changed = threading.Event()
+        results: Dict[str, NodeResult] = {}
+        published: Dict[Tuple[str, str], Any] = {}
+        running: Dict[str, Tuple[Future, threading.Event]] = {}
+        early: Dict[str, Set[str]] = {}  # 노드 → 부분 출력으로 먼저 시작한 후속 노드
+        busy: Dict[str, int] = {}
+
+        def publisher(name: str) -> Callable[[str, Any], None]:
+            def publish(key: str, value: Any) -> None:
+                with lock:
+                    published[(name, key)] = value
+                changed.set()
+            return publish
+
+        def dep_state(dep: str, key: Optional[str]) -> Optional[str]:
+            """SUCCEEDED/FAILED, 아직이면 None"""
+            result = results.get(dep)
+            if result is not None:
+                return SUCCEEDED if result.success else FAILED
+            if key is not None and (dep, key) in published:
+                return SUCCEEDED
+            return None
+
+        def readiness(node: Node) -> Optional[str]:
+            """'run', 'skip', 또는 대기 중이면 None"""
+            states = [dep_state(dep, key) for dep, key in node.deps()]
+            if not states:
+                return "run"
+            if node.join == JOIN_ANY:
+                if SUCCEEDED in states:
+                    return "run"
+                return "skip" if all(s == FAILED for s in states) else None
+            if node.join == JOIN_QUORUM:
+                if states.count(SUCCEEDED) >= node.quorum:
+                    return "run"
+                return "skip" if len(states) - states.count(FAILED) < node.quorum else None
+            if None in states:
+                return None
+            if node.join == JOIN_ALL and FAILED in states:
+                return "skip"
+            return "run"
+
+        def node_inputs(node: Node) -> Dict[str, Any]:
+            values = dict(inputs or {})
+            for dep, key in node.deps():
+                result = results.get(dep)
+                if key is not None and (result is None or (dep, key) in published):
+                    values[dep] = published.get((dep, key))
+                elif result is not None:
+                    values[dep] = result.output if result.success else result
+            return values
+
+        def execute(node: Node, ctx: NodeContext) -> NodeResult:
+            started = time.time()
+            try:
+                output = node.run(ctx)
+            except Exception as e:
+                logger.warning(f"Node {node.name} raised: {e}")
+                return NodeResult(node.name, FAILED, error=str(e), started=started, finished=time.time())
+            if ctx.cancel.is_set():
+                status = CANCELLED
+            else:
+                status = SUCCEEDED if node.succeeded(output) else FAILED
+            return NodeResult(node.name, status, output=output, started=started, finished=time.time())
+
+        def cancel_early(name: str) -> None:
+            """실패한 노드의 부분 출력으로 먼저 시작한 후속 노드(와 그 후속) 취소"""
+            for started_early in early.get(name, ()):
+                for dependent in {started_early} | pipeline.dependents(started_early):
+                    if dependent in running:
+                        running[dependent][1].set()
+
+        def finished(_: Future) -> None:
+            changed.set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while True:
+                with lock:
+                    for name in pipeline.order:
+                        if name in results or name in running:
+                            continue
+                        node = pipeline.nodes[name]
+                        decision = readiness(node)
+                        if decision == "skip":
+                            results[name] = NodeResult(name, SKIPPED, error="dependency failed")
+                            continue
+                        if decision != "run":
+                            continue
+                        limit = self.limits.get(node.agent, self.default_limit)
+                        if busy.get(node.agent, 0) >= limit:
+                            continue
+                        busy[node.agent] = busy.get(node.agent, 0) + 1
+                        for dep, key in node.deps():
+                            if key is not None and dep not in results:
+                                early.setdefault(dep, set()).add(name)
+                        ctx = NodeContext(name, node_inputs(node), threading.Event(), publisher(name))
+                        future = pool.submit(execute, node, ctx)
+                        running[name] = (future, ctx.cancel)
+                        future.add_done_callback(finished)
+
+                    if len(results) == len(pipeline.nodes):
+                        break
+                    if not running:
+                        raise RuntimeError("Pipeline stalled with no runnable nodes")
+
+                # 노드 종료 또는 중간 결과 게시 시 다시 스케줄
+                changed.wait()
+                changed.clear()
+                with lock:
+                    for name, (future, _) in list(running.items()):
+                        if not future.done():
+                            continue
+                        running.pop(name)
+                        result = future.result()
+                        results[name] = result
+                        busy[pipeline.nodes[name].agent] -= 1
+                        if not result.success:
+                            cancel_early(name)
+
+        return {name: results[name] for name in pipeline.nodes}
@@ -0,0 +1,365 @@
+"""
+GitHub REST 클라이언트 - 연결 재사용, rate limit 준수, 비동기 쓰기 큐
+"""
+
+import atexit
+import http.client
+import json
+import logging
+import os
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+from core.retry import exponential_backoff_with_jitter
+
+logger = logging.getLogger(__name__)
+
+# 종료 시 남은 쓰기를 기다리는 최대 시간 (GitHub가 느려도 종료를 오래 막지 않음)
+EXIT_FLUSH_TIMEOUT = 2.0
+
+_LINK_NEXT = re.compile(r'<([^>]*)>\s*;\s*rel="next"')
+
+
+class GitHubError(RuntimeError):
+    """GitHub API 오류 응답"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(f"GitHub API {status}: {message}")
+        self.status = status
+
+
+class GitHubClient:
+    """GitHub REST API 클라이언트
+
+    요청마다 gh 프로세스를 띄우는 대신 하나의 keep-alive 연결을 재사용.
+    base_url을 바꾸면 테스트용 로컬 서버에도 그대로 사용 가능.
+    X-RateLimit-Remaining이 0이면 reset 시각까지 기다리고, 403/429
+    (secondary rate limit)는 Retry-After만큼 기다린 뒤 재시도.
+    """
+
+    def __init__(self, base_url: Optional[str] = None, token: Optional[str] = None,
+                 timeout: float = 30.0, max_retries: int = 3):
+        """
+        Args:
+            base_url: API 주소 (기본: GITHUB_API_URL, https://api.github.com)
+            token: 인증 토큰 (기본: GITHUB_TOKEN/GH_TOKEN, 없으면 `gh auth token`)
+            timeout: 요청 타임아웃 초
+            max_retries: rate limit/5xx/연결 오류 재시도 횟수
+        """
+        url = urlsplit(base_url or os.getenv("GITHUB_API_URL", "https://api.github.com"))
+        self._scheme = url.scheme
+        self._host = url.netloc
+        self._prefix = url.path.rstrip("/")
+        self._token = token
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._lock = threading.Lock()  # 연결 하나를 공유하므로 요청은 직렬화
+        self.rate_remaining: Optional[int] = None
+        self.rate_reset: Optional[float] = None
+
+    def _auth(self) -> Optional[str]:
+        if self._token is None:
+            self._token = os.getenv("GITHUB_TOKEN") or os.getenv("GH_TOKEN") or ""
+            if not self._token:
+                try:
+                    self._token = subprocess.run(
+                        ["gh", "auth", "token"], capture_output=True, text=True
+                    ).stdout.strip()
+                except OSError:
+                    pass
+        return self._token or None
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is None:
+            cls = http.client.HTTPSConnection if self._scheme == "https" else http.client.HTTPConnection
+            self._conn = cls(self._host, timeout=self.timeout)
+        return self._conn
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _wait_for_rate_limit(self) -> None:
+        if self.rate_remaining == 0 and self.rate_reset:
+            wait = self.rate_reset - time.time()
+            if wait > 0:
+                logger.warning(f"GitHub rate limit exhausted, waiting {wait:.0f}s")
+                time.sleep(wait)
+            self.rate_remaining = None
+
+    def request(self, method: str, path: str, body: Any = None,
+                headers: Optional[Mapping[str, str]] = None) -> Tuple[int, Dict[str, str], Any]:
+        """
+        API 요청
+
+        Args:
+            method: HTTP 메서드
+            path: 'repos/...' 형식 경로 (쿼리 포함 가능)
+            body: JSON으로 보낼 본문
+            headers: 추가 헤더 (예: If-None-Match)
+
+        Returns:
+            (상태 코드, 헤더(소문자 키), JSON 본문 또는 None)
+        """
+        send_headers = {
+            "Accept": "application/vnd.github+json",
+            "User-Agent": "ai-orchestra",
+            **(headers or {})
+        }
+        token = self._auth()
+        if token:
+            send_headers["Authorization"] = f"Bearer {token}"
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode()
+            send_headers["Content-Type"] = "application/json"
+        url = f"{self._prefix}/{path.lstrip('/')}"
+
+        for attempt in range(self.max_retries + 1):
+            self._wait_for_rate_limit()
+            with self._lock:
+                try:
+                    conn = self._connection()
+                    conn.request(method, url, body=payload, headers=send_headers)
+                    response = conn.getresponse()
+                    data = response.read()
+                except (http.client.HTTPException, OSError) as e:
+                    # 서버가 닫은 keep-alive 연결 등 → 새 연결로 재시도
+                    self._close()
+                    if attempt == self.max_retries:
+                        raise
+                    logger.debug(f"GitHub connection error ({e}), reconnecting")
+                    continue
+                if response.getheader("Connection", "").lower() == "close":
+                    self._close()
+            status = response.status
+            response_headers = {name.lower(): value for name, value in response.getheaders()}
+            if "x-ratelimit-remaining" in response_headers:
+                self.rate_remaining = int(response_headers["x-ratelimit-remaining"])
+                self.rate_reset = float(response_headers.get("x-ratelimit-reset", 0))
+
+            retry_after = response_headers.get("retry-after")
+            limited = status in (403, 429) and (retry_after is not None or self.rate_remaining == 0)
+            if attempt < self.max_retries and (limited or status >= 500):
+                if retry_after is not None:
+                    time.sleep(float(retry_after))
+                elif status >= 500:
+                    time.sleep(exponential_backoff_with_jitter(attempt))
+                continue
+            text = data.decode("utf-8", errors="replace")
+            try:
+                parsed = json.loads(text) if text else None
+            except ValueError:
+                parsed = text
+            return status, response_headers, parsed
+
+    def next_page(self, headers: Mapping[str, str]) -> Optional[str]:
+        """
+        Link 헤더의 다음 페이지 경로
+
+        Returns:
+            request()에 넘길 경로 (마지막 페이지면 None)
+        """
+        match = _LINK_NEXT.search(headers.get("link", ""))
+        if match is None:
+            return None
+        url = urlsplit(match.group(1))
+        path = url.path
+        if self._prefix and path.startswith(self._prefix + "/"):
+            path = path[len(self._prefix):]
+        return path.lstrip("/") + (f"?{url.query}" if url.query else "")
+
+    def _checked(self, method: str, path: str, body: Any = None, expect: Iterable[int] = (200,)) -> Any:
+        status, _, data = self.request(method, path, body)
+        if status not in expect:
+            message = data.get("message", "") if isinstance(data, dict) else str(data)
+            raise GitHubError(status, message)
+        return data
+
+    def get_issue(self, repo: str, number: int) -> Dict[str, Any]:
+        """이슈 조회"""
+        return self._checked("GET", f"repos/{repo}/issues/{number}")
+
+    def create_comment(self, repo: str, number: int, body: str) -> int:
+        """
+        이슈 코멘트 작성
+
+        Returns:
+            코멘트 ID
+        """
+        return self._checked("POST", f"repos/{repo}/issues/{number}/comments", {"body": body}, (201,))["id"]
+
+    def find_comment(self, repo: str, number: int, marker: str) -> Optional[int]:
+        """
+        본문에 marker가 들어 있는 이슈 코멘트 찾기 (모든 페이지 조회)
+
+        Returns:
+            코멘트 ID 또는 None
+        """
+        path: Optional[str] = f"repos/{repo}/issues/{number}/comments?per_page=100"
+        while path:
+            status, headers, data = self.request("GET", path)
+            if status != 200:
+                message = data.get("message", "") if isinstance(data, dict) else str(data)
+                raise GitHubError(status, message)
+            for comment in data or []:
+                if marker in (comment.get("body") or ""):
+                    return comment["id"]
+            path = self.next_page(headers)
+        return None
+
+    def update_comment(self, repo: str, comment_id: int, body: str) -> None:
+        """코멘트 수정"""
+        self._checked("PATCH", f"repos/{repo}/issues/comments/{comment_id}", {"body": body})
+
+    def add_labels(self, repo: str, number: int, labels: Iterable[str]) -> None:
+        """라벨 추가 (여러 개를 한 요청으로)"""
+        self._checked("POST", f"repos/{repo}/issues/{number}/labels", {"labels": list(labels)})
+
+    def close(self) -> None:
+        with self._lock:
+            self._close()
+
+
+def progress_marker(key: str) -> str:
+    """진행 코멘트를 찾는 데 쓰는 숨은 marker (렌더링되지 않는 HTML 주석)"""
+    return f"<!-- ai-orchestra:progress:{key} -->"
+
+
+class GitHubWriter:
+    """GitHub 쓰기 작업을 백그라운드 스레드에서 처리하는 큐
+
+    호출자는 큐에 넣고 바로 반환하므로 파이프라인이 GitHub 응답을 기다리지 않음.
+    아직 보내지 않은 같은 진행 코멘트 수정은 마지막 내용 하나로, 같은 이슈의
+    라벨 추가는 한 요청으로 합침. 쓰기 사이에는 min_interval만큼 간격을 둠
+    (GitHub secondary rate limit 권장). 실패는 로그만 남기고 계속 진행.
+    진행 코멘트에는 숨은 marker를 넣어, 이 프로세스가 아직 모르는 코멘트면
+    (재시작/requeue 후) 이슈에서 찾아 새로 만들지 않고 수정.
+    """
+
+    def __init__(self, client: Optional[GitHubClient] = None, min_interval: Optional[float] = None):
+        """
+        Args:
+            client: API 클라이언트 (기본: 새 GitHubClient)
+            min_interval: 쓰기 요청 간 최소 간격 초 (기본: GITHUB_WRITE_INTERVAL, 1.0)
+        """
+        self.client = client or GitHubClient()
+        self.min_interval = (min_interval if min_interval is not None
+                             else float(os.getenv("GITHUB_WRITE_INTERVAL", "1.0")))
+        self.errors = 0
+        self._ops: Deque[Dict[str, Any]] = deque()
+        self._busy = False
+        self._cond = threading.Condition()
+        self._comment_ids: Dict[Tuple[str, int, str], int] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._last_write = 0.0
+        atexit.register(self._flush_at_exit)
+
+    def _put(self, op: Dict[str, Any]) -> None:
+        """같은 대상의 대기 작업이 있으면 합치고, 없으면 큐 끝에 추가 (호출자가 _cond 보유)"""
+        for queued in self._ops:
+            if queued["kind"] == op["kind"] == "progress" and queued["target"] == op["target"]:
+                queued["body"] = op["body"]
+                return
+            if queued["kind"] == op["kind"] == "labels" and queued["target"] == op["target"]:
+                queued["labels"] += [label for label in op["labels"] if label not in queued["labels"]]
+                return
+        self._ops.append(op)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="github-writer", daemon=True)
+            self._thread.start()
+        self._cond.notify_all()
+
+    def comment(self, repo: str, number: int, body: str) -> None:
+        """새 코멘트 작성"""
+        with self._cond:
+            self._put({"kind": "comment", "target": (repo, number), "body": body})
+
+    def progress(self, repo: str, number: int, key: str, body: str) -> None:
+        """
+        진행 코멘트 갱신 (key마다 코멘트 하나를 만들고 이후에는 수정)
+
+        Args:
+            key: 같은 이슈에서 진행 코멘트를 구분하는 이름
+            body: 코멘트 전체 내용
+        """
+        with self._cond:
+            self._put({"kind": "progress", "target": (repo, number, key), "body": body})
+
+    def add_labels(self, repo: str, number: int, labels: Iterable[str]) -> None:
+        """라벨 추가"""
+        with self._cond:
+            self._put({"kind": "labels", "target": (repo, number), "labels": list(labels)})
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        대기 중인 쓰기가 모두 끝날 때까지 대기
+
+        Returns:
+            timeout 안에 끝났으면 True
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._ops and not self._busy, timeout)
+
+    def _flush_at_exit(self) -> None:
+        if not self.flush(EXIT_FLUSH_TIMEOUT):
+            with self._cond:
+                pending = len(self._ops) + self._busy
+            logger.warning(f"GitHub writer exiting with {pending} write(s) not sent")
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._ops)
+                op = self._ops.popleft()
+                self._busy = True
+            wait = self._last_write + self.min_interval - time.time()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                self._apply(op)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"GitHub {op['kind']} for {op['target']} failed: {e}")
+            self._last_write = time.time()
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _apply(self, op: Dict[str, Any]) -> None:
+        kind, target = op["kind"], op["target"]
+        if kind == "comment":
+            self.client.create_comment(target[0], target[1], op["body"])
+        elif kind == "labels":
+            self.client.add_labels(target[0], target[1], op["labels"])
+        else:
+            repo, number, key = target
+            marker = progress_marker(key)
+            body = f"{op['body']}\n\n{marker}"
+            if target not in self._comment_ids:
+                comment_id = self.client.find_comment(repo, number, marker)
+                if comment_id is None:
+                    self._comment_ids[target] = self.client.create_comment(repo, number, body)
+                    return
+                self._comment_ids[target] = comment_id
+            self.client.update_comment(repo, self._comment_ids[target], body)
+
+
+_default_writer: Optional[GitHubWriter] = None
+_default_lock = threading.Lock()
+
+
+def default_writer() -> GitHubWriter:
+    """프로세스에서 공유하는 쓰기 큐 (연결 하나를 모든 시스템이 재사용)"""
+    global _default_writer
+    with _default_lock:
+        if _default_writer is None:
+            _default_writer = GitHubWriter()
+        return _default_writer
@@ -0,0 +1,123 @@
+"""
+3-Step Handshake 상태 머신 - ACK→RUN→EOT를 한 번의 스캔으로 진행
+"""
+
+import time
+from typing import Callable, Dict, Iterable, Optional
+
+from .protocol import Ack, Run, Eot, match_token
+
+
+class HandshakeTracker:
+    """단일 패스 핸드셰이크 상태 머신
+
+    들어오는 줄을 한 번씩만 검사하면서 ACK→RUN→EOT 순서로 진행.
+    한 버스트에 세 토큰이 모두 들어오면 한 번의 feed로 완료됨.
+    단계별 마감 시간은 직전 단계 도달 시점부터 계산.
+    """
+
+    PHASES = ("ACK", "RUN", "EOT")
+    _TOKEN_TYPES = {"ACK": Ack, "RUN": Run, "EOT": Eot}
+
+    def __init__(
+        self,
+        task_id: str,
+        timeout_ack: float = 5,
+        timeout_run: float = 10,
+        timeout_eot: float = 30,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Args:
+            task_id: 추적할 작업 ID
+            timeout_ack: 전송 후 ACK까지 허용 시간 (초)
+            timeout_run: ACK 후 RUN까지 허용 시간 (초)
+            timeout_eot: RUN 후 EOT까지 허용 시간 (초)
+            clock: 시간 함수 (테스트용)
+        """
+        self.task_id = task_id
+        self.timeouts = {"ACK": timeout_ack, "RUN": timeout_run, "EOT": timeout_eot}
+        self._clock = clock
+        self._index = 0
+        self.status: Optional[str] = None
+        self.timestamps: Dict[str, float] = {}
+        self.deadline: Optional[float] = None
+
+    @property
+    def phase(self) -> Optional[str]:
+        """현재 대기 중인 단계 (완료 시 None)"""
+        return self.PHASES[self._index] if self._index < len(self.PHASES) else None
+
+    @property
+    def done(self) -> bool:
+        """EOT까지 도달 여부"""
+        return self.phase is None
+
+    def start(self, now: Optional[float] = None) -> None:
+        """명령 전송 시점 기록 및 ACK 마감 설정"""
+        now = self._clock() if now is None else now
+        self.timestamps["send"] = now
+        self.deadline = now + self.timeouts["ACK"]
+
+    def remaining(self, now: Optional[float] = None) -> float:
+        """현재 단계 마감까지 남은 시간 (초)"""
+        if self.deadline is None:
+            self.start(now)
+        now = self._clock() if now is None else now
+        return max(self.deadline - now, 0.0)
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        """현재 단계 마감 초과 여부"""
+        return not self.done and self.remaining(now) <= 0
+
+    def feed(self, line: str, now: Optional[float] = None) -> Optional[str]:
+        """
+        한 줄 처리
+
+        Returns:
+            이 줄로 도달한 단계 (없으면 None)
+        """
+        phase = self.phase
+        if phase is None:
+            return None
+
+        parsed = match_token(line)
+        if not isinstance(parsed, self._TOKEN_TYPES[phase]) or parsed.id != self.task_id:
+            return None
+
+        now = self._clock() if now is None else now
+        self.timestamps[phase.lower()] = now
+        if phase == "EOT":
+            self.status = parsed.status
+        self._index += 1
+        if self.phase is not None:
+            self.deadline = now + self.timeouts[self.phase]
+        return phase
+
+    def feed_lines(self, lines: Iterable[str], now: Optional[float] = None) -> list:
+        """
+        여러 줄을 순서대로 처리
+
+        Returns:
+            이번 호출에서 도달한 단계 목록
+        """
+        reached = []
+        for line in lines:
+            phase = self.feed(line, now)
+            if phase:
+                reached.append(phase)
+                if self.done:
+                    break
+        return reached
+
+    def phase_durations(self) -> Dict[str, float]:
+        """단계별 소요 시간 (초) - send→ACK, ACK→RUN, RUN→EOT"""
+        durations = {}
+        previous = self.timestamps.get("send")
+        for phase in self.PHASES:
+            ts = self.timestamps.get(phase.lower())
+            if ts is None or previous is None:
+                break
+            durations[phase.lower()] = ts - previous
+            previous = ts
+        return durations
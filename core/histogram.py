@@ -0,0 +1,76 @@
+"""
+로그 버킷 지연 시간 히스토그램 - 병합 가능한 압축 표현
+"""
+
+import math
+from typing import Dict, Iterable, Mapping, Optional
+
+# 버킷 폭 비율 (버킷 대표값 기준 상대 오차 약 5%)
+GROWTH = 1.1
+_LOG_GROWTH = math.log(GROWTH)
+
+
+def bin_of(value_ms: float) -> int:
+    """값(ms) → 버킷 번호 (0: 1ms 미만)"""
+    if value_ms < 1:
+        return 0
+    return int(math.log(value_ms) / _LOG_GROWTH) + 1
+
+
+def bin_value(index: int) -> float:
+    """버킷 대표값(ms) - 구간 [GROWTH^(i-1), GROWTH^i)의 기하 평균"""
+    if index <= 0:
+        return 0.0
+    return GROWTH ** (index - 0.5)
+
+
+class LogHistogram:
+    """로그 버킷 히스토그램
+
+    버킷 번호 → 개수만 저장하므로 1ms~1시간 범위도 160개 이하 버킷.
+    같은 GROWTH를 쓰는 히스토그램끼리는 개수를 더하기만 하면 병합됨.
+    """
+
+    def __init__(self, counts: Optional[Mapping[int, int]] = None):
+        self.counts: Dict[int, int] = dict(counts or {})
+
+    @property
+    def total(self) -> int:
+        """기록된 값 개수"""
+        return sum(self.counts.values())
+
+    def add(self, value_ms: float, count: int = 1) -> None:
+        """값 기록"""
+        index = bin_of(value_ms)
+        self.counts[index] = self.counts.get(index, 0) + count
+
+    def merge(self, other: "LogHistogram") -> "LogHistogram":
+        """다른 히스토그램 병합 (자기 자신 반환)"""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        return self
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        백분위 값(ms) 추정
+
+        Args:
+            p: 0~100 사이 백분위
+
+        Returns:
+            해당 백분위가 속한 버킷의 대표값 (비어 있으면 None)
+        """
+        total = self.total
+        if total == 0:
+            return None
+        rank = max(1, math.ceil(total * p / 100.0))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return bin_value(index)
+        return bin_value(max(self.counts))
+
+    def percentiles(self, ps: Iterable[float] = (50, 95, 99)) -> Dict[str, Optional[float]]:
+        """여러 백분위를 {'p50': ..., 'p95': ...} 형태로 반환"""
+        return {f"p{p:g}": self.percentile(p) for p in ps}
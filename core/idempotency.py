@@ -1,33 +1,378 @@
-from typing import Any, Dict
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from core.types import HandshakeResult
+
+# claim() 결과 상태
+CLAIMED = "claimed"   # 호출자가 실행 권한을 얻음
+DONE = "done"         # 이미 완료됨 (저장된 결과 반환)
+PENDING = "pending"   # 다른 작업자가 실행 중
+FAILED = "failed"     # 최근 실패 (negative cache, 짧은 TTL 동안 재실행 억제)
+
+
+def _dumps(value: Any) -> str:
+    """JSON 직렬화 (HandshakeResult 지원)"""
+    if isinstance(value, HandshakeResult):
+        return json.dumps({"__handshake_result__": asdict(value)})
+    return json.dumps(value)
+
+
+def _loads(text: str) -> Any:
+    value = json.loads(text)
+    if isinstance(value, dict) and "__handshake_result__" in value:
+        return HandshakeResult(**value["__handshake_result__"])
+    return value
+
+
+class SQLiteIdempotencyStore:
+    """SQLite 기반 영속 멱등성 저장소 - CLI 실행 간/프로세스 간 공유
+
+    완료 결과는 ttl 동안 보존하고, max_entries를 넘으면 가장 오래 조회되지
+    않은 항목부터 삭제(LRU). claim()은 BEGIN IMMEDIATE 트랜잭션으로
+    "없으면 선점, 있으면 조회"를 원자적으로 처리. 값은 JSON으로 저장.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None, lease: float = 600.0):
+        """
+        Args:
+            path: SQLite 파일 경로 (기본: IDEMPOTENCY_DB, var/idempotency.sqlite)
+            ttl: 완료 결과 보존 시간 초 (기본: IDEMPOTENCY_TTL_S, 86400)
+            max_entries: 최대 항목 수 (기본: IDEMPOTENCY_MAX_ENTRIES, 10000)
+            lease: 실행 중 선점의 만료 시간 초 (작업자 비정상 종료 대비)
+        """
+        path = path or os.getenv("IDEMPOTENCY_DB", "var/idempotency.sqlite")
+        self.ttl = ttl if ttl is not None else float(os.getenv("IDEMPOTENCY_TTL_S", "86400"))
+        self.max_entries = max_entries or int(os.getenv("IDEMPOTENCY_MAX_ENTRIES", "10000"))
+        self.lease = lease
+
+        Path(os.path.dirname(path) or ".").mkdir(parents=True, exist_ok=True)
+        # 트랜잭션은 직접 관리 (claim의 BEGIN IMMEDIATE)
+        self.db = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS idempotency (
+                key TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                value TEXT,
+                expires REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_idem_access ON idempotency(last_access);
+        """)
+
+    def _row(self, key: str, now: float) -> Optional[Tuple[str, Any]]:
+        row = self.db.execute(
+            "SELECT state, value FROM idempotency WHERE key = ? AND expires > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        state, value = row
+        return state, _loads(value) if value is not None else None
+
+    def get(self, key: str) -> Any:
+        """완료된 결과 조회 (없거나 만료/실행 중이면 None)"""
+        now = time.time()
+        with self._lock:
+            row = self._row(key, now)
+            if row is None or row[0] != DONE:
+                return None
+            self.db.execute("UPDATE idempotency SET last_access = ? WHERE key = ?", (now, key))
+            return row[1]
+
+    def exists(self, key: str) -> bool:
+        """완료된 결과 존재 여부"""
+        with self._lock:
+            row = self._row(key, time.time())
+        return row is not None and row[0] == DONE
+
+    def save(self, key: str, value: Any, ttl: Optional[float] = None,
+             state: str = DONE) -> None:
+        """결과 저장 (실행 중 선점도 완료로 전환, state=FAILED면 실패 기록)"""
+        now = time.time()
+        expires = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self.db.execute(
+                    "REPLACE INTO idempotency (key, state, value, expires, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, state, _dumps(value), expires, now)
+                )
+                self._evict(now)
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+
+    def claim(self, key: str, lease: Optional[float] = None) -> Tuple[str, Any]:
+        """
+        원자적 선점 또는 조회
+
+        Args:
+            key: 멱등키 (task_id)
+            lease: 선점 유지 시간 초 (기본: self.lease)
+
+        Returns:
+            (CLAIMED, None): 호출자가 실행해야 함 (끝나면 save 또는 release)
+            (DONE, 결과): 이미 완료됨
+            (FAILED, 결과): 최근 실패 (negative cache)
+            (PENDING, None): 다른 작업자가 실행 중
+        """
+        now = time.time()
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._row(key, now)
+                if row is None:
+                    self.db.execute(
+                        "REPLACE INTO idempotency (key, state, value, expires, last_access) "
+                        "VALUES (?, ?, NULL, ?, ?)",
+                        (key, PENDING, now + (self.lease if lease is None else lease), now)
+                    )
+                    result = (CLAIMED, None)
+                elif row[0] in (DONE, FAILED):
+                    self.db.execute("UPDATE idempotency SET last_access = ? WHERE key = ?", (now, key))
+                    result = row
+                else:
+                    result = (PENDING, None)
+                self.db.execute("COMMIT")
+                return result
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+
+    def release(self, key: str) -> None:
+        """실행 중 선점 해제 (실패 시 다른 작업자가 다시 실행할 수 있도록)"""
+        with self._lock:
+            self.db.execute("DELETE FROM idempotency WHERE key = ? AND state = ?", (key, PENDING))
+
+    def _evict(self, now: float) -> None:
+        """만료 항목 삭제 후 max_entries 초과분을 LRU 순으로 삭제"""
+        self.db.execute("DELETE FROM idempotency WHERE expires <= ?", (now,))
+        excess = self.db.execute("SELECT COUNT(*) FROM idempotency").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self.db.execute("""
+                DELETE FROM idempotency WHERE key IN (
+                    SELECT key FROM idempotency WHERE state != ?
+                    ORDER BY last_access LIMIT ?)
+            """, (PENDING, excess))
+
+    def clear(self) -> None:
+        """모든 항목 삭제 (테스트용)"""
+        with self._lock:
+            self.db.execute("DELETE FROM idempotency")
+
+    def close(self) -> None:
+        with self._lock:
+            self.db.close()
 
 
 class IdempotencyManager:
-    """멱등성 관리자 - 중복 실행 방지"""
-    
-    def __init__(self):
-        self._cache: Dict[str, Any] = {}
-    
+    """멱등성 관리자 - 중복 실행 방지
+
+    backend가 없으면 프로세스 내 dict만 사용. backend(예: SQLiteIdempotencyStore)가
+    있으면 dict는 조회를 빠르게 하는 앞단 캐시가 되고, 저장/선점은 backend에 위임.
+    execute_once()는 같은 키의 동시 실행을 하나로 합침 (single-flight).
+    """
+
+    def __init__(self, backend: Optional[SQLiteIdempotencyStore] = None,
+                 max_size: int = 1024, negative_ttl: Optional[float] = None):
+        """
+        Args:
+            backend: 영속 저장소 (None이면 메모리 전용)
+            max_size: backend 사용 시 앞단 캐시 최대 항목 수
+            negative_ttl: 실패 결과 재사용 시간 초 (기본: IDEMPOTENCY_NEGATIVE_TTL_S, 5; 0이면 비활성)
+        """
+        self.backend = backend
+        self.max_size = max_size
+        self.negative_ttl = (negative_ttl if negative_ttl is not None
+                             else float(os.getenv("IDEMPOTENCY_NEGATIVE_TTL_S", "5")))
+        self._failures: Dict[str, Tuple[Any, float]] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._cache: Dict[str, Any] = OrderedDict()
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._pending: set = set()  # 메모리 전용 모드의 실행 중 선점
+
+    def _cached(self, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            if key not in self._cache:
+                return False, None
+            expires = self._expires.get(key)
+            if expires is not None and expires <= time.time():
+                del self._cache[key]
+                del self._expires[key]
+                return False, None
+            self._cache.move_to_end(key)
+            return True, self._cache[key]
+
+    def _remember(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            self._pending.discard(key)
+            self._failures.pop(key, None)
+            if self.backend is not None:
+                self._expires[key] = time.time() + self.backend.ttl
+                while len(self._cache) > self.max_size:
+                    old_key, _ = self._cache.popitem(last=False)
+                    self._expires.pop(old_key, None)
+
     def exists(self, key: str) -> bool:
         """키가 이미 존재하는지 확인"""
-        return key in self._cache
-    
+        if self._cached(key)[0]:
+            return True
+        return self.backend is not None and self.backend.exists(key)
+
     def get(self, key: str) -> Any:
         """저장된 결과 가져오기"""
-        return self._cache.get(key)
-    
+        hit, value = self._cached(key)
+        if hit or self.backend is None:
+            return value
+        value = self.backend.get(key)
+        if value is not None:
+            self._remember(key, value)
+        return value
+
     def save(self, key: str, value: Any) -> None:
         """결과 저장"""
-        self._cache[key] = value
-    
+        if self.backend is not None:
+            self.backend.save(key, value)
+        self._remember(key, value)
+
+    def claim(self, key: str, lease: Optional[float] = None) -> Tuple[str, Any]:
+        """
+        실행 권한 선점 또는 완료 결과 조회 (원자적)
+
+        Returns:
+            (CLAIMED, None) / (DONE, 결과) / (FAILED, 결과) / (PENDING, None)
+        """
+        hit, value = self._cached(key)
+        if hit:
+            return DONE, value
+        with self._lock:
+            failure = self._failures.get(key)
+            if failure is not None:
+                if failure[1] > time.time():
+                    return FAILED, failure[0]
+                del self._failures[key]
+        if self.backend is not None:
+            state, value = self.backend.claim(key, lease)
+            if state == DONE:
+                self._remember(key, value)
+            return state, value
+        with self._lock:
+            if key in self._pending:
+                return PENDING, None
+            self._pending.add(key)
+            return CLAIMED, None
+
+    def release(self, key: str) -> None:
+        """실행 중 선점 해제 (실행 실패 시)"""
+        with self._lock:
+            self._pending.discard(key)
+        if self.backend is not None:
+            self.backend.release(key)
+
+    def save_failure(self, key: str, value: Any) -> None:
+        """실패 결과를 negative_ttl 동안 기록 (그동안 claim은 FAILED 반환)"""
+        if self.negative_ttl <= 0:
+            self.release(key)
+            return
+        with self._lock:
+            self._failures[key] = (value, time.time() + self.negative_ttl)
+            self._pending.discard(key)
+        if self.backend is not None:
+            self.backend.save(key, value, ttl=self.negative_ttl, state=FAILED)
+
+    def execute_once(self, key: str, fn: Callable[[], Any], lease: Optional[float] = None,
+                     wait_timeout: Optional[float] = None, poll_interval: float = 0.2) -> Any:
+        """
+        single-flight 실행
+
+        같은 키가 이 프로세스에서 실행 중이면 그 Future에 합류하고, 다른
+        프로세스가 선점 중이면 완료될 때까지 backend를 폴링. 완료/최근 실패
+        결과가 있으면 fn 없이 그대로 반환. fn 결과가 참(HandshakeResult.success)이면
+        저장, 거짓이면 negative cache.
+
+        Args:
+            key: 멱등키 (task_id)
+            fn: 실제 실행 함수 (인자 없음)
+            lease: 선점 유지 시간 초
+            wait_timeout: 다른 실행을 기다릴 최대 시간 초 (None이면 무제한)
+            poll_interval: 다른 프로세스 실행 확인 간격 초
+
+        Raises:
+            TimeoutError: wait_timeout 안에 다른 실행이 끝나지 않은 경우
+        """
+        with self._lock:
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+        if not leader:
+            return flight.result(timeout=wait_timeout)
+
+        deadline = None if wait_timeout is None else time.time() + wait_timeout
+        try:
+            state, value = self.claim(key, lease)
+            while state == PENDING:
+                if deadline is not None and time.time() >= deadline:
+                    raise TimeoutError(f"Task {key} is still running elsewhere")
+                time.sleep(poll_interval)
+                state, value = self.claim(key, lease)
+
+            if state == CLAIMED:
+                try:
+                    value = fn()
+                except BaseException:
+                    self.release(key)
+                    raise
+                if value:
+                    self.save(key, value)
+                else:
+                    self.save_failure(key, value)
+            flight.set_result(value)
+            return value
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
     def clear(self) -> None:
         """캐시 초기화 (테스트용)"""
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            self._expires.clear()
+            self._pending.clear()
+            self._failures.clear()
+        if self.backend is not None:
+            self.backend.clear()
 
 
-# 편의를 위한 전역 인스턴스
+# 편의를 위한 전역 인스턴스 (기본은 메모리 전용)
 _default_manager = IdempotencyManager()
 
 
+def configure_default(backend: Optional[SQLiteIdempotencyStore]) -> IdempotencyManager:
+    """전역 관리자 교체 (예: CLI 시작 시 영속 저장소 사용)"""
+    global _default_manager
+    _default_manager = IdempotencyManager(backend)
+    return _default_manager
+
+
 def check_duplicate(key: str) -> bool:
     """중복 체크 헬퍼"""
     return _default_manager.exists(key)
@@ -40,4 +385,19 @@ def save_result(key: str, value: Any) -> None:
 
 def get_cached_result(key: str) -> Any:
     """캐시된 결과 가져오기"""
-    return _default_manager.get(key)
\ No newline at end of file
+    return _default_manager.get(key)
+
+
+def claim_task(key: str, lease: Optional[float] = None) -> Tuple[str, Any]:
+    """실행 권한 선점 헬퍼"""
+    return _default_manager.claim(key, lease)
+
+
+def release_task(key: str) -> None:
+    """선점 해제 헬퍼"""
+    _default_manager.release(key)
+
+
+def save_failure(key: str, value: Any) -> None:
+    """실패 결과 negative cache 헬퍼"""
+    _default_manager.save_failure(key, value)
@@ -0,0 +1,490 @@
+"""
+이슈 접수 - 웹훅 수신 → 영속 작업 큐 → 처리, 폴링은 조건부 요청 fallback
+"""
+
+import hashlib
+import hmac
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+from urllib.parse import urlencode
+
+from core.github_client import GitHubClient, default_writer
+from core.issue_cache import IssueCache
+
+logger = logging.getLogger(__name__)
+
+# 큐 항목 상태
+QUEUED = "queued"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class QueuedIssue:
+    """큐에서 꺼낸 이슈"""
+    consumer: str
+    repo: str
+    number: int
+    label: Optional[str]
+    attempts: int
+
+
+class IssueQueue:
+    """SQLite 기반 영속 이슈 작업 큐
+
+    (consumer, repo, number)마다 한 행. 처리 완료(done)/실패(failed) 행이
+    남아 있으므로 재시작해도 같은 이슈를 다시 넣거나 처리하지 않음.
+    처리 중(processing) 항목은 lease가 지나면 다시 꺼낼 수 있음 (작업자 비정상 종료 대비).
+    꺼내는 순서는 (repo, label) 그룹 간 공정 순환: 처리 중인 항목이 적은 그룹,
+    그다음 가장 오래전에 꺼낸 그룹의 가장 오래된 항목. 한 라벨/저장소에 이슈가
+    몰려도 다른 그룹이 밀리지 않음.
+    조건부 폴링의 ETag/since도 같은 파일에 보관.
+    """
+
+    def __init__(self, path: Optional[str] = None, lease: float = 3600.0):
+        """
+        Args:
+            path: SQLite 파일 경로 (기본: INTAKE_DB, var/intake.sqlite)
+            lease: 처리 중 항목을 다시 꺼낼 수 있을 때까지의 시간 초
+        """
+        path = path or os.getenv("INTAKE_DB", "var/intake.sqlite")
+        self.lease = lease
+        Path(os.path.dirname(path) or ".").mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._served: Dict[Tuple[str, str, str], int] = {}  # (consumer, repo, label) → 마지막으로 꺼낸 순번
+        self._turn = itertools.count(1)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS issue_queue (
+                consumer TEXT NOT NULL,
+                repo TEXT NOT NULL,
+                number INTEGER NOT NULL,
+                label TEXT,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                enqueued REAL NOT NULL,
+                updated REAL NOT NULL,
+                lease_until REAL,
+                PRIMARY KEY (consumer, repo, number)
+            );
+            CREATE INDEX IF NOT EXISTS idx_queue_state ON issue_queue(consumer, state, enqueued);
+            CREATE TABLE IF NOT EXISTS poll_state (
+                key TEXT PRIMARY KEY,
+                etag TEXT,
+                since TEXT
+            );
+        """)
+
+    def enqueue(self, consumer: str, repo: str, number: int, label: Optional[str] = None) -> bool:
+        """
+        이슈를 큐에 추가
+
+        Returns:
+            새로 추가되었으면 True (이미 대기/처리/완료된 이슈면 False)
+        """
+        now = time.time()
+        with self._ready:
+            cursor = self.db.execute(
+                "INSERT OR IGNORE INTO issue_queue (consumer, repo, number, label, state, enqueued, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (consumer, repo, int(number), label, QUEUED, now, now)
+            )
+            added = cursor.rowcount == 1
+            if added:
+                self._ready.notify_all()
+        return added
+
+    def claim(self, consumer: str, timeout: Optional[float] = None,
+              cancel: Optional[threading.Event] = None) -> Optional[QueuedIssue]:
+        """
+        다음 대기 항목을 처리 중으로 바꾸고 반환
+
+        Args:
+            timeout: 빈 큐에서 기다릴 시간 초 (None이면 기다리지 않음).
+                다른 프로세스가 넣은 항목은 최대 1초 간격으로 확인.
+            cancel: 설정되면 (wake() 후) 기다리지 않고 None 반환
+
+        Returns:
+            QueuedIssue 또는 None
+        """
+        deadline = time.time() + (timeout or 0)
+        with self._ready:
+            while True:
+                item = self._claim(consumer)
+                remaining = deadline - time.time()
+                if item is not None or remaining <= 0 or (cancel is not None and cancel.is_set()):
+                    return item
+                self._ready.wait(min(remaining, 1.0))
+
+    def wake(self) -> None:
+        """claim에서 대기 중인 스레드를 깨움"""
+        with self._ready:
+            self._ready.notify_all()
+
+    def _claim(self, consumer: str) -> Optional[QueuedIssue]:
+        now = time.time()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            # 그룹별 가장 오래된 대기 항목 (SQLite는 MIN()과 같은 행의 나머지 열을 반환)
+            heads = self.db.execute(
+                "SELECT repo, IFNULL(label, ''), MIN(enqueued), number, label, attempts FROM issue_queue "
+                "WHERE consumer = ? AND (state = ? OR (state = ? AND lease_until <= ?)) "
+                "GROUP BY repo, IFNULL(label, '')",
+                (consumer, QUEUED, PROCESSING, now)
+            ).fetchall()
+            row = None
+            if heads:
+                active = {
+                    (repo, label): count for repo, label, count in self.db.execute(
+                        "SELECT repo, IFNULL(label, ''), COUNT(*) FROM issue_queue "
+                        "WHERE consumer = ? AND state = ? AND lease_until > ? GROUP BY repo, IFNULL(label, '')",
+                        (consumer, PROCESSING, now)
+                    )
+                }
+                head = min(heads, key=lambda h: (
+                    active.get((h[0], h[1]), 0), self._served.get((consumer, h[0], h[1]), 0), h[2]
+                ))
+                self._served[(consumer, head[0], head[1])] = next(self._turn)
+                row = (head[0], head[3], head[4], head[5])
+            if row is not None:
+                self.db.execute(
+                    "UPDATE issue_queue SET state = ?, attempts = attempts + 1, updated = ?, lease_until = ? "
+                    "WHERE consumer = ? AND repo = ? AND number = ?",
+                    (PROCESSING, now, now + self.lease, consumer, row[0], row[1])
+                )
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return QueuedIssue(consumer, row[0], row[1], row[2], row[3] + 1)
+
+    def _finish(self, item: QueuedIssue, state: str) -> None:
+        with self._lock:
+            self.db.execute(
+                "UPDATE issue_queue SET state = ?, updated = ?, lease_until = NULL "
+                "WHERE consumer = ? AND repo = ? AND number = ?",
+                (state, time.time(), item.consumer, item.repo, item.number)
+            )
+
+    def complete(self, item: QueuedIssue) -> None:
+        """처리 완료 기록 (이후 같은 이슈는 다시 큐에 들어가지 않음)"""
+        self._finish(item, DONE)
+
+    def fail(self, item: QueuedIssue) -> None:
+        """처리 실패 기록 (requeue 전까지 다시 처리하지 않음)"""
+        self._finish(item, FAILED)
+
+    def requeue(self, consumer: str, repo: str, number: int) -> None:
+        """완료/실패한 이슈를 다시 대기 상태로"""
+        with self._ready:
+            self.db.execute(
+                "UPDATE issue_queue SET state = ?, enqueued = ?, updated = ?, lease_until = NULL "
+                "WHERE consumer = ? AND repo = ? AND number = ?",
+                (QUEUED, time.time(), time.time(), consumer, repo, int(number))
+            )
+            self._ready.notify_all()
+
+    def state(self, consumer: str, repo: str, number: int) -> Optional[str]:
+        """이슈 상태 (큐에 없으면 None)"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT state FROM issue_queue WHERE consumer = ? AND repo = ? AND number = ?",
+                (consumer, repo, int(number))
+            ).fetchone()
+        return row[0] if row else None
+
+    def pending(self, consumer: str) -> int:
+        """대기 중인 항목 수"""
+        with self._lock:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM issue_queue WHERE consumer = ? AND state = ?", (consumer, QUEUED)
+            ).fetchone()[0]
+
+    def stats(self, consumer: str, window: float = 600.0) -> Dict[str, float]:
+        """
+        큐 현황
+
+        Args:
+            window: 처리 속도 계산 구간 초
+
+        Returns:
+            {"backlog": 대기 수, "processing": 처리 중 수,
+             "finished": 구간 내 완료+실패 수, "drain_per_min": 분당 처리 수}
+        """
+        now = time.time()
+        with self._lock:
+            backlog, processing, finished = self.db.execute(
+                "SELECT SUM(state = ?), SUM(state = ? AND lease_until > ?), SUM(state IN (?, ?) AND updated > ?) "
+                "FROM issue_queue WHERE consumer = ?",
+                (QUEUED, PROCESSING, now, DONE, FAILED, now - window, consumer)
+            ).fetchone()
+        finished = finished or 0
+        return {
+            "backlog": backlog or 0,
+            "processing": processing or 0,
+            "finished": finished,
+            "drain_per_min": round(finished * 60.0 / window, 2),
+        }
+
+    def poll_state(self, key: str) -> Tuple[Optional[str], Optional[str]]:
+        """조건부 폴링 상태 (etag, since)"""
+        with self._lock:
+            row = self.db.execute("SELECT etag, since FROM poll_state WHERE key = ?", (key,)).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def save_poll_state(self, key: str, etag: Optional[str], since: Optional[str]) -> None:
+        with self._lock:
+            self.db.execute("REPLACE INTO poll_state (key, etag, since) VALUES (?, ?, ?)", (key, etag, since))
+
+    def close(self) -> None:
+        with self._lock:
+            self.db.close()
+
+
+class WebhookServer:
+    """GitHub 웹훅 수신 HTTP 서버 (백그라운드 스레드)
+
+    요청마다 handler(event, payload)를 호출하고 바로 202로 응답하므로,
+    handler는 큐에 넣는 것처럼 짧은 작업만 해야 함.
+    secret이 있으면 X-Hub-Signature-256을 검증하고 불일치 시 401.
+    """
+
+    def __init__(self, handler: Callable[[str, Dict[str, Any]], Any], host: str = "127.0.0.1",
+                 port: int = 0, secret: Optional[str] = None):
+        """
+        Args:
+            handler: (X-GitHub-Event, payload) 처리 함수
+            port: 수신 포트 (0이면 임의 포트, 실제 포트는 .port)
+            secret: 웹훅 secret (기본: GITHUB_WEBHOOK_SECRET)
+        """
+        self.handler = handler
+        self.secret = secret if secret is not None else os.getenv("GITHUB_WEBHOOK_SECRET")
+        self.httpd = ThreadingHTTPServer((host, port), self._request_handler())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def verify(self, body: bytes, signature: Optional[str]) -> bool:
+        """X-Hub-Signature-256 검증 (secret이 없으면 항상 True)"""
+        if not self.secret:
+            return True
+        expected = "sha256=" + hmac.new(self.secret.encode(), body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature or "")
+
+    def _request_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if not server.verify(body, self.headers.get("X-Hub-Signature-256")):
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+                try:
+                    payload = json.loads(body or b"{}")
+                    server.handler(self.headers.get("X-GitHub-Event", ""), payload)
+                except Exception as e:
+                    logger.warning(f"Webhook rejected: {e}")
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+                self.send_response(202)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return Handler
+
+    def start(self) -> "WebhookServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="webhook", daemon=True)
+        self._thread.start()
+        logger.info(f"Webhook server listening on port {self.port}")
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class IssueIntake:
+    """라벨 기준 이슈 접수: 웹훅/폴링 → IssueQueue → 처리 함수
+
+    웹훅이 주 경로이고, 폴링은 웹훅 유실 대비 fallback으로 poll_interval마다
+    ETag(If-None-Match)와 since 조건을 붙여 요청. 변경이 없으면 304라
+    본문 처리도, rate limit 소모도 없음. ETag/since와 처리 상태는 큐 DB에 영속.
+    처리는 workers개의 작업 스레드가 큐에서 하나씩 꺼내 동시에 진행.
+    """
+
+    def __init__(self, consumer: str, labels: Iterable[str], queue: Optional[IssueQueue] = None,
+                 poll_interval: float = 300.0, workers: Optional[int] = None,
+                 report_interval: float = 60.0, github: Optional[GitHubClient] = None,
+                 issues: Optional[IssueCache] = None):
+        """
+        Args:
+            consumer: 처리 주체 이름 (큐에서 처리 상태를 구분)
+            labels: 접수할 라벨
+            queue: 작업 큐 (기본: IssueQueue())
+            poll_interval: fallback 폴링 간격 초
+            workers: 동시에 처리할 이슈 수 (기본: INTAKE_WORKERS, 3)
+            report_interval: 큐 현황 로그 간격 초
+            github: 폴링에 쓸 API 클라이언트 (기본: 공유 쓰기 큐의 클라이언트)
+            issues: 웹훅 이벤트로 무효화할 이슈 캐시
+        """
+        self.consumer = consumer
+        self.labels = list(labels)
+        self.queue = queue or IssueQueue()
+        self.poll_interval = poll_interval
+        self.workers = workers or int(os.getenv("INTAKE_WORKERS", "3"))
+        self.report_interval = report_interval
+        self.github = github or default_writer().client
+        self.issues = issues
+
+    def handle_webhook(self, payload: Dict[str, Any], event: str = "issues") -> bool:
+        """
+        issues 'labeled'/'opened' 이벤트 중 접수 라벨이 붙은 이슈를 큐에 추가
+
+        Returns:
+            새로 큐에 추가했으면 True
+        """
+        if self.issues is not None:
+            self.issues.handle_webhook(event, payload)
+        if event not in ("issues", "") or payload.get("action") not in ("labeled", "opened", "reopened"):
+            return False
+        issue = payload.get("issue", {})
+        if payload.get("action") == "labeled":
+            labels = [payload.get("label", {}).get("name")]
+        else:
+            labels = [label.get("name") for label in issue.get("labels", [])]
+        label = next((name for name in labels if name in self.labels), None)
+        if label is None or issue.get("state", "open") != "open":
+            return False
+        repo = payload["repository"]["full_name"]
+        added = self.queue.enqueue(self.consumer, repo, issue["number"], label)
+        if added:
+            logger.info(f"Webhook: queued {repo}#{issue['number']} ({label})")
+        return added
+
+    def poll(self, repo: str) -> int:
+        """
+        라벨별 조건부 폴링으로 열린 이슈를 큐에 추가
+
+        since는 지금까지 본 가장 최근 updated_at이라, 변경이 없는 동안 요청
+        URL이 그대로이고 ETag가 맞아 304를 받음. 결과가 여러 페이지면 Link
+        헤더의 다음 페이지를 끝까지 따라가고, 모든 페이지를 받은 경우에만
+        ETag/since를 저장.
+
+        Returns:
+            새로 큐에 추가한 이슈 수
+        """
+        added = 0
+        for label in self.labels:
+            key = f"{repo}:{label}"
+            etag, since = self.queue.poll_state(key)
+            params = {"labels": label, "state": "open", "per_page": 100}
+            if since:
+                params["since"] = since
+            status, headers, body = self.github.request(
+                "GET", f"repos/{repo}/issues?{urlencode(params)}",
+                headers={"If-None-Match": etag} if etag else None
+            )
+            if status == 304:
+                continue
+            etag, latest = headers.get("etag"), since
+            while True:
+                if status != 200:
+                    # 일부 페이지만 본 상태로 since를 올리면 나머지 이슈를 놓치므로 저장하지 않음
+                    logger.warning(f"Polling {key} returned HTTP {status}")
+                    break
+                issues = [issue for issue in body or [] if "pull_request" not in issue]
+                for issue in issues:
+                    added += self.queue.enqueue(self.consumer, repo, issue["number"], label)
+                    if latest is None or issue["updated_at"] > latest:
+                        latest = issue["updated_at"]
+                path = self.github.next_page(headers)
+                if path is None:
+                    self.queue.save_poll_state(key, etag, latest)
+                    break
+                status, headers, body = self.github.request("GET", path)
+        return added
+
+    def serve(self, port: int, host: str = "127.0.0.1", secret: Optional[str] = None) -> WebhookServer:
+        """웹훅 수신 서버 시작"""
+        return WebhookServer(lambda event, payload: self.handle_webhook(payload, event),
+                             host, port, secret).start()
+
+    def report(self) -> Dict[str, float]:
+        """큐 적체와 처리 속도 로그 후 반환"""
+        stats = self.queue.stats(self.consumer)
+        eta = (f", ~{stats['backlog'] / stats['drain_per_min']:.0f}min to drain"
+               if stats["backlog"] and stats["drain_per_min"] else "")
+        logger.info(f"Intake {self.consumer}: backlog={stats['backlog']} processing={stats['processing']} "
+                    f"drain={stats['drain_per_min']}/min{eta}")
+        return stats
+
+    def _work(self, process: Callable[[QueuedIssue], Any], stop: threading.Event) -> None:
+        while not stop.is_set():
+            item = self.queue.claim(self.consumer, timeout=1.0, cancel=stop)
+            if item is None:
+                continue
+            try:
+                process(item)
+            except Exception as e:
+                logger.error(f"Processing {item.repo}#{item.number} failed: {e}")
+                self.queue.fail(item)
+            else:
+                self.queue.complete(item)
+
+    def run(self, repo: str, process: Callable[[QueuedIssue], Any],
+            stop: Optional[threading.Event] = None) -> None:
+        """
+        큐 처리 루프 (stop이 설정될 때까지)
+
+        작업 스레드 workers개가 이슈를 동시에 처리하고, 이 스레드는 폴링과
+        현황 보고만 담당. process가 예외를 던지면 실패로 기록하고 계속 진행.
+        """
+        stop = stop or threading.Event()
+        threads = [
+            threading.Thread(target=self._work, args=(process, stop), name=f"{self.consumer}-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        next_poll = next_report = 0.0
+        try:
+            while not stop.is_set():
+                now = time.time()
+                if now >= next_poll:
+                    try:
+                        self.poll(repo)
+                    except Exception as e:
+                        logger.warning(f"Polling {repo} failed: {e}")
+                    next_poll = time.time() + self.poll_interval
+                if now >= next_report:
+                    self.report()
+                    next_report = now + self.report_interval
+                stop.wait(max(0.0, min(next_poll, next_report) - time.time()))
+        finally:
+            # 처리 중인 이슈는 끝까지 진행 후 종료
+            stop.set()
+            self.queue.wake()
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,255 @@
+"""
+이슈 캐시 - spec/memory_policy.yml의 github_state 정책(TTL, 웹훅 무효화)을 따르는 디스크 캐시
+"""
+
+import http.client
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from core.github_client import GitHubClient, GitHubError, default_writer
+
+logger = logging.getLogger(__name__)
+
+POLICY_PATH = str(Path(__file__).resolve().parent.parent / "spec" / "memory_policy.yml")
+# 정책 파일을 읽을 수 없을 때의 기본값 (memory_policy.yml의 github_state와 동일)
+DEFAULT_TTL = 3600.0
+DEFAULT_INVALIDATION = frozenset({"issues", "pull_request"})
+
+# 캐시에 보관하는 이슈 필드
+_FIELDS = ("number", "title", "body", "state", "labels", "updated_at")
+
+_DURATION_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_duration(text: str) -> float:
+    """'30m', '1h', '7d' 형식을 초로 변환"""
+    m = _DURATION_RE.match(str(text).strip())
+    if not m:
+        raise ValueError(f"Invalid duration: {text}")
+    return float(m.group(1)) * _UNITS[m.group(2)]
+
+
+def load_cache_policy(path: str = POLICY_PATH, name: str = "github_state") -> Tuple[float, Set[str]]:
+    """
+    메모리 정책의 cache_only 항목에서 TTL과 무효화 웹훅 이벤트 읽기
+
+    Args:
+        path: 정책 YAML 경로
+        name: cache_only 아래 항목 이름
+
+    Returns:
+        (TTL 초, 무효화 이벤트 집합) - 파일을 읽을 수 없으면 기본값
+    """
+    import yaml  # 정책을 읽을 때만 필요 (core 패키지 import에 PyYAML을 요구하지 않음)
+
+    try:
+        with open(path, encoding="utf-8") as f:
+            entry = (yaml.safe_load(f) or {})["memory_categories"]["cache_only"][name]
+    except (OSError, yaml.YAMLError, KeyError, TypeError) as e:  # 파일 없음/형식 오류
+        logger.warning(f"Cache policy {name} unavailable ({e}), using defaults")
+        return DEFAULT_TTL, set(DEFAULT_INVALIDATION)
+    ttl = parse_duration(entry.get("retention", "1h"))
+    invalidation = str(entry.get("invalidation", ""))
+    events = set(invalidation.split(":", 1)[1].split("|")) if invalidation.startswith("webhook:") else set()
+    return ttl, events
+
+
+class IssueCache:
+    """repo/number별 이슈 디스크 캐시 (SQLite)
+
+    TTL 안이면 저장된 값을 그대로 반환하고, 지나면 저장된 ETag로 조건부
+    요청(If-None-Match)을 보내 304면 fetched_at만 갱신. 정책의 웹훅 이벤트가
+    오면 해당 이슈를 무효화. GitHub 조회가 실패하면 만료된 값이라도 반환.
+    열린 이슈 목록도 ETag와 이슈 번호를 보관해 매번 조건부로 재검증.
+    """
+
+    def __init__(self, path: Optional[str] = None, client: Optional[GitHubClient] = None,
+                 ttl: Optional[float] = None, policy_path: str = POLICY_PATH):
+        """
+        Args:
+            path: SQLite 파일 경로 (기본: ISSUE_CACHE_DB, var/issue_cache.sqlite)
+            client: API 클라이언트 (기본: 공유 쓰기 큐의 클라이언트)
+            ttl: 재검증 없이 쓰는 시간 초 (기본: 정책 파일의 github_state retention)
+            policy_path: 메모리 정책 파일 경로
+        """
+        policy_ttl, self.invalidate_on = load_cache_policy(policy_path)
+        self.ttl = ttl if ttl is not None else policy_ttl
+        self.client = client or default_writer().client
+        path = path or os.getenv("ISSUE_CACHE_DB", "var/issue_cache.sqlite")
+        Path(os.path.dirname(path) or ".").mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.hits = self.revalidated = self.fetched = 0
+        with self._lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS issue_cache (
+                    repo TEXT NOT NULL,
+                    number INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    etag TEXT,
+                    fetched_at REAL NOT NULL,
+                    PRIMARY KEY (repo, number)
+                )
+            """)
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS issue_lists (
+                    repo TEXT PRIMARY KEY,
+                    numbers TEXT NOT NULL,
+                    etag TEXT
+                )
+            """)
+
+    def _row(self, repo: str, number: int) -> Optional[Tuple[Dict[str, Any], Optional[str], float]]:
+        with self._lock:
+            row = self.db.execute(
+                "SELECT data, etag, fetched_at FROM issue_cache WHERE repo = ? AND number = ?",
+                (repo, int(number))
+            ).fetchone()
+        return (json.loads(row[0]), row[1], row[2]) if row else None
+
+    def store(self, repo: str, issue: Dict[str, Any], etag: Optional[str] = None) -> Dict[str, Any]:
+        """이슈 저장 (목록 조회 결과처럼 ETag가 없으면 TTL 뒤 전체 재조회)"""
+        data = {key: issue.get(key) for key in _FIELDS}
+        with self._lock, self.db:
+            self.db.execute(
+                "REPLACE INTO issue_cache (repo, number, data, etag, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (repo, int(issue["number"]), json.dumps(data, ensure_ascii=False), etag, time.time())
+            )
+        return data
+
+    def get(self, repo: str, number: int) -> Dict[str, Any]:
+        """
+        이슈 조회 (title, body, state, labels, updated_at)
+
+        Raises:
+            GitHubError: 캐시에 없고 GitHub 조회도 실패
+        """
+        cached = self._row(repo, number)
+        if cached is not None and time.time() - cached[2] < self.ttl:
+            self.hits += 1
+            return cached[0]
+
+        headers = {"If-None-Match": cached[1]} if cached and cached[1] else None
+        try:
+            status, response_headers, data = self.client.request(
+                "GET", f"repos/{repo}/issues/{number}", headers=headers
+            )
+        except (OSError, http.client.HTTPException) as e:
+            # 클라이언트가 재시도 후 다시 던진 연결 오류 → 만료된 값으로 폴백
+            status, response_headers, data = 0, {}, str(e)
+        if status == 304 and cached is not None:
+            self.revalidated += 1
+            with self._lock, self.db:
+                self.db.execute(
+                    "UPDATE issue_cache SET fetched_at = ? WHERE repo = ? AND number = ?",
+                    (time.time(), repo, int(number))
+                )
+            return cached[0]
+        if status == 200:
+            self.fetched += 1
+            return self.store(repo, data, response_headers.get("etag"))
+        message = data.get("message", "") if isinstance(data, dict) else str(data)
+        if cached is not None:
+            logger.warning(f"Issue {repo}#{number} refresh failed ({status} {message}), using stale copy")
+            return cached[0]
+        raise GitHubError(status, message)
+
+    def list_open(self, repo: str) -> List[Dict[str, Any]]:
+        """
+        열린 이슈 목록 (PR 제외, 최근 100개)
+
+        저장된 목록 ETag로 조건부 요청을 보내 304면 저장된 이슈를 그대로 반환
+        (웹훅으로 무효화된 이슈만 get()으로 다시 조회). 200이면 목록의 이슈를 저장.
+
+        Raises:
+            GitHubError: 저장된 목록이 없고 GitHub 조회도 실패
+        """
+        with self._lock:
+            row = self.db.execute(
+                "SELECT numbers, etag FROM issue_lists WHERE repo = ?", (repo,)
+            ).fetchone()
+        cached = (json.loads(row[0]), row[1]) if row else None
+
+        headers = {"If-None-Match": cached[1]} if cached and cached[1] else None
+        try:
+            status, response_headers, data = self.client.request(
+                "GET", f"repos/{repo}/issues?state=open&per_page=100", headers=headers
+            )
+        except (OSError, http.client.HTTPException) as e:
+            status, response_headers, data = 0, {}, str(e)
+        if status == 304 and cached is not None:
+            self.revalidated += 1
+            return [self._listed(repo, number) for number in cached[0]]
+        if status == 200:
+            self.fetched += 1
+            issues = [self.store(repo, issue) for issue in data or [] if "pull_request" not in issue]
+            with self._lock, self.db:
+                self.db.execute(
+                    "REPLACE INTO issue_lists (repo, numbers, etag) VALUES (?, ?, ?)",
+                    (repo, json.dumps([issue["number"] for issue in issues]), response_headers.get("etag"))
+                )
+            return issues
+        message = data.get("message", "") if isinstance(data, dict) else str(data)
+        if cached is not None:
+            logger.warning(f"Issue list {repo} refresh failed ({status} {message}), using stale copy")
+            return [self._listed(repo, number) for number in cached[0]]
+        raise GitHubError(status, message)
+
+    def _listed(self, repo: str, number: int) -> Dict[str, Any]:
+        """목록 재검증이 304일 때의 이슈 (목록이 그대로면 이슈 내용도 그대로이므로 TTL과 무관하게 사용)"""
+        cached = self._row(repo, number)
+        if cached is not None:
+            self.hits += 1
+            return cached[0]
+        return self.get(repo, number)
+
+    def invalidate(self, repo: str, number: Optional[int] = None) -> None:
+        """이슈(또는 저장소 전체) 캐시 삭제"""
+        with self._lock, self.db:
+            if number is None:
+                self.db.execute("DELETE FROM issue_cache WHERE repo = ?", (repo,))
+                self.db.execute("DELETE FROM issue_lists WHERE repo = ?", (repo,))
+            else:
+                self.db.execute("DELETE FROM issue_cache WHERE repo = ? AND number = ?", (repo, int(number)))
+
+    def handle_webhook(self, event: str, payload: Dict[str, Any]) -> bool:
+        """
+        정책의 무효화 이벤트면 해당 이슈/PR 캐시 삭제
+
+        Returns:
+            무효화했으면 True
+        """
+        if event not in self.invalidate_on:
+            return False
+        target = payload.get("issue") or payload.get("pull_request") or {}
+        repo = payload.get("repository", {}).get("full_name")
+        if not repo or "number" not in target:
+            return False
+        self.invalidate(repo, target["number"])
+        return True
+
+    def close(self) -> None:
+        with self._lock:
+            self.db.close()
+
+
+_default_cache: Optional[IssueCache] = None
+_default_lock = threading.Lock()
+
+
+def default_issue_cache() -> IssueCache:
+    """프로세스에서 공유하는 이슈 캐시"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = IssueCache()
+        return _default_cache
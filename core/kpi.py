@@ -2,34 +2,96 @@
 KPI Tracking System - 실시간 성능 측정
 """
 
+import atexit
 import sqlite3
+import threading
 import time
 import os
+from collections import Counter, deque
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Iterable, Optional, Sequence, Tuple
 from pathlib import Path
 
+from core.histogram import LogHistogram, bin_of
+
+
+def _env_flag(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes", "on")
+
 
 class KPITracker:
-    """싱글톤 KPI 추적기"""
+    """싱글톤 KPI 추적기
+    
+    기본은 write-behind 모드: record()는 메모리 링 버퍼에 넣기만 하고,
+    백그라운드 flusher가 flush_interval_ms마다 또는 flush_batch개가 모이면
+    executemany 한 트랜잭션으로 기록. 비정상 종료 시 유실은 최대
+    버퍼 크기(buffer_size) 이내이며, 버퍼가 가득 차면 가장 오래된 이벤트를
+    버리고 dropped로 집계. 정상 종료 시에는 atexit 훅에서 모두 기록.
+    """
     _instance = None
     
-    def __new__(cls):
+    def __new__(cls, *args, **kwargs):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
     
-    def __init__(self, db_path: str = "var/kpi.sqlite"):
+    def __init__(self, db_path: str = "var/kpi.sqlite",
+                 write_behind: Optional[bool] = None,
+                 flush_interval_ms: Optional[int] = None,
+                 flush_batch: Optional[int] = None,
+                 buffer_size: Optional[int] = None,
+                 retention_days: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            db_path: SQLite 파일 경로
+            write_behind: 버퍼링 기록 여부 (기본: KPI_WRITE_BEHIND, true)
+            flush_interval_ms: 최대 flush 주기 (기본: KPI_FLUSH_MS, 200)
+            flush_batch: 즉시 flush할 이벤트 수 (기본: KPI_FLUSH_BATCH, 100)
+            buffer_size: 링 버퍼 크기 = 최대 유실 이벤트 수 (기본: KPI_BUFFER_SIZE, 10000)
+            retention_days: 보존 기간(일) {'raw', 'minute', 'hour'}
+                (기본: KPI_RETAIN_RAW_DAYS 7, KPI_RETAIN_MINUTE_DAYS 2, KPI_RETAIN_HOUR_DAYS 90,
+                 일 버킷은 영구 보존)
+        """
         if not hasattr(self, 'initialized'):
             # DB 디렉토리 생성
-            Path(os.path.dirname(db_path)).mkdir(parents=True, exist_ok=True)
+            Path(os.path.dirname(db_path) or ".").mkdir(parents=True, exist_ok=True)
             
             self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self._lock = threading.RLock()  # 공유 커넥션 보호
             self._init_tables()
+            
+            self.write_behind = (_env_flag("KPI_WRITE_BEHIND", "true")
+                                 if write_behind is None else write_behind)
+            self.flush_interval = (flush_interval_ms if flush_interval_ms is not None
+                                   else int(os.getenv("KPI_FLUSH_MS", "200"))) / 1000.0
+            self.flush_batch = flush_batch or int(os.getenv("KPI_FLUSH_BATCH", "100"))
+            self._buffer = deque(maxlen=buffer_size or int(os.getenv("KPI_BUFFER_SIZE", "10000")))
+            self._buffer_lock = threading.Lock()
+            self.dropped = 0
+            self._wakeup = threading.Event()
+            self._stop = threading.Event()
+            self._flusher: Optional[threading.Thread] = None
+            
+            retention_days = {
+                "raw": float(os.getenv("KPI_RETAIN_RAW_DAYS", "7")),
+                "minute": float(os.getenv("KPI_RETAIN_MINUTE_DAYS", "2")),
+                "hour": float(os.getenv("KPI_RETAIN_HOUR_DAYS", "90")),
+                **(retention_days or {}),
+            }
+            self.retention = {level: int(days * 86400) for level, days in retention_days.items()}
+            # 장기 실행 프로세스는 flusher가 주기적으로 compact() (0이면 비활성)
+            self.compact_interval = int(os.getenv("KPI_COMPACT_INTERVAL_S", "3600"))
+            self._last_compact = time.time()
+            atexit.register(self.close)
             self.initialized = True
     
     def _init_tables(self):
         """테이블 초기화"""
+        # 새 DB는 삭제된 페이지를 incremental_vacuum으로 반환 (테이블 생성 전에만 적용됨)
+        self.db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # WAL: 쓰기 중에도 대시보드 읽기가 막히지 않고 커밋당 fsync 감소
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
         self.db.executescript("""
             CREATE TABLE IF NOT EXISTS kpi_events (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -53,6 +115,41 @@ class KPITracker:
                 value REAL NOT NULL,
                 PRIMARY KEY(day, metric)
             );
+            
+            -- 시간 버킷별 증분 집계 (NULL 차원은 ''로 저장)
+            CREATE TABLE IF NOT EXISTS kpi_agg (
+                res TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                phase TEXT NOT NULL DEFAULT '',
+                verb TEXT NOT NULL DEFAULT '',
+                ai_agent TEXT NOT NULL DEFAULT '',
+                error_type TEXT NOT NULL DEFAULT '',
+                total INTEGER NOT NULL DEFAULT 0,
+                ok INTEGER NOT NULL DEFAULT 0,
+                sum_ms INTEGER NOT NULL DEFAULT 0,
+                cnt_ms INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY(res, bucket, kind, phase, verb, ai_agent, error_type)
+            );
+            
+            -- 버킷별 지연 시간 로그 히스토그램 (bin: core.histogram.bin_of)
+            CREATE TABLE IF NOT EXISTS kpi_hist (
+                res TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                phase TEXT NOT NULL DEFAULT '',
+                verb TEXT NOT NULL DEFAULT '',
+                ai_agent TEXT NOT NULL DEFAULT '',
+                bin INTEGER NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY(res, bucket, kind, phase, verb, ai_agent, bin)
+            );
+            
+            -- 증분 집계 진행 상태 (high-water mark 등)
+            CREATE TABLE IF NOT EXISTS kpi_state (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
         """)
         self.db.commit()
     
@@ -72,141 +169,468 @@ class KPITracker:
             # 에러 기록
             kpi.record(kind='error', error_type='timeout', success=False)
         """
+        row = (int(time.time()), kind, phase, verb,
+               int(success) if success is not None else None,
+               duration_ms, error_type, ai_agent, task_id)
+        
+        if self.write_behind:
+            with self._buffer_lock:
+                if len(self._buffer) == self._buffer.maxlen:
+                    self.dropped += 1  # 가장 오래된 이벤트가 밀려남
+                self._buffer.append(row)
+                pending = len(self._buffer)
+            self._ensure_flusher()
+            if pending >= self.flush_batch:
+                self._wakeup.set()
+            return
+        
         try:
-            self.db.execute(
-                """INSERT INTO kpi_events 
-                   (ts, kind, phase, verb, success, duration_ms, error_type, ai_agent, task_id)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-                (int(time.time()), kind, phase, verb,
-                 int(success) if success is not None else None,
-                 duration_ms, error_type, ai_agent, task_id)
-            )
-            self.db.commit()
+            with self._lock:
+                self.db.execute(self._INSERT_SQL, row)
+                self.db.commit()
         except Exception as e:
             # KPI 기록 실패가 메인 로직을 방해하면 안 됨
             print(f"KPI record failed: {e}")
     
+    _INSERT_SQL = """INSERT INTO kpi_events 
+                   (ts, kind, phase, verb, success, duration_ms, error_type, ai_agent, task_id)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)"""
+    
+    def flush(self) -> int:
+        """버퍼의 이벤트를 한 트랜잭션으로 기록
+        
+        Returns:
+            기록한 이벤트 수
+        """
+        with self._buffer_lock:
+            rows = list(self._buffer)
+            self._buffer.clear()
+        if not rows:
+            return 0
+        try:
+            with self._lock:
+                with self.db:
+                    self.db.executemany(self._INSERT_SQL, rows)
+            return len(rows)
+        except Exception as e:
+            print(f"KPI flush failed ({len(rows)} events lost): {e}")
+            return 0
+    
+    def _ensure_flusher(self):
+        """백그라운드 flusher 시작 (첫 기록 시 한 번)"""
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._buffer_lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._flush_loop, name="kpi-flusher", daemon=True)
+            self._flusher.start()
+    
+    def _flush_loop(self):
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            if self.compact_interval and time.time() - self._last_compact >= self.compact_interval:
+                try:
+                    self.compact()
+                except Exception as e:
+                    print(f"KPI compaction failed: {e}")
+    
+    def close(self):
+        """flusher 정지 후 남은 이벤트 기록 (종료 시 자동 호출)"""
+        self._stop.set()
+        self._wakeup.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+            self._flusher = None
+        # 이후 기록은 바로 DB로 (종료 중 flusher 재시작 방지)
+        self.write_behind = False
+        self.flush()
+    
+    def _get_state(self, key: str, default: int = 0) -> int:
+        row = self.db.execute("SELECT value FROM kpi_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+    
+    def _set_state(self, key: str, value: int) -> None:
+        self.db.execute("REPLACE INTO kpi_state (key, value) VALUES (?, ?)", (key, value))
+    
+    def _fold_new_events(self) -> int:
+        """high-water mark 이후 이벤트만 kpi_agg 버킷에 누적
+        
+        id(PK) 범위로만 읽으므로 비용은 새 이벤트 수에 비례.
+        high-water mark/MAX(id) 읽기부터 갱신까지 한 BEGIN IMMEDIATE 트랜잭션에서
+        처리해, 여러 프로세스가 동시에 집계해도 같은 범위를 두 번 누적하지 않음.
+        
+        Returns:
+            새로 집계한 이벤트 수
+        """
+        if self.db.in_transaction:
+            self.db.commit()
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            folded = self._fold_range()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return folded
+    
+    def _fold_range(self) -> int:
+        """(high-water mark, MAX(id)] 범위 집계 (호출자가 쓰기 트랜잭션 보유)"""
+        hwm = self._get_state("rollup_hwm")
+        max_id = self.db.execute("SELECT MAX(id) FROM kpi_events").fetchone()[0]
+        if max_id is None or max_id <= hwm:
+            return 0
+        
+        for res, width in self.RESOLUTIONS:
+            self.db.execute("""
+                INSERT INTO kpi_agg
+                    (res, bucket, kind, phase, verb, ai_agent, error_type, total, ok, sum_ms, cnt_ms)
+                SELECT ?, (ts / ?) * ?, kind,
+                       COALESCE(phase, ''), COALESCE(verb, ''),
+                       COALESCE(ai_agent, ''), COALESCE(error_type, ''),
+                       COUNT(*),
+                       SUM(CASE WHEN success=1 THEN 1 ELSE 0 END),
+                       COALESCE(SUM(duration_ms), 0),
+                       COUNT(duration_ms)
+                FROM kpi_events
+                WHERE id > ? AND id <= ?
+                GROUP BY 2, 3, 4, 5, 6, 7
+                ON CONFLICT(res, bucket, kind, phase, verb, ai_agent, error_type) DO UPDATE SET
+                    total = total + excluded.total,
+                    ok = ok + excluded.ok,
+                    sum_ms = sum_ms + excluded.sum_ms,
+                    cnt_ms = cnt_ms + excluded.cnt_ms
+            """, (res, width, width, hwm, max_id))
+        
+        self._fold_histograms(hwm, max_id)
+        self._set_state("rollup_hwm", max_id)
+        return max_id - hwm
+    
+    def _fold_histograms(self, hwm: int, max_id: int) -> None:
+        """(hwm, max_id] 이벤트의 duration_ms를 kpi_hist 버킷에 누적"""
+        counts: Counter = Counter()
+        cur = self.db.execute("""
+            SELECT ts, kind, COALESCE(phase, ''), COALESCE(verb, ''),
+                   COALESCE(ai_agent, ''), duration_ms
+            FROM kpi_events
+            WHERE id > ? AND id <= ? AND duration_ms IS NOT NULL
+        """, (hwm, max_id))
+        for ts, kind, phase, verb, ai_agent, duration_ms in cur:
+            index = bin_of(duration_ms)
+            for res, width in self.RESOLUTIONS:
+                counts[(res, ts // width * width, kind, phase, verb, ai_agent, index)] += 1
+        
+        self.db.executemany("""
+            INSERT INTO kpi_hist (res, bucket, kind, phase, verb, ai_agent, bin, count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(res, bucket, kind, phase, verb, ai_agent, bin) DO UPDATE SET
+                count = count + excluded.count
+        """, [key + (count,) for key, count in counts.items()])
+    
+    # 증분 집계 해상도 (이름, 버킷 폭 초) - 세밀한 순서
+    RESOLUTIONS = (("minute", 60), ("hour", 3600), ("day", 86400))
+    
+    # 조회 시 허용하는 최대 버킷 수 (넘으면 더 거친 해상도 사용)
+    MAX_QUERY_BUCKETS = 360
+    
+    def _resolution_for(self, since: int, until: int) -> Tuple[str, int]:
+        """
+        조회 범위에 맞는 해상도 선택
+        
+        보존 기간 안에 since가 들어오고 버킷 수가 MAX_QUERY_BUCKETS 이하인
+        가장 세밀한 해상도 (없으면 일 버킷)
+        
+        Returns:
+            (해상도 이름, 버킷 폭 초)
+        """
+        now = int(time.time())
+        for res, width in self.RESOLUTIONS:
+            keep = self.retention.get(res)
+            if keep is not None and since < now - keep:
+                continue
+            if until - since <= width * self.MAX_QUERY_BUCKETS:
+                return res, width
+        return self.RESOLUTIONS[-1]
+    
+    def compact(self, now: Optional[int] = None, chunk_size: int = 5000,
+                vacuum_pages: int = 1000) -> Dict[str, int]:
+        """
+        보존 기간이 지난 원본 이벤트와 세밀한 버킷을 삭제하고 공간 반환
+        
+        원본 이벤트는 집계에 반영된 것(id <= high-water mark)만 지움.
+        삭제는 chunk_size개씩 별도 트랜잭션으로 나눠 기록을 오래 막지 않음.
+        
+        Args:
+            now: 기준 시각 epoch 초 (기본: 현재)
+            chunk_size: 트랜잭션당 삭제 행 수
+            vacuum_pages: 한 번에 반환할 최대 페이지 수
+        
+        Returns:
+            {'raw': n, 'minute': n, 'hour': n} 삭제 행 수
+        """
+        now = int(time.time()) if now is None else now
+        self._last_compact = time.time()
+        
+        self.flush()
+        with self._lock:
+            self._fold_new_events()
+            self.db.commit()
+            hwm = self._get_state("rollup_hwm")
+        
+        deleted = {"raw": 0}
+        if "raw" in self.retention:
+            deleted["raw"] = self._delete_chunked("""
+                DELETE FROM kpi_events WHERE id IN (
+                    SELECT id FROM kpi_events WHERE ts < ? AND id <= ? LIMIT ?)
+            """, (now - self.retention["raw"], hwm), chunk_size)
+        
+        for res, _ in self.RESOLUTIONS:
+            keep = self.retention.get(res)
+            if keep is None:
+                continue
+            deleted[res] = sum(
+                self._delete_chunked(f"""
+                    DELETE FROM {table} WHERE rowid IN (
+                        SELECT rowid FROM {table} WHERE res = ? AND bucket < ? LIMIT ?)
+                """, (res, now - keep), chunk_size)
+                for table in ("kpi_agg", "kpi_hist")
+            )
+        
+        with self._lock:
+            self._incremental_vacuum(vacuum_pages)
+        return deleted
+    
+    def _delete_chunked(self, sql: str, params: tuple, chunk_size: int) -> int:
+        """LIMIT 파라미터를 붙여 행이 남지 않을 때까지 반복 삭제"""
+        total = 0
+        while True:
+            with self._lock:
+                with self.db:
+                    count = self.db.execute(sql, params + (chunk_size,)).rowcount
+            total += count
+            if count < chunk_size:
+                return total
+    
+    def _incremental_vacuum(self, pages: int) -> None:
+        """빈 페이지를 파일 시스템에 반환 (증분 모드가 아닌 DB에서는 아무것도 하지 않음)"""
+        # 한 단계에 한 페이지씩 반환되므로 끝까지 읽어야 함
+        self.db.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+    
+    def enable_incremental_vacuum(self) -> bool:
+        """
+        auto_vacuum 도입 전 DB를 증분 모드로 전환 (전체 VACUUM 한 번)
+        
+        파일 전체를 다시 쓰는 동안 기록이 막히므로 flusher가 아닌
+        scripts/kpi_compact.py --enable-incremental-vacuum 같은 별도 작업에서 실행.
+        
+        Returns:
+            전환했으면 True (이미 증분 모드면 False)
+        """
+        with self._lock:
+            if self.db.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:
+                return False
+            self.db.commit()
+            self.db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            self.db.execute("VACUUM")
+            return True
+    
     def rollup_today(self) -> dict:
-        """오늘의 KPI 집계"""
+        """오늘의 KPI 집계
+        
+        새 이벤트를 버킷에 접어 넣은 뒤 오늘(UTC) 일 버킷만 읽으므로
+        kpi_events 크기와 무관하게 비용이 일정.
+        """
         day = datetime.utcnow().strftime("%Y-%m-%d")
+        day_start = int(time.time()) // 86400 * 86400
         metrics = {}
         
-        try:
-            # 1. 핸드셰이크 성공률
-            cur = self.db.execute("""
-                SELECT 
-                    SUM(CASE WHEN kind='handshake' AND phase='eot' THEN 1 ELSE 0 END) AS total,
-                    SUM(CASE WHEN kind='handshake' AND phase='eot' AND success=1 THEN 1 ELSE 0 END) AS ok
-                FROM kpi_events 
-                WHERE DATE(ts, 'unixepoch') = DATE('now')
-            """)
-            total, ok = cur.fetchone()
-            if total and total > 0:
-                rate = (ok or 0) * 100.0 / total
-                self.db.execute(
-                    "REPLACE INTO kpi_daily (day, metric, value) VALUES (?, ?, ?)",
-                    (day, "handshake_success_rate", rate)
-                )
-                metrics["handshake_success_rate"] = rate
-            
-            # 2. EXEC 동사별 성공률
-            cur = self.db.execute("""
-                SELECT verb,
-                       COUNT(*) AS attempts,
-                       SUM(CASE WHEN success=1 THEN 1 ELSE 0 END) AS ok,
-                       AVG(duration_ms) AS avg_ms
-                FROM kpi_events
-                WHERE kind='exec' AND DATE(ts, 'unixepoch') = DATE('now')
-                GROUP BY verb
-            """)
-            for verb, attempts, ok, avg_ms in cur.fetchall():
-                if attempts:
-                    rate = (ok or 0) * 100.0 / attempts
-                    self.db.execute(
-                        "REPLACE INTO kpi_daily (day, metric, value) VALUES (?, ?, ?)",
-                        (day, f"exec_{verb}_success_rate", rate)
-                    )
-                    metrics[f"exec_{verb}_success_rate"] = rate
-                    
-                if avg_ms is not None:
-                    self.db.execute(
-                        "REPLACE INTO kpi_daily (day, metric, value) VALUES (?, ?, ?)",
-                        (day, f"exec_{verb}_avg_ms", avg_ms)
-                    )
-                    metrics[f"exec_{verb}_avg_ms"] = avg_ms
-            
-            # 3. 에러 복구율
-            cur = self.db.execute("""
-                SELECT 
-                    COUNT(*) AS total_errors,
-                    SUM(CASE WHEN error_type='auto_recovered' THEN 1 ELSE 0 END) AS recovered
-                FROM kpi_events
-                WHERE kind='error' AND DATE(ts, 'unixepoch') = DATE('now')
-            """)
-            total_errors, recovered = cur.fetchone()
-            if total_errors and total_errors > 0:
-                rate = (recovered or 0) * 100.0 / total_errors
-                self.db.execute(
+        self.flush()
+        with self._lock:
+            try:
+                self._fold_new_events()
+                
+                # 1. 핸드셰이크 성공률
+                total, ok = self.db.execute("""
+                    SELECT SUM(total), SUM(ok) FROM kpi_agg
+                    WHERE res='day' AND bucket=? AND kind='handshake' AND phase='eot'
+                """, (day_start,)).fetchone()
+                if total and total > 0:
+                    metrics["handshake_success_rate"] = (ok or 0) * 100.0 / total
+                
+                # 2. EXEC 동사별 성공률
+                cur = self.db.execute("""
+                    SELECT verb, SUM(total), SUM(ok), SUM(sum_ms), SUM(cnt_ms)
+                    FROM kpi_agg
+                    WHERE res='day' AND bucket=? AND kind='exec'
+                    GROUP BY verb
+                """, (day_start,))
+                for verb, attempts, ok, sum_ms, cnt_ms in cur.fetchall():
+                    verb = verb or None
+                    if attempts:
+                        metrics[f"exec_{verb}_success_rate"] = (ok or 0) * 100.0 / attempts
+                    if cnt_ms:
+                        metrics[f"exec_{verb}_avg_ms"] = sum_ms / cnt_ms
+                
+                # 3. 에러 복구율
+                total_errors, recovered = self.db.execute("""
+                    SELECT SUM(total),
+                           SUM(CASE WHEN error_type='auto_recovered' THEN total ELSE 0 END)
+                    FROM kpi_agg
+                    WHERE res='day' AND bucket=? AND kind='error'
+                """, (day_start,)).fetchone()
+                if total_errors and total_errors > 0:
+                    metrics["error_recovery_rate"] = (recovered or 0) * 100.0 / total_errors
+                
+                self.db.executemany(
                     "REPLACE INTO kpi_daily (day, metric, value) VALUES (?, ?, ?)",
-                    (day, "error_recovery_rate", rate)
+                    [(day, metric, value) for metric, value in metrics.items()]
                 )
-                metrics["error_recovery_rate"] = rate
-            
-            self.db.commit()
-            return metrics
+                self.db.commit()
+                return metrics
             
-        except Exception as e:
-            print(f"KPI rollup failed: {e}")
-            return {}
+            except Exception as e:
+                self.db.rollback()
+                print(f"KPI rollup failed: {e}")
+                return {}
+    
+    def get_latency_breakdown(self, since: Optional[int] = None, until: Optional[int] = None,
+                              group_by: Sequence[str] = ("phase",), kind: str = "handshake",
+                              percentiles: Iterable[float] = (50, 95, 99),
+                              **filters) -> Dict[Tuple[str, ...], dict]:
+        """
+        지연 시간 백분위 조회 (히스토그램 병합)
+        
+        Args:
+            since: 시작 시각 epoch 초 (기본: 1시간 전)
+            until: 끝 시각 epoch 초 (기본: 현재)
+            group_by: 묶을 차원 (phase, verb, ai_agent 중)
+            kind: 이벤트 종류
+            percentiles: 계산할 백분위
+            **filters: 차원별 조건 (예: phase='eot', ai_agent='gemini')
+        
+        Returns:
+            {group_by 값 튜플: {'count': n, 'p50': ms, 'p95': ms, 'p99': ms}}
+        """
+        dims = ("phase", "verb", "ai_agent")
+        unknown = [d for d in (*group_by, *filters) if d not in dims]
+        if unknown:
+            raise ValueError(f"Unknown latency dimension: {unknown}")
+        
+        now = int(time.time())
+        since = now - 3600 if since is None else since
+        until = now if until is None else until
+        
+        # since가 속한 버킷부터 포함 (최대 버킷 폭 1개 오차)
+        res, width = self._resolution_for(since, until)
+        where = ["res = ?", "bucket >= ?", "bucket <= ?", "kind = ?"]
+        params: list = [res, since // width * width, until, kind]
+        for dim, value in filters.items():
+            if value is not None:
+                where.append(f"{dim} = ?")
+                params.append(value)
+        
+        group_cols = "".join(f"{dim}, " for dim in group_by)
+        sql = f"""
+            SELECT {group_cols}bin, SUM(count) FROM kpi_hist
+            WHERE {' AND '.join(where)}
+            GROUP BY {group_cols}bin
+        """
+        
+        self.flush()
+        histograms: Dict[Tuple[str, ...], LogHistogram] = {}
+        with self._lock:
+            try:
+                self._fold_new_events()
+                self.db.commit()
+                for row in self.db.execute(sql, params):
+                    key, index, count = tuple(row[:-2]), row[-2], row[-1]
+                    histograms.setdefault(key, LogHistogram()).counts[index] = count
+            except Exception as e:
+                self.db.rollback()
+                print(f"Latency query failed: {e}")
+                return {}
+        
+        percentiles = tuple(percentiles)
+        return {
+            key: {"count": hist.total, **hist.percentiles(percentiles)}
+            for key, hist in histograms.items()
+        }
+    
+    def get_latency_percentiles(self, phase: Optional[str] = None, verb: Optional[str] = None,
+                                ai_agent: Optional[str] = None, **kwargs) -> dict:
+        """
+        조건에 맞는 지연 시간 p50/p95/p99 (ms)
+        
+        Examples:
+            kpi.get_latency_percentiles(phase='eot', verb='TEST', ai_agent='gemini')
+        
+        Returns:
+            {'count': n, 'p50': ms, 'p95': ms, 'p99': ms} (데이터 없으면 count=0)
+        """
+        result = self.get_latency_breakdown(
+            group_by=(), phase=phase, verb=verb, ai_agent=ai_agent, **kwargs
+        )
+        return result.get((), {"count": 0})
     
     def get_today_metrics(self) -> dict:
         """오늘의 메트릭 조회 (대시보드용)"""
         day = datetime.utcnow().strftime("%Y-%m-%d")
-        try:
-            cur = self.db.execute(
-                "SELECT metric, value FROM kpi_daily WHERE day = ?", (day,)
-            )
-            return dict(cur.fetchall())
-        except Exception as e:
-            print(f"KPI query failed: {e}")
-            return {}
+        with self._lock:
+            try:
+                cur = self.db.execute(
+                    "SELECT metric, value FROM kpi_daily WHERE day = ?", (day,)
+                )
+                return dict(cur.fetchall())
+            except Exception as e:
+                print(f"KPI query failed: {e}")
+                return {}
     
     def get_recent_stats(self, hours: int = 1) -> dict:
-        """최근 N시간 통계 (실시간 모니터링용)"""
+        """최근 N시간 통계 (실시간 모니터링용, 범위에 맞는 집계 버킷에서 조회)"""
         since = int(time.time()) - (hours * 3600)
+        res, width = self._resolution_for(since, int(time.time()))
+        bucket_from = since // width * width
         stats = {}
         
-        try:
-            # 최근 핸드셰이크 성공률
-            cur = self.db.execute("""
-                SELECT 
-                    COUNT(*) AS total,
-                    SUM(CASE WHEN success=1 THEN 1 ELSE 0 END) AS ok
-                FROM kpi_events
-                WHERE kind='handshake' AND phase='eot' AND ts >= ?
-            """, (since,))
-            total, ok = cur.fetchone()
-            if total and total > 0:
-                stats["recent_handshake_rate"] = (ok or 0) * 100.0 / total
-                stats["recent_handshake_count"] = total
-            
-            # 최근 에러
-            cur = self.db.execute("""
-                SELECT error_type, COUNT(*) AS cnt
-                FROM kpi_events
-                WHERE kind='error' AND ts >= ?
-                GROUP BY error_type
-                ORDER BY cnt DESC
-                LIMIT 5
-            """, (since,))
-            stats["recent_errors"] = dict(cur.fetchall())
-            
-            return stats
-            
-        except Exception as e:
-            print(f"Recent stats query failed: {e}")
-            return {}
-    
+        self.flush()
+        with self._lock:
+            try:
+                self._fold_new_events()
+                self.db.commit()
+                
+                # 최근 핸드셰이크 성공률
+                total, ok = self.db.execute("""
+                    SELECT SUM(total), SUM(ok) FROM kpi_agg
+                    WHERE res = ? AND bucket >= ? AND kind='handshake' AND phase='eot'
+                """, (res, bucket_from)).fetchone()
+                if total and total > 0:
+                    stats["recent_handshake_rate"] = (ok or 0) * 100.0 / total
+                    stats["recent_handshake_count"] = total
+                
+                # 최근 에러
+                cur = self.db.execute("""
+                    SELECT error_type, SUM(total) AS cnt
+                    FROM kpi_agg
+                    WHERE res = ? AND bucket >= ? AND kind='error'
+                    GROUP BY error_type
+                    ORDER BY cnt DESC
+                    LIMIT 5
+                """, (res, bucket_from))
+                stats["recent_errors"] = {error_type or None: cnt for error_type, cnt in cur.fetchall()}
+            except Exception as e:
+                self.db.rollback()
+                print(f"Recent stats query failed: {e}")
+                return {}
+        
+        # 단계별 지연 시간 백분위
+        latency = self.get_latency_breakdown(since=since, group_by=("phase",))
+        if latency:
+            stats["latency"] = {phase: values for (phase,), values in sorted(latency.items())}
+        return stats
+
     def print_summary(self):
         """콘솔에 요약 출력 (디버깅용)"""
         metrics = self.get_today_metrics()
@@ -228,6 +652,9 @@ class KPITracker:
                 print(f"  Handshake: {recent['recent_handshake_rate']:.1f}% ({recent.get('recent_handshake_count', 0)} attempts)")
             if "recent_errors" in recent and recent["recent_errors"]:
                 print(f"  Top Errors: {recent['recent_errors']}")
+            for phase, values in recent.get("latency", {}).items():
+                print(f"  {phase} latency: p50={values['p50']:.0f}ms "
+                      f"p95={values['p95']:.0f}ms p99={values['p99']:.0f}ms")
         print("==================\n")
 
 
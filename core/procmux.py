@@ -0,0 +1,251 @@
+"""
+프로세스 멀티플렉서 - 여러 자식 프로세스의 출력을 한 스레드에서 동시에 수집
+"""
+
+import logging
+import os
+import selectors
+import subprocess
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProcessResult:
+    """자식 프로세스 실행 결과"""
+    returncode: Optional[int]
+    stdout: str
+    stderr: str
+    timed_out: bool = False
+    duration: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.returncode == 0 and not self.timed_out
+
+
+class _Job:
+    def __init__(self, proc: subprocess.Popen, deadline: Optional[float], future: Future):
+        self.proc = proc
+        self.deadline = deadline
+        self.future = future
+        self.started = time.time()
+        self.chunks: Dict[str, List[bytes]] = {"stdout": [], "stderr": []}
+        self.open = 2
+        self.timed_out = False
+        self.reap_by: Optional[float] = None  # 파이프가 닫힌 뒤 종료 코드를 기다리는 기한
+
+
+class ProcessMultiplexer:
+    """selectors로 모든 파이프를 한 스레드에서 읽고 프로세스별 마감 시간 적용
+
+    communicate()를 차례로 부르면 가장 느린(또는 멈춘) 프로세스가 나머지
+    결과 수집을 막음. 여기서는 끝나는 순서대로 Future가 완료되고, 마감이
+    지난 프로세스는 종료 후 그때까지의 출력으로 timed_out 결과를 반환.
+    파이프가 닫힌 프로세스의 종료 코드는 poll()로 거둬 다른 작업을 막지 않음.
+    """
+
+    # 파이프가 닫힌 뒤 종료 코드를 기다리는 최대 시간 (넘으면 returncode=None)
+    REAP_GRACE = 1.0
+    # 종료 대기 중인 프로세스 확인 간격
+    REAP_INTERVAL = 0.01
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._incoming: List[_Job] = []
+        self._jobs: List[_Job] = []
+        self._reaping: List[_Job] = []
+        self._wake_r, self._wake_w = os.pipe()
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, argv: Sequence[str], timeout: Optional[float] = None,
+               env: Optional[Mapping[str, str]] = None) -> "Future[ProcessResult]":
+        """
+        프로세스 시작 후 결과 Future 반환
+
+        Args:
+            argv: 실행할 명령 (셸 없이)
+            timeout: 마감까지 남은 시간 (초, None이면 무제한)
+            env: 환경 변수
+
+        Raises:
+            OSError: 프로세스 시작 실패
+        """
+        proc = subprocess.Popen(
+            list(argv),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=dict(env) if env is not None else None
+        )
+        deadline = time.time() + timeout if timeout is not None else None
+        job = _Job(proc, deadline, Future())
+        with self._lock:
+            if self._closed:
+                proc.kill()
+                raise RuntimeError("ProcessMultiplexer is closed")
+            self._incoming.append(job)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="procmux", daemon=True)
+                self._thread.start()
+        os.write(self._wake_w, b"\0")
+        return job.future
+
+    def run(self, argv: Sequence[str], timeout: Optional[float] = None,
+            env: Optional[Mapping[str, str]] = None) -> ProcessResult:
+        """submit 후 결과까지 대기"""
+        return self.submit(argv, timeout, env).result()
+
+    def close(self) -> None:
+        """남은 프로세스 종료 후 스레드 정리"""
+        with self._lock:
+            self._closed = True
+        os.write(self._wake_w, b"\0")
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _loop(self) -> None:
+        while True:
+            with self._lock:
+                incoming, self._incoming = self._incoming, []
+                closed = self._closed
+            for job in incoming:
+                self._jobs.append(job)
+                self._selector.register(job.proc.stdout, selectors.EVENT_READ, (job, "stdout"))
+                self._selector.register(job.proc.stderr, selectors.EVENT_READ, (job, "stderr"))
+            if closed:
+                for job in list(self._jobs):
+                    job.proc.kill()
+                    self._finish(job)
+                for job in self._reaping:
+                    job.proc.kill()
+                    try:
+                        job.proc.wait(timeout=self.REAP_GRACE)
+                    except subprocess.TimeoutExpired:
+                        pass
+                    self._resolve(job)
+                self._selector.close()
+                os.close(self._wake_r)
+                os.close(self._wake_w)
+                return
+
+            deadlines = [job.deadline for job in self._jobs if job.deadline is not None]
+            if self._reaping:
+                deadlines.append(time.time() + self.REAP_INTERVAL)
+            wait = max(0.0, min(deadlines) - time.time()) if deadlines else None
+            for key, _ in self._selector.select(wait):
+                if key.data is None:
+                    os.read(self._wake_r, 4096)
+                    continue
+                job, name = key.data
+                data = os.read(key.fd, 65536)
+                if data:
+                    job.chunks[name].append(data)
+                    continue
+                self._selector.unregister(key.fileobj)
+                job.open -= 1
+                if job.open == 0:
+                    self._finish(job)
+
+            # 마감 지난 프로세스는 종료하고 지금까지의 출력으로 완료
+            now = time.time()
+            for job in list(self._jobs):
+                if job.deadline is not None and now >= job.deadline:
+                    job.timed_out = True
+                    job.proc.kill()
+                    self._finish(job)
+            self._reap(now)
+
+    def _reap(self, now: float) -> None:
+        """종료된 프로세스의 결과 완료 (유예 시간이 지나면 종료 코드 없이)"""
+        for job in list(self._reaping):
+            if job.proc.poll() is not None or now >= job.reap_by:
+                self._reaping.remove(job)
+                self._resolve(job)
+
+    def _finish(self, job: _Job) -> None:
+        if job not in self._jobs:
+            return
+        self._jobs.remove(job)
+        for stream in (job.proc.stdout, job.proc.stderr):
+            try:
+                self._selector.unregister(stream)
+            except (KeyError, ValueError):
+                pass
+            stream.close()
+        if job.proc.poll() is None:
+            # 파이프를 닫고 아직 종료하지 않은 프로세스는 다음 루프에서 확인
+            job.reap_by = time.time() + self.REAP_GRACE
+            self._reaping.append(job)
+            return
+        self._resolve(job)
+
+    def _resolve(self, job: _Job) -> None:
+        job.future.set_result(ProcessResult(
+            returncode=job.proc.returncode,
+            stdout=b"".join(job.chunks["stdout"]).decode("utf-8", errors="replace"),
+            stderr=b"".join(job.chunks["stderr"]).decode("utf-8", errors="replace"),
+            timed_out=job.timed_out,
+            duration=time.time() - job.started
+        ))
+
+
+class AgentSlots:
+    """에이전트 실행 파일별 동시 프로세스 수 제한 (프로세스 전체 공유)
+
+    이슈 여러 개를 동시에 처리하면 파이프라인마다의 제한(DagExecutor limits)만으로는
+    같은 CLI가 이슈 수만큼 떠 있을 수 있음. 여기서 실행 파일 이름(경로의 basename)
+    기준으로 전역 상한을 둠.
+    """
+
+    def __init__(self, default_limit: Optional[int] = None, limits: Optional[Mapping[str, int]] = None):
+        """
+        Args:
+            default_limit: limits에 없는 실행 파일의 상한 (기본: AGENT_MAX_PROCS, 4)
+            limits: 실행 파일 이름 → 상한
+        """
+        self.default_limit = default_limit or int(os.getenv("AGENT_MAX_PROCS", "4"))
+        self.limits = dict(limits or {})
+        self._active: Dict[str, int] = {}
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def key(binary: str) -> str:
+        return os.path.basename(binary)
+
+    def set_limit(self, binary: str, limit: int) -> None:
+        with self._cond:
+            self.limits[self.key(binary)] = limit
+            self._cond.notify_all()
+
+    def active(self, binary: str) -> int:
+        """실행 중인 프로세스 수"""
+        with self._cond:
+            return self._active.get(self.key(binary), 0)
+
+    @contextmanager
+    def slot(self, binary: str) -> Iterator[None]:
+        """상한 안에서 자리가 날 때까지 대기 후 점유"""
+        key = self.key(binary)
+        with self._cond:
+            self._cond.wait_for(lambda: self._active.get(key, 0) < self.limits.get(key, self.default_limit))
+            self._active[key] = self._active.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active[key] -= 1
+                self._cond.notify_all()
+
+
+# 프로세스 전체에서 공유하는 에이전트 실행 상한
+agent_slots = AgentSlots()
@@ -1,6 +1,7 @@
 import re
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Dict, Iterator, Optional, Union
 
 # ANSI 컬러 코드 제거 패턴
 ANSI_ESCAPE = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
@@ -10,6 +11,26 @@ ACK_RE = re.compile(r"^\s*@@ACK id=(?P<id>\S+)\s*$")
 RUN_RE = re.compile(r"^\s*@@RUN id=(?P<id>\S+)(?:\s+ts=(?P<ts>\S+))?\s*$")
 EOT_RE = re.compile(r"^\s*@@EOT id=(?P<id>\S+)\s+status=(?P<status>OK|FAIL)(?:\s+.*)?$")
 
+# ACK/RUN/EOT를 한 번에 매칭하는 통합 패턴 (공백은 줄바꿈 제외 → 버퍼 안의 줄 범위에도 사용)
+_WS = r"[^\S\n]"
+TOKEN_PATTERN = (
+    rf"^{_WS}*@@(?:"
+    rf"ACK id=(?P<ack>\S+){_WS}*"
+    rf"|RUN id=(?P<run>\S+)(?:{_WS}+ts=(?P<ts>\S+))?{_WS}*"
+    rf"|EOT id=(?P<eot>\S+){_WS}+status=(?P<status>OK|FAIL)(?:{_WS}+(?P<meta>[^\n]*))?"
+    rf")$"
+)
+TOKEN_RE = re.compile(TOKEN_PATTERN)
+# 버퍼 중간 줄 범위에 match할 때 ^가 줄 시작에서 동작하도록
+TOKEN_SCAN_RE = re.compile(TOKEN_PATTERN, re.MULTILINE)
+
+ESC = "\x1b"
+
+# EOT 메타데이터 k=v (값은 공백 없는 문자열 또는 큰따옴표 문자열)
+META_RE = re.compile(r'(?P<key>[A-Za-z_][\w.-]*)=(?:"(?P<quoted>[^"]*)"|(?P<value>\S*))')
+
+MetaValue = Union[int, float, str]
+
 
 def strip_ansi_codes(text: str) -> str:
     """ANSI 컬러 코드 제거"""
@@ -44,28 +65,108 @@ class Run:
     ts: Optional[str] = None
 
 
+def _coerce(value: str) -> MetaValue:
+    """숫자로 읽히는 값은 int/float로 변환"""
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def parse_meta(text: str) -> Dict[str, MetaValue]:
+    """
+    EOT의 status 뒤 k=v 목록 파싱
+
+    Args:
+        text: "result=42 duration=1.5 artifact=out.txt" 형식
+
+    Returns:
+        키 → 값 (숫자는 int/float, 따옴표 값은 문자열 그대로)
+    """
+    meta: Dict[str, MetaValue] = {}
+    for m in META_RE.finditer(text):
+        quoted = m["quoted"]
+        meta[m["key"]] = quoted if quoted is not None else _coerce(m["value"])
+    return meta
+
+
 @dataclass
 class Eot:
     id: str
     status: str = "OK"
+    raw_meta: str = field(default="", repr=False, compare=False)  # status 뒤 원문 구간
+
+    @cached_property
+    def meta(self) -> Dict[str, MetaValue]:
+        """status 뒤 k=v 메타데이터 (처음 접근할 때 파싱)"""
+        return parse_meta(self.raw_meta) if self.raw_meta else {}
+
+
+Token = Union[Ack, Run, Eot]
+
+
+def _token_from_match(m: "re.Match") -> Token:
+    if m["ack"] is not None:
+        return Ack(m["ack"])
+    if m["run"] is not None:
+        return Run(m["run"], m["ts"])
+    return Eot(m["eot"], m["status"], m["meta"] or "")
+
+
+def match_token(line: str) -> Optional[Token]:
+    """
+    한 줄에서 ACK/RUN/EOT 토큰 매칭
+
+    ESC가 있을 때만 ANSI 코드를 제거하고, '@@'가 없는 줄은 정규식 없이 거름.
+
+    Returns:
+        Ack, Run, Eot 중 하나 (토큰이 아니면 None)
+    """
+    if ESC in line:
+        line = strip_ansi_codes(line)
+    if "@@" not in line:
+        return None
+    m = TOKEN_RE.match(line)
+    return _token_from_match(m) if m else None
+
+
+def scan(text: str) -> Iterator[Token]:
+    """
+    캡처 버퍼 전체에서 토큰을 순서대로 추출
+
+    줄 단위로 나누지 않고 '@@' 위치로 건너뛰며 해당 줄만 정규식으로 확인.
+    """
+    if ESC in text:
+        text = strip_ansi_codes(text)
+    pos = text.find("@@")
+    while pos != -1:
+        start = text.rfind("\n", 0, pos) + 1
+        end = text.find("\n", pos)
+        if end == -1:
+            end = len(text)
+        m = TOKEN_SCAN_RE.match(text, start, end)
+        if m:
+            yield _token_from_match(m)
+        pos = text.find("@@", end)
 
 
 def parse_ack(line: str) -> Optional[Ack]:
     """ACK 토큰 파싱 (ANSI 코드 자동 제거)"""
-    clean_line = strip_ansi_codes(line)
-    m = ACK_RE.match(clean_line)
-    return Ack(m["id"]) if m else None
+    token = match_token(line)
+    return token if isinstance(token, Ack) else None
 
 
 def parse_run(line: str) -> Optional[Run]:
     """RUN 토큰 파싱 (ANSI 코드 자동 제거)"""
-    clean_line = strip_ansi_codes(line)
-    m = RUN_RE.match(clean_line)
-    return Run(m["id"], m["ts"]) if m else None
+    token = match_token(line)
+    return token if isinstance(token, Run) else None
 
 
 def parse_eot(line: str) -> Optional[Eot]:
-    """EOT 토큰 파싱 (ANSI 코드 자동 제거)"""
-    clean_line = strip_ansi_codes(line)
-    m = EOT_RE.match(clean_line)
-    return Eot(m["id"], m["status"]) if m else None
\ No newline at end of file
+    """EOT 토큰 파싱 (ANSI 코드 자동 제거, 메타데이터는 .meta)"""
+    token = match_token(line)
+    return token if isinstance(token, Eot) else None
\ No newline at end of file
@@ -3,7 +3,7 @@
 """
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
 
 
 @dataclass
@@ -14,6 +14,7 @@ class HandshakeResult:
     error: Optional[str] = None
     duration: Optional[float] = None
     task_id: Optional[str] = None
+    phases: Optional[Dict[str, float]] = None  # 단계별 도달 시각 (send/ack/run/eot)
     
     def __bool__(self) -> bool:
         return self.success
\ No newline at end of file
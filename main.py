@@ -6,7 +6,10 @@ AI Orchestra v02 - Main CLI for smoke testing
 import argparse
 import sys
 from controllers.tmux_controller import TmuxController
-from core.idempotency import check_duplicate, save_result, get_cached_result
+from core.idempotency import (
+    DONE, FAILED, PENDING, IdempotencyManager, SQLiteIdempotencyStore, configure_default,
+    claim_task, release_task, save_result, save_failure
+)
 from core.retry import retry_with_backoff
 
 
@@ -24,14 +27,22 @@ def main():
     )
     parser.add_argument(
         "--task", 
-        required=True, 
         help="task id (idempotency key)"
     )
     parser.add_argument(
         "--cmd", 
-        required=True, 
         help="command to execute"
     )
+    parser.add_argument(
+        "--batch",
+        help="file of EXEC lines tagged with pane=/target= ('-' for stdin)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="max concurrent handshakes in batch mode (default: 8)"
+    )
     parser.add_argument(
         "--timeout-ack", 
         type=float, 
@@ -55,23 +66,44 @@ def main():
         action="store_true",
         help="Skip idempotency check"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Detect tokens via tmux pipe-pane instead of capture-pane polling"
+    )
     
     args = parser.parse_args()
     
-    # 멱등성 체크
-    if not args.skip_idempotency and check_duplicate(args.task):
-        cached = get_cached_result(args.task)
-        print(f"✅ Task {args.task} already completed (cached)")
-        if cached:
-            print(f"   Result: {cached}")
-        sys.exit(0)
+    if args.batch:
+        sys.exit(run_batch(args))
+    if not args.task or not args.cmd:
+        parser.error("--task and --cmd are required unless --batch is given")
     
+    # 멱등성 체크 (실행 간 공유되는 영속 저장소에서 원자적으로 선점)
+    if not args.skip_idempotency:
+        configure_default(SQLiteIdempotencyStore())
+        lease = args.timeout_ack + args.timeout_run + args.timeout_eot + 30
+        state, cached = claim_task(args.task, lease=lease)
+        if state == DONE:
+            print(f"✅ Task {args.task} already completed (cached)")
+            if cached:
+                print(f"   Result: {getattr(cached, 'status', cached)}")
+            sys.exit(0)
+        if state == FAILED:
+            print(f"❌ Task {args.task} failed moments ago (cached): {getattr(cached, 'error', cached)}",
+                  file=sys.stderr)
+            sys.exit(1)
+        if state == PENDING:
+            print(f"⏳ Task {args.task} is already running elsewhere", file=sys.stderr)
+            sys.exit(1)
+    
+    recorded = False
     try:
         # 어댑터 사용 여부 확인
         if args.adapter:
             # 어댑터 모드
             from adapters import get_adapter
-            from adapters.base import AdapterConfig
+            from adapters.base import AdapterConfig, AsyncBaseAdapter
             
             adapter_class = get_adapter(args.adapter)
             if not adapter_class:
@@ -90,7 +122,7 @@ def main():
                 timeout_eot=args.timeout_eot
             )
             
-            if args.adapter == "tmux":
+            if args.adapter in ("tmux", "tmux_async"):
                 if not args.pane:
                     print("❌ --pane required for tmux adapter", file=sys.stderr)
                     sys.exit(1)
@@ -98,38 +130,97 @@ def main():
             else:
                 adapter = adapter_class(config)
             
-            result = adapter.execute_with_handshake(
-                exec_line=args.cmd,
-                task_id=args.task
-            )
+            if isinstance(adapter, AsyncBaseAdapter):
+                result = adapter.execute_with_handshake_sync(
+                    exec_line=args.cmd,
+                    task_id=args.task
+                )
+            else:
+                result = adapter.execute_with_handshake(
+                    exec_line=args.cmd,
+                    task_id=args.task
+                )
         else:
             # 기존 tmux 직접 모드 (하위 호환성)
             if not args.pane:
                 print("❌ --pane required", file=sys.stderr)
                 sys.exit(1)
             
-            controller = TmuxController(args.pane)
-            result = controller.execute_with_handshake(
-                command=args.cmd,
-                task_id=args.task,
-                timeout_ack=args.timeout_ack,
-                timeout_run=args.timeout_run,
-                timeout_eot=args.timeout_eot
-            )
+            controller = TmuxController(args.pane, use_pipe=args.stream)
+            try:
+                result = controller.execute_with_handshake(
+                    command=args.cmd,
+                    task_id=args.task,
+                    timeout_ack=args.timeout_ack,
+                    timeout_run=args.timeout_run,
+                    timeout_eot=args.timeout_eot
+                )
+            finally:
+                controller.close()
         
-        # 결과 처리
+        # 결과 처리 (배치 모드와 같은 저장소를 쓰므로 HandshakeResult 그대로 저장)
         if result.success:
             print(f"✅ EOT OK ({result.status})")
             if not args.skip_idempotency:
-                save_result(args.task, result.status)
+                save_result(args.task, result)
+            recorded = True
             sys.exit(0)
         else:
             print(f"❌ EOT FAILED ({result.error})", file=sys.stderr)
+            if not args.skip_idempotency:
+                # 짧은 시간 동안 같은 작업 재시도 억제 (negative cache)
+                save_failure(args.task, result)
+                recorded = True
             sys.exit(1)
             
     except Exception as e:
         print(f"❌ Error: {e}", file=sys.stderr)
         sys.exit(1)
+    finally:
+        # 결과 없이 끝나면 선점 해제 (재실행 가능하도록)
+        if not recorded and not args.skip_idempotency:
+            release_task(args.task)
+
+
+def run_batch(args) -> int:
+    """EXEC 줄 스트림을 pane별 큐로 스케줄링하여 실행"""
+    from controllers.scheduler import HandshakeScheduler, registry_adapter_factory
+    
+    scheduler = HandshakeScheduler(
+        adapter_factory=registry_adapter_factory(
+            timeout_ack=args.timeout_ack,
+            timeout_run=args.timeout_run,
+            timeout_eot=args.timeout_eot
+        ),
+        max_concurrency=args.concurrency,
+        idempotency=None if args.skip_idempotency else IdempotencyManager(SQLiteIdempotencyStore())
+    )
+    
+    stream = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+    try:
+        futures = scheduler.submit_many(stream)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        scheduler.shutdown(wait=False)
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    
+    failed = 0
+    for future in futures:
+        result = future.result()
+        if result.success:
+            print(f"✅ {result.task_id}: EOT OK ({result.status})")
+        else:
+            failed += 1
+            print(f"❌ {result.task_id}: {result.status} ({result.error})", file=sys.stderr)
+    
+    stats = scheduler.stats()
+    scheduler.shutdown()
+    print(f"📊 completed={stats['completed']} failed={stats['failed']} "
+          f"coalesced={stats['coalesced']} throughput={stats['throughput_per_s']:.2f}/s")
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
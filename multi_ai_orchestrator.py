@@ -4,29 +4,62 @@ Multi-AI Orchestrator
 GitHub Issue → Multiple AIs → Automatic Review → Final Report
 """
 
-import subprocess
 import json
 import time
+import shlex
+import threading
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import os
 
+from core.dag import DagExecutor, JOIN_ALL_DONE, JOIN_QUORUM, Node, NodeContext, NodeResult, Pipeline
+from core.procmux import ProcessMultiplexer, agent_slots
+from core.intake import IssueIntake, IssueQueue, QueuedIssue
+from core.github_client import GitHubError, GitHubWriter, default_writer
+from core.issue_cache import IssueCache, default_issue_cache
+
+# 에이전트 응답 마감 시간 (초)
+AI_TIMEOUT = 300
+
 class MultiAIOrchestrator:
-    def __init__(self):
+    def __init__(self, review_quorum: Optional[int] = None, github: Optional[GitHubWriter] = None,
+                 issues: Optional[IssueCache] = None):
+        """
+        Args:
+            review_quorum: 이 수만큼 AI가 응답하면 나머지를 기다리지 않고 최종 리뷰 시작
+                (None이면 모든 AI가 끝난 뒤 리뷰)
+            github: GitHub 쓰기 큐 (기본: 프로세스 공유 큐)
+            issues: 이슈 캐시 (기본: 프로세스 공유 캐시)
+        """
         self.ais = {
             "gemini": {
                 "cmd": "gemini -p",
-                "role": "아키텍처 설계 & 코드 리뷰"
+                "role": "아키텍처 설계 & 코드 리뷰",
+                "timeout": AI_TIMEOUT
             },
             "claude": {
                 "cmd": "claude -p",  
-                "role": "구현 & 최적화"
+                "role": "구현 & 최적화",
+                "timeout": AI_TIMEOUT
             },
             "codex": {
                 "cmd": "codex -p",
-                "role": "코드 생성 & 리팩토링"
+                "role": "코드 생성 & 리팩토링",
+                "timeout": AI_TIMEOUT
             }
         }
+        # 에이전트별 동시 실행 수 (github: 이슈 코멘트 작성)
+        # review는 claude 분석과 별도 키: 쿼럼으로 먼저 시작할 때 claude 분석을 기다리지 않음
+        # (claude 실행 파일 자체의 동시 실행 수는 agent_slots가 제한)
+        self.agent_limits = {"gemini": 1, "claude": 1, "codex": 1, "review": 1, "github": 1}
+        self.review_quorum = review_quorum
+        # 모든 AI 프로세스의 출력을 한 스레드에서 수집
+        self.mux = ProcessMultiplexer()
+        self.github = github or default_writer()
+        self.issues = issues
+        # 이슈별 분석 결과 코멘트 섹션 (AI 이름 → 내용)
+        self._sections: Dict[tuple, Dict[str, str]] = {}
+        self._sections_lock = threading.Lock()
         
     def process_github_issue(self, issue_number: int, repo: str = "ihw33/ai-orchestra-v02"):
         """GitHub 이슈를 읽고 여러 AI에게 동시에 작업 지시"""
@@ -35,50 +68,98 @@ class MultiAIOrchestrator:
         print(f"📋 Issue #{issue_number} 처리 시작...")
         issue_body = self._get_issue_body(issue_number, repo)
         
-        # 2. 각 AI에게 동시에 작업 지시 (병렬 처리)
-        results = {}
-        processes = {}
-        
-        for ai_name, ai_config in self.ais.items():
-            prompt = self._create_ai_prompt(ai_name, ai_config["role"], issue_body)
-            print(f"🤖 {ai_name.upper()} 작업 시작...")
-            
-            # 백그라운드로 실행
-            process = subprocess.Popen(
-                f'{ai_config["cmd"]} "{prompt}"',
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-            processes[ai_name] = process
-        
-        # 3. 모든 AI 응답 수집
-        for ai_name, process in processes.items():
-            stdout, stderr = process.communicate()
-            results[ai_name] = {
-                "output": stdout.strip(),
-                "error": stderr.strip() if stderr else None,
-                "timestamp": datetime.now().isoformat()
-            }
-            print(f"✅ {ai_name.upper()} 완료")
-        
-        # 4. 결과를 GitHub 이슈에 코멘트로 추가
-        self._post_results_to_issue(issue_number, repo, results)
-        
-        # 5. 전체 리뷰 요청 (다른 AI에게)
-        review = self._request_final_review(results)
-        
-        # 6. 최종 리뷰도 이슈에 추가
-        self._post_review_to_issue(issue_number, repo, review)
+        # 2. AI 분석 병렬 실행 → 끝나는 대로 결과 게시, 최종 리뷰 병렬 → 리뷰 게시
+        outputs = DagExecutor(self.agent_limits).run(
+            self.build_pipeline(issue_number, repo), {"issue": issue_body}
+        )
+        results = self._collect(outputs)
+        review = outputs["review"].output if outputs["review"].success else ""
+        with self._sections_lock:
+            self._sections.pop((repo, issue_number), None)
         
         return results, review
     
+    def build_pipeline(self, issue_number: int, repo: str) -> Pipeline:
+        """
+        AI별 분석(fan-out) → AI별 결과 게시 / 최종 리뷰(fan-in, 일부 실패해도 진행) → 리뷰 게시
+
+        review_quorum이 있으면 그 수만큼 성공한 시점에 리뷰를 시작하고,
+        리뷰 게시는 남은 AI 결과 게시를 기다리지 않음.
+        """
+        analyses = tuple(self.ais)
+        posts = tuple(f"post_{ai_name}" for ai_name in analyses)
+        nodes = [
+            Node(ai_name, ai_name, lambda ctx, ai_name=ai_name: self._run_ai(ai_name, ctx.inputs["issue"]),
+                 succeeded=lambda result: result["success"])
+            for ai_name in analyses
+        ]
+        nodes += [
+            Node(f"post_{ai_name}", "github",
+                 lambda ctx, ai_name=ai_name: self._post_results_to_issue(
+                     issue_number, repo, self._collect({ai_name: ctx.inputs[ai_name]})),
+                 depends_on=(ai_name,), join=JOIN_ALL_DONE)
+            for ai_name in analyses
+        ]
+        if self.review_quorum:
+            review_join = dict(join=JOIN_QUORUM, quorum=self.review_quorum)
+            post_after = ("review",)
+        else:
+            review_join = dict(join=JOIN_ALL_DONE)
+            post_after = ("review",) + posts
+        nodes += [
+            Node("review", "review",
+                 lambda ctx: self._request_final_review(self._collect(ctx.inputs)),
+                 depends_on=analyses, **review_join),
+            Node("post_review", "github",
+                 lambda ctx: self._post_review_to_issue(issue_number, repo, ctx.inputs["review"]),
+                 depends_on=post_after),
+        ]
+        return Pipeline(nodes)
+    
+    def _run_ai(self, ai_name: str, issue_body: str) -> Dict:
+        """AI 하나에게 작업 지시 후 응답 수집"""
+        prompt = self._create_ai_prompt(ai_name, self.ais[ai_name]["role"], issue_body)
+        timeout = self.ais[ai_name].get("timeout")
+        print(f"🤖 {ai_name.upper()} 작업 시작...")
+        argv = shlex.split(self.ais[ai_name]["cmd"]) + [prompt]
+        with agent_slots.slot(argv[0]):
+            process = self.mux.run(argv, timeout=timeout)
+        if process.timed_out:
+            print(f"⏰ {ai_name.upper()} {timeout}초 초과로 중단")
+            error = f"Timed out after {timeout}s"
+        else:
+            print(f"✅ {ai_name.upper()} 완료")
+            error = process.stderr.strip() or None
+        return {
+            "output": process.stdout.strip(),
+            "error": error,
+            "success": process.ok,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def _collect(self, values: Dict[str, Any]) -> Dict[str, Dict]:
+        """노드 출력에서 AI별 결과만 추출 (출력 없이 실패한 노드는 오류로 기록)"""
+        results = {}
+        for ai_name in self.ais:
+            value = values.get(ai_name)
+            if isinstance(value, NodeResult):
+                value = value.output if value.output is not None else {
+                    "output": "",
+                    "error": value.error,
+                    "success": False,
+                    "timestamp": datetime.now().isoformat()
+                }
+            if value is not None:
+                results[ai_name] = value
+        return results
+    
     def _get_issue_body(self, issue_number: int, repo: str) -> str:
         """GitHub 이슈 내용 가져오기"""
-        cmd = f"gh issue view {issue_number} -R {repo} --json body -q .body"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        return result.stdout.strip()
+        try:
+            return ((self.issues or default_issue_cache()).get(repo, issue_number)["body"] or "").strip()
+        except GitHubError as e:
+            print(f"⚠️ 이슈 조회 실패: {e}")
+            return ""
     
     def _create_ai_prompt(self, ai_name: str, role: str, issue_body: str) -> str:
         """각 AI용 프롬프트 생성"""
@@ -95,17 +176,17 @@ class MultiAIOrchestrator:
 4. 추가 제안사항"""
     
     def _post_results_to_issue(self, issue_number: int, repo: str, results: Dict):
-        """AI 응답들을 이슈 코멘트로 추가"""
-        comment = "## 🤖 Multi-AI Analysis Results\\n\\n"
+        """AI 응답들을 이슈 코멘트에 추가 (AI마다 새 코멘트 대신 결과 코멘트 하나를 수정)"""
+        with self._sections_lock:
+            sections = self._sections.setdefault((repo, issue_number), {})
+            for ai_name, result in results.items():
+                section = f"### {ai_name.upper()} ({self.ais[ai_name]['role']})\n"
+                section += f"```\n{result['output'][:1000]}...\n```\n"
+                section += f"*Completed at: {result['timestamp']}*\n\n"
+                sections[ai_name] = section
+            comment = "## 🤖 Multi-AI Analysis Results\n\n" + "".join(sections.values())
         
-        for ai_name, result in results.items():
-            comment += f"### {ai_name.upper()} ({self.ais[ai_name]['role']})\\n"
-            comment += f"```\\n{result['output'][:1000]}...\\n```\\n"
-            comment += f"*Completed at: {result['timestamp']}*\\n\\n"
-        
-        # GitHub CLI로 코멘트 추가
-        cmd = f'gh issue comment {issue_number} -R {repo} -b "{comment}"'
-        subprocess.run(cmd, shell=True)
+        self.github.progress(repo, issue_number, "multi-ai-results", comment)
         print(f"💬 Issue #{issue_number}에 AI 응답 추가 완료")
     
     def _request_final_review(self, results: Dict) -> str:
@@ -121,14 +202,10 @@ class MultiAIOrchestrator:
 3. 우선순위 권장사항"""
         
         # Claude에게 최종 리뷰 요청
-        process = subprocess.Popen(
-            f'claude -p "{review_prompt}"',
-            shell=True,
-            stdout=subprocess.PIPE,
-            text=True
-        )
-        review, _ = process.communicate()
-        return review.strip()
+        argv = shlex.split(self.ais["claude"]["cmd"]) + [review_prompt]
+        with agent_slots.slot(argv[0]):
+            process = self.mux.run(argv, timeout=self.ais["claude"].get("timeout"))
+        return process.stdout.strip()
     
     def _post_review_to_issue(self, issue_number: int, repo: str, review: str):
         """최종 리뷰를 이슈에 추가"""
@@ -139,51 +216,53 @@ class MultiAIOrchestrator:
 ---
 *Automated by Multi-AI Orchestrator*"""
         
-        cmd = f'gh issue comment {issue_number} -R {repo} -b "{comment}"'
-        subprocess.run(cmd, shell=True)
+        self.github.comment(repo, issue_number, comment)
         print(f"📝 최종 리뷰 추가 완료")
 
 class AutomatedWorkflow:
     """GitHub Webhook과 연동되는 자동 워크플로우"""
     
-    def __init__(self):
+    def __init__(self, queue: Optional[IssueQueue] = None):
         self.orchestrator = MultiAIOrchestrator()
         self.watch_labels = ["ai-review", "multi-ai", "needs-analysis"]
+        # 웹훅/폴링으로 받은 이슈는 영속 큐를 거쳐 처리 (재시작해도 중복 처리 없음)
+        self.intake = IssueIntake("multi-ai", self.watch_labels, queue,
+                                  github=self.orchestrator.github.client,
+                                  issues=self.orchestrator.issues or default_issue_cache())
     
-    def watch_issues(self, repo: str = "ihw33/ai-orchestra-v02"):
-        """특정 라벨이 붙은 이슈 자동 처리"""
-        while True:
-            # 라벨이 붙은 이슈 확인
-            for label in self.watch_labels:
-                cmd = f"gh issue list -R {repo} -l {label} --json number,state -q '.[] | select(.state==\"OPEN\") | .number'"
-                result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-                
-                if result.stdout:
-                    issue_numbers = result.stdout.strip().split('\n')
-                    for issue_num in issue_numbers:
-                        if issue_num:
-                            print(f"🎯 Processing Issue #{issue_num} with label '{label}'")
-                            self.orchestrator.process_github_issue(int(issue_num), repo)
-                            
-                            # 처리 완료 라벨 추가
-                            subprocess.run(
-                                f"gh issue edit {issue_num} -R {repo} --add-label ai-processed",
-                                shell=True
-                            )
-            
-            # 30초마다 체크
-            time.sleep(30)
+    def watch_issues(self, repo: str = "ihw33/ai-orchestra-v02", port: Optional[int] = None,
+                     stop: Optional[threading.Event] = None, workers: Optional[int] = None):
+        """
+        특정 라벨이 붙은 이슈 자동 처리
+
+        Args:
+            port: 웹훅 수신 포트 (None이면 조건부 폴링만 30초마다, 있으면 5분마다 fallback)
+            stop: 설정되면 루프 종료
+            workers: 동시에 처리할 이슈 수 (기본: INTAKE_WORKERS)
+        """
+        if workers:
+            self.intake.workers = workers
+        server = self.intake.serve(port) if port is not None else None
+        self.intake.poll_interval = 300 if server else 30
+        try:
+            self.intake.run(repo, self._process_queued, stop)
+        finally:
+            if server:
+                server.stop()
+    
+    def _process_queued(self, item: QueuedIssue):
+        print(f"🎯 Processing Issue #{item.number} with label '{item.label}'")
+        self.orchestrator.process_github_issue(item.number, item.repo)
+        
+        # 처리 완료 라벨 추가
+        self.orchestrator.github.add_labels(item.repo, item.number, ["ai-processed"])
     
-    def handle_webhook(self, payload: dict):
-        """GitHub Webhook 이벤트 처리"""
-        if payload.get("action") == "labeled":
-            label = payload["label"]["name"]
-            if label in self.watch_labels:
-                issue_number = payload["issue"]["number"]
-                repo = payload["repository"]["full_name"]
-                
-                print(f"🔔 Webhook: Issue #{issue_number} labeled with '{label}'")
-                self.orchestrator.process_github_issue(issue_number, repo)
+    def handle_webhook(self, payload: dict, event: str = "issues") -> bool:
+        """GitHub Webhook 이벤트 처리 (처리 대상이면 큐에 추가)"""
+        queued = self.intake.handle_webhook(payload, event)
+        if queued:
+            print(f"🔔 Webhook: Issue #{payload['issue']['number']} queued")
+        return queued
 
 # CLI 실행
 if __name__ == "__main__":
@@ -194,15 +273,17 @@ if __name__ == "__main__":
             # 자동 감시 모드
             workflow = AutomatedWorkflow()
             print("👀 Watching for issues with AI labels...")
-            workflow.watch_issues()
+            port = int(sys.argv[2]) if len(sys.argv) > 2 else None
+            workflow.watch_issues(port=port)
         elif sys.argv[1].isdigit():
             # 특정 이슈 처리
             orchestrator = MultiAIOrchestrator()
             orchestrator.process_github_issue(int(sys.argv[1]))
+            orchestrator.github.flush(timeout=60)
     else:
         print("""
 Multi-AI Orchestrator
 Usage:
   python multi_ai_orchestrator.py <issue_number>  # 특정 이슈 처리
-  python multi_ai_orchestrator.py watch           # 자동 감시 모드
+  python multi_ai_orchestrator.py watch [port]    # 자동 감시 모드 (port: 웹훅 수신)
         """)
\ No newline at end of file
@@ -6,11 +6,14 @@ AI Persona Training Data Generation System
 
 import json
 import subprocess
-from typing import Dict, List
+from typing import Dict, List, Optional
 import hashlib
 import os
 from datetime import datetime
 
+from core.github_client import GitHubError
+from core.issue_cache import IssueCache, default_issue_cache
+
 class PersonaTrainingSystem:
     """
     다양한 페르소나의 AI들이 동일한 문제를 각자의 관점으로 해결
@@ -203,17 +206,22 @@ class AutomatedLearningPipeline:
     GitHub Issue → Multi-Persona Solutions → Training Data → Model Fine-tuning
     """
     
-    def __init__(self):
+    def __init__(self, issues: Optional[IssueCache] = None):
         self.training_system = PersonaTrainingSystem()
+        self.issues = issues
     
     def process_from_github(self, repo: str = "ihw33/ai-orchestra-v02"):
         """
         GitHub 이슈들을 학습 데이터로 변환
         """
-        # 모든 오픈 이슈 가져오기
-        cmd = f"gh issue list -R {repo} --json number,title,body -q '.[]'"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        issues = json.loads(result.stdout) if result.stdout else []
+        # 모든 오픈 이슈 가져오기 (공유 이슈 캐시가 목록 ETag로 조건부 요청)
+        cache = self.issues or default_issue_cache()
+        try:
+            issues = cache.list_open(repo)
+        except GitHubError as e:
+            # 조회 실패는 이슈가 없는 것으로 처리
+            print(f"❌ GitHub 이슈 조회 실패: {e}")
+            issues = []
         
         problems = []
         for issue in issues:
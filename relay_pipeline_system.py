@@ -8,11 +8,22 @@ AI Relay Pipeline System
 import subprocess
 import json
 import time
+import threading
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from queue import Queue, Empty
+from typing import Callable, Dict, List, Optional, Any
 from enum import Enum
 import os
 
+from core.dag import DagExecutor, Node, Pipeline, NodeContext
+from core.intake import IssueIntake, IssueQueue, QueuedIssue
+from core.procmux import agent_slots
+from core.github_client import GitHubError, GitHubWriter, default_writer
+from core.issue_cache import IssueCache, default_issue_cache
+
+# 단계별 AI 실행 제한 시간 (초)
+STAGE_TIMEOUT = 60
+
 class PipelineStage(Enum):
     """파이프라인 단계 정의"""
     PENDING = "pending"
@@ -28,32 +39,57 @@ class RelayPipeline:
     각 AI가 이전 AI의 결과를 받아서 작업
     """
     
-    def __init__(self):
+    def __init__(self, github: Optional[GitHubWriter] = None, issues: Optional[IssueCache] = None):
+        """
+        Args:
+            github: GitHub 쓰기 큐 (기본: 프로세스 공유 큐)
+            issues: 이슈 캐시 (기본: 프로세스 공유 캐시)
+        """
         # 릴레이 단계 정의
         self.stages = [
             {
+                "name": "implement",
                 "stage": PipelineStage.IMPLEMENTING,
                 "ai": "claude",
                 "role": "구현",
                 "prompt_template": self._implementation_prompt,
-                "success_criteria": ["코드 생성 완료", "함수 구현", "class"]
+                "success_criteria": ["코드 생성 완료", "함수 구현", "class"],
+                "stream": True,
+                # 이 섹션이 끝나면 'implement:handoff'에 의존하는 단계가 먼저 시작
+                "handoff_section": "## 다음 단계 전달 사항"
             },
             {
+                "name": "test",
+                "depends_on": ["implement:handoff"],
                 "stage": PipelineStage.TESTING,
                 "ai": "gemini",
                 "role": "테스트 & 검증",
                 "prompt_template": self._testing_prompt,
-                "success_criteria": ["테스트 통과", "검증 완료", "PASS"]
+                "success_criteria": ["테스트 통과", "검증 완료", "PASS"],
+                "stream": True
             },
             {
+                # 리뷰는 테스트와 병렬로 구현 결과 전체를 검토
+                "name": "review",
+                "depends_on": ["implement"],
                 "stage": PipelineStage.REVIEWING,
                 "ai": "codex",
                 "role": "코드 리뷰",
                 "prompt_template": self._review_prompt,
-                "success_criteria": ["리뷰 완료", "승인", "APPROVED"]
+                "success_criteria": ["리뷰 완료", "승인", "APPROVED"],
+                "stream": True
             }
         ]
         
+        # 에이전트별 동시 실행 수
+        self.agent_limits = {"claude": 1, "gemini": 1, "codex": 1}
+        
+        self.github = github or default_writer()
+        self.issues = issues
+        # 이슈별 진행 코멘트 섹션 (단계 이름 → 내용)
+        self._progress: Dict[tuple, Dict[str, str]] = {}
+        self._progress_lock = threading.Lock()
+        
         self.pipeline_logs = []
         self.results_path = "pipeline_results/"
         os.makedirs(self.results_path, exist_ok=True)
@@ -77,52 +113,203 @@ class RelayPipeline:
         # 이슈 내용 가져오기
         issue_body = self._get_issue_content(issue_number, repo)
         
-        # 릴레이 실행 - 각 단계를 순차적으로
-        previous_output = issue_body
-        current_stage = 0
-        
-        while current_stage < len(self.stages):
-            stage_config = self.stages[current_stage]
-            print(f"\n📍 Stage {current_stage + 1}: {stage_config['role']}")
-            print("-" * 40)
-            
-            # 현재 단계 실행
-            stage_result = self._execute_stage(
-                stage_config=stage_config,
-                input_data=previous_output,
-                issue_number=issue_number,
-                stage_num=current_stage + 1
-            )
-            
-            # 결과 기록
-            pipeline_run["stages"].append(stage_result)
-            
-            # GitHub 이슈에 진행상황 업데이트
-            self._update_issue_progress(issue_number, repo, stage_result)
-            
-            # 성공 여부 확인
-            if stage_result["success"]:
-                print(f"✅ {stage_config['role']} 완료")
-                previous_output = stage_result["output"]
-                current_stage += 1
-            else:
-                print(f"❌ {stage_config['role']} 실패")
-                pipeline_run["final_status"] = "FAILED"
-                break
+        # 릴레이 실행 - 단계 DAG를 의존 관계대로 병렬 실행
+        results = DagExecutor(self.agent_limits).run(self.build_pipeline(issue_number, repo),
+                                                     {"issue": issue_body})
+        pipeline_run["stages"] = [r.output for r in results.values() if r.output is not None]
         
         # 파이프라인 완료
-        if current_stage == len(self.stages):
+        if all(r.success for r in results.values()):
             pipeline_run["final_status"] = "COMPLETED"
             print("\n🎉 파이프라인 완료!")
             
             # 최종 결과를 이슈에 추가
             self._post_final_result(issue_number, repo, pipeline_run)
+        else:
+            pipeline_run["final_status"] = "FAILED"
         
         # 결과 저장
         self._save_pipeline_run(pipeline_run)
+        with self._progress_lock:
+            self._progress.pop((repo, issue_number), None)
         
         return pipeline_run
     
+    def build_pipeline(self, issue_number: int, repo: str) -> Pipeline:
+        """
+        stages 정의를 DAG로 변환
+        
+        depends_on이 없는 단계는 이슈 본문을, 나머지는 선행 단계 출력을 입력으로
+        받음. 'stage:handoff' 의존은 선행 단계의 전달 사항 섹션이 끝나는 즉시 충족.
+        """
+        nodes = []
+        for stage_num, stage_config in enumerate(self.stages, 1):
+            def run(ctx: NodeContext, stage_config=stage_config, stage_num=stage_num) -> Dict:
+                return self._run_stage_node(ctx, stage_config, issue_number, repo, stage_num)
+            
+            nodes.append(Node(
+                name=stage_config["name"],
+                agent=stage_config["ai"],
+                run=run,
+                depends_on=tuple(stage_config.get("depends_on", ())),
+                succeeded=lambda stage_result: stage_result["success"]
+            ))
+        return Pipeline(nodes)
+    
+    def _run_stage_node(self, ctx: NodeContext, stage_config: Dict, issue_number: int,
+                        repo: str, stage_num: int) -> Dict:
+        """DAG 노드로 단계 하나 실행 후 진행상황 업데이트"""
+        # 선행 단계 입력: 전달 사항 부분 출력(str) 또는 단계 결과(dict)
+        deps = [d.split(":", 1)[0] for d in stage_config.get("depends_on", ())]
+        texts = [ctx.inputs[d] if isinstance(ctx.inputs[d], str) else ctx.inputs[d]["output"] for d in deps]
+        input_data = "\n\n".join(texts) if deps else ctx.inputs["issue"]
+        print(f"\n📍 Stage {stage_num}: {stage_config['role']}")
+        print("-" * 40)
+        
+        def handoff(partial_output: str) -> None:
+            print(f"⏩ {stage_config['role']} 전달 사항 완료 - 다음 단계 먼저 시작")
+            ctx.publish("handoff", partial_output)
+        
+        # 동시에 처리 중인 다른 이슈와 합쳐 AI 실행 파일별 상한 적용
+        with agent_slots.slot(stage_config["ai"]):
+            if stage_config.get("stream"):
+                stage_result = self._execute_stage_streaming(
+                    stage_config=stage_config,
+                    input_data=input_data,
+                    issue_number=issue_number,
+                    stage_num=stage_num,
+                    on_handoff=handoff,
+                    cancel=ctx.cancel
+                )
+            else:
+                stage_result = self._execute_stage(
+                    stage_config=stage_config,
+                    input_data=input_data,
+                    issue_number=issue_number,
+                    stage_num=stage_num
+                )
+        
+        # GitHub 이슈에 진행상황 업데이트
+        self._update_issue_progress(issue_number, repo, stage_result)
+        mark = "✅" if stage_result["success"] else "❌"
+        print(f"{mark} {stage_config['role']} {'완료' if stage_result['success'] else '실패'}")
+        return stage_result
+    
+    def _execute_stage_streaming(self, stage_config: Dict, input_data: str,
+                                 issue_number: int, stage_num: int,
+                                 on_handoff: Optional[Callable[[str], None]] = None,
+                                 cancel: Optional[threading.Event] = None) -> Dict:
+        """
+        단일 스테이지를 스트리밍으로 실행
+        
+        stdout을 줄 단위로 읽으면서 첫 출력까지의 시간(time_to_first_feedback)과
+        성공 기준 충족 시점을 기록. handoff_section이 다음 '## ' 제목으로
+        끝나면 그때까지의 출력으로 on_handoff 호출.
+        
+        Args:
+            on_handoff: 전달 사항 섹션 완료 시 호출 (부분 출력 전달)
+            cancel: 설정되면 AI 프로세스를 종료하고 실패 처리
+        """
+        stage_result = {
+            "stage": stage_config["stage"].value,
+            "ai": stage_config["ai"],
+            "role": stage_config["role"],
+            "started_at": datetime.now().isoformat(),
+            "input_length": len(input_data),
+            "success": False
+        }
+        started = time.time()
+        
+        try:
+            prompt = stage_config["prompt_template"](input_data, issue_number, stage_num)
+            print(f"🤖 {stage_config['ai'].upper()} 작업 중... (streaming)")
+            process = subprocess.Popen(
+                [stage_config["ai"], "-p", prompt],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                bufsize=1,
+                env={**os.environ, "TIMEOUT": str(STAGE_TIMEOUT)}
+            )
+        except Exception as e:
+            stage_result["error"] = str(e)
+            stage_result["completed_at"] = datetime.now().isoformat()
+            return stage_result
+        
+        # stdout은 줄 단위로 큐에, stderr는 막히지 않도록 따로 수집
+        lines_queue: "Queue[Optional[str]]" = Queue()
+        stderr_chunks: List[str] = []
+        
+        def pump_stdout() -> None:
+            for line in process.stdout:
+                lines_queue.put(line)
+            lines_queue.put(None)
+        
+        threading.Thread(target=pump_stdout, daemon=True).start()
+        stderr_thread = threading.Thread(
+            target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True
+        )
+        stderr_thread.start()
+        
+        criteria = [c.lower() for c in stage_config["success_criteria"]]
+        handoff = stage_config.get("handoff_section") if on_handoff else None
+        in_section = False
+        criteria_met = False
+        aborted = False
+        lines: List[str] = []
+        deadline = started + STAGE_TIMEOUT
+        
+        while True:
+            if cancel is not None and cancel.is_set():
+                process.kill()
+                stage_result["error"] = "Cancelled (previous stage failed)"
+                aborted = True
+                break
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                process.kill()
+                stage_result["error"] = f"Timeout exceeded ({STAGE_TIMEOUT}s)"
+                aborted = True
+                break
+            try:
+                line = lines_queue.get(timeout=min(remaining, 0.5))
+            except Empty:
+                continue
+            if line is None:
+                break
+            
+            elapsed = round(time.time() - started, 3)
+            if not lines:
+                stage_result["time_to_first_feedback"] = elapsed
+            lines.append(line)
+            
+            # 성공 기준은 줄이 들어오는 대로 확인
+            if not criteria_met and any(c in line.lower() for c in criteria):
+                criteria_met = True
+                stage_result["criteria_met_seconds"] = elapsed
+            
+            if handoff:
+                stripped = line.strip()
+                if in_section and stripped.startswith("## "):
+                    stage_result["handoff_seconds"] = elapsed
+                    on_handoff("".join(lines[:-1]).strip())
+                    handoff = None
+                elif stripped.startswith(handoff):
+                    in_section = True
+        
+        process.wait()
+        stderr_thread.join(timeout=1)
+        stdout = "".join(lines)
+        stage_result["output"] = stdout.strip()
+        stage_result["error"] = stage_result.get("error") or ("".join(stderr_chunks).strip() or None)
+        stage_result["completed_at"] = datetime.now().isoformat()
+        stage_result["duration_seconds"] = round(time.time() - started, 3)
+        if not aborted:
+            # 기준 문구가 없으면 기존과 같이 의미있는 출력 길이로 판단
+            stage_result["success"] = criteria_met or len(stdout) > 100
+        
+        return stage_result
+    
     def _execute_stage(self, stage_config: Dict, input_data: str, 
                       issue_number: int, stage_num: int) -> Dict:
         """
@@ -170,6 +357,8 @@ class RelayPipeline:
             start = datetime.fromisoformat(stage_result["started_at"])
             end = datetime.fromisoformat(stage_result["completed_at"])
             stage_result["duration_seconds"] = (end - start).total_seconds()
+            # 출력을 한 번에 받으므로 첫 피드백 = 종료 시점
+            stage_result["time_to_first_feedback"] = stage_result["duration_seconds"]
             
         except subprocess.TimeoutExpired:
             stage_result["success"] = False
@@ -217,6 +406,9 @@ Issue #{issue_number}
 ## 다음 단계 전달 사항
 [테스터가 확인해야 할 핵심 기능]
 
+## 상태
+코드 생성 완료
+
 반드시 "코드 생성 완료"라는 문구를 포함하세요."""
     
     def _testing_prompt(self, input_data: str, issue_number: int, stage_num: int) -> str:
@@ -252,7 +444,7 @@ Issue #{issue_number}
         return f"""[STAGE {stage_num}: CODE REVIEW]
 Issue #{issue_number}
 
-테스트 완료된 코드:
+검토할 구현 결과:
 {input_data}
 
 작업:
@@ -282,20 +474,19 @@ Issue #{issue_number}
     
     def _get_issue_content(self, issue_number: int, repo: str) -> str:
         """GitHub 이슈 내용 가져오기"""
-        cmd = f"gh issue view {issue_number} -R {repo} --json title,body"
-        result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-        
-        if result.stdout:
-            data = json.loads(result.stdout)
-            return f"제목: {data['title']}\n\n{data['body']}"
-        return ""
+        try:
+            data = (self.issues or default_issue_cache()).get(repo, issue_number)
+        except GitHubError as e:
+            print(f"⚠️ 이슈 조회 실패: {e}")
+            return ""
+        return f"제목: {data['title']}\n\n{data.get('body') or ''}"
     
     def _update_issue_progress(self, issue_number: int, repo: str, stage_result: Dict):
-        """이슈에 진행상황 업데이트"""
+        """이슈에 진행상황 업데이트 (단계마다 새 코멘트 대신 진행 코멘트 하나를 수정)"""
         status_emoji = "✅" if stage_result["success"] else "❌"
         
-        comment = f"""## {status_emoji} Stage: {stage_result['role']}
-        
+        section = f"""## {status_emoji} Stage: {stage_result['role']}
+
 **AI**: {stage_result['ai']}
 **Status**: {'Success' if stage_result['success'] else 'Failed'}
 **Duration**: {stage_result.get('duration_seconds', 0):.2f}s
@@ -307,9 +498,11 @@ Issue #{issue_number}
 
 *Processed at: {stage_result['completed_at']}*
 """
-        
-        cmd = f'gh issue comment {issue_number} -R {repo} -b "{comment}"'
-        subprocess.run(cmd, shell=True)
+        with self._progress_lock:
+            sections = self._progress.setdefault((repo, issue_number), {})
+            sections[stage_result["stage"]] = section
+            comment = "# 🔄 Relay Pipeline Progress\n\n" + "\n".join(sections.values())
+        self.github.progress(repo, issue_number, "relay-progress", comment)
     
     def _post_final_result(self, issue_number: int, repo: str, pipeline_run: Dict):
         """최종 결과를 이슈에 게시"""
@@ -338,15 +531,11 @@ Status: **{pipeline_run['final_status']}**
 ---
 *Automated by Relay Pipeline System*"""
         
-        cmd = f'gh issue comment {issue_number} -R {repo} -b "{comment}"'
-        subprocess.run(cmd, shell=True)
+        self.github.comment(repo, issue_number, comment)
         
         # 완료 라벨 추가
         if pipeline_run['final_status'] == 'COMPLETED':
-            subprocess.run(
-                f"gh issue edit {issue_number} -R {repo} --add-label pipeline-completed",
-                shell=True
-            )
+            self.github.add_labels(repo, issue_number, ["pipeline-completed"])
     
     def _save_pipeline_run(self, pipeline_run: Dict):
         """파이프라인 실행 결과 저장"""
@@ -360,33 +549,42 @@ class AutomatedRelaySystem:
     GitHub Webhook과 연동된 자동 릴레이 시스템
     """
     
-    def __init__(self):
+    def __init__(self, queue: Optional[IssueQueue] = None):
         self.pipeline = RelayPipeline()
         self.watch_label = "relay-pipeline"
+        # 처리 상태는 영속 큐에 기록 (재시작해도 처리한 이슈는 건너뜀)
+        self.intake = IssueIntake("relay", [self.watch_label], queue,
+                                  github=self.pipeline.github.client,
+                                  issues=self.pipeline.issues or default_issue_cache())
     
-    def watch_and_process(self, repo: str = "ihw33/ai-orchestra-v02"):
+    def watch_and_process(self, repo: str = "ihw33/ai-orchestra-v02", port: Optional[int] = None,
+                          stop: Optional[threading.Event] = None, workers: Optional[int] = None):
         """
         특정 라벨이 붙은 이슈를 자동으로 릴레이 처리
+
+        Args:
+            port: 웹훅 수신 포트 (None이면 조건부 폴링만 10초마다, 있으면 5분마다 fallback)
+            stop: 설정되면 루프 종료
+            workers: 동시에 처리할 이슈 수 (기본: INTAKE_WORKERS)
         """
+        if workers:
+            self.intake.workers = workers
         print(f"👀 Watching for issues with label '{self.watch_label}'...")
-        
-        processed_issues = set()
-        
-        while True:
-            # 라벨이 붙은 이슈 확인
-            cmd = f'gh issue list -R {repo} -l {self.watch_label} --state open --json number'
-            result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-            
-            if result.stdout:
-                issues = json.loads(result.stdout)
-                for issue in issues:
-                    issue_num = issue['number']
-                    if issue_num not in processed_issues:
-                        print(f"\n🎯 새 이슈 발견: #{issue_num}")
-                        self.pipeline.process_issue(issue_num, repo)
-                        processed_issues.add(issue_num)
-            
-            time.sleep(10)  # 10초마다 체크
+        server = self.intake.serve(port) if port is not None else None
+        self.intake.poll_interval = 300 if server else 10
+        try:
+            self.intake.run(repo, self._process_queued, stop)
+        finally:
+            if server:
+                server.stop()
+    
+    def _process_queued(self, item: QueuedIssue):
+        print(f"\n🎯 새 이슈 발견: #{item.number}")
+        self.pipeline.process_issue(item.number, item.repo)
+    
+    def handle_webhook(self, payload: dict, event: str = "issues") -> bool:
+        """GitHub Webhook 이벤트 처리 (처리 대상이면 큐에 추가)"""
+        return self.intake.handle_webhook(payload, event)
 
 # CLI 인터페이스
 if __name__ == "__main__":
@@ -397,7 +595,7 @@ if __name__ == "__main__":
 Relay Pipeline System
 Usage:
   python relay_pipeline_system.py <issue_number>  # 특정 이슈 처리
-  python relay_pipeline_system.py watch            # 자동 감시 모드
+  python relay_pipeline_system.py watch [port]     # 자동 감시 모드 (port: 웹훅 수신)
   
 Example:
   python relay_pipeline_system.py 123
@@ -405,11 +603,13 @@ Example:
         """)
     elif sys.argv[1] == "watch":
         system = AutomatedRelaySystem()
-        system.watch_and_process()
+        port = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        system.watch_and_process(port=port)
     else:
         pipeline = RelayPipeline()
         issue_num = int(sys.argv[1])
         result = pipeline.process_issue(issue_num)
+        pipeline.github.flush(timeout=60)
         
         print("\n" + "="*60)
         print(f"Pipeline Result: {result['final_status']}")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+토큰 파서 마이크로벤치마크 - 기존 방식(ANSI 제거 + 토큰별 정규식) vs match_token/scan
+"""
+
+import sys
+import random
+import argparse
+import timeit
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.protocol import ACK_RE, RUN_RE, EOT_RE, strip_ansi_codes, match_token, scan
+
+
+def legacy_parse(line: str):
+    """통합 매처 도입 전 방식: 매 줄 ANSI 제거 후 토큰별 정규식을 차례로 시도"""
+    for regex in (ACK_RE, RUN_RE, EOT_RE):
+        m = regex.match(strip_ansi_codes(line))
+        if m:
+            return m
+    return None
+
+
+def make_buffer(lines: int, token_ratio: float, ansi_ratio: float, seed: int = 0) -> list:
+    """노이즈/컬러/토큰이 섞인 캡처 버퍼 생성"""
+    rng = random.Random(seed)
+    out = []
+    for i in range(lines):
+        if rng.random() < token_ratio:
+            line = rng.choice([f"@@ACK id=t{i}", f"@@RUN id=t{i} ts={i}", f"@@EOT id=t{i} status=OK dur_ms={i}"])
+        else:
+            line = f"[INFO] worker {i % 7} processed batch {i} in {rng.randint(1, 999)}ms"
+        if rng.random() < ansi_ratio:
+            line = f"\x1b[3{i % 8}m{line}\x1b[0m"
+        out.append(line)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark handshake token parsing")
+    parser.add_argument("--lines", type=int, default=200, help="Lines per capture buffer")
+    parser.add_argument("--token-ratio", type=float, default=0.02)
+    parser.add_argument("--ansi-ratio", type=float, default=0.1)
+    parser.add_argument("--repeat", type=int, default=500)
+    args = parser.parse_args()
+
+    lines = make_buffer(args.lines, args.token_ratio, args.ansi_ratio)
+    text = "\n".join(lines)
+
+    # 세 방식이 같은 토큰 수를 찾는지 확인
+    expected = sum(1 for line in lines if legacy_parse(line))
+    assert expected == sum(1 for line in lines if match_token(line)) == len(list(scan(text)))
+
+    cases = {
+        "legacy (strip + 3 regex)": lambda: [legacy_parse(line) for line in lines],
+        "match_token per line": lambda: [match_token(line) for line in lines],
+        "scan(buffer)": lambda: list(scan(text)),
+    }
+    print(f"{args.lines} lines, {expected} tokens, {args.repeat} repeats")
+    baseline = None
+    for name, fn in cases.items():
+        per_buffer = min(timeit.repeat(fn, number=args.repeat, repeat=3)) / args.repeat
+        baseline = baseline or per_buffer
+        print(f"  {name:<26} {per_buffer * 1e6:9.1f} us/buffer  x{baseline / per_buffer:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+KPI 압축 작업 - 보존 기간이 지난 원본 이벤트/세밀한 버킷 삭제 (cron 등에서 실행)
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.kpi import kpi
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the KPI SQLite store")
+    parser.add_argument("--chunk-size", type=int, default=5000, help="Rows deleted per transaction")
+    parser.add_argument("--vacuum-pages", type=int, default=1000, help="Max pages to release")
+    parser.add_argument(
+        "--enable-incremental-vacuum",
+        action="store_true",
+        help="One-time full VACUUM to switch a pre-auto_vacuum database to incremental mode "
+             "(blocks KPI writers while it runs)"
+    )
+    args = parser.parse_args()
+
+    converted = args.enable_incremental_vacuum and kpi.enable_incremental_vacuum()
+    deleted = kpi.compact(chunk_size=args.chunk_size, vacuum_pages=args.vacuum_pages)
+    print(json.dumps({"deleted": deleted, "converted_to_incremental": converted}))
+
+
+if __name__ == "__main__":
+    main()
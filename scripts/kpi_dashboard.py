@@ -46,6 +46,11 @@ def colorize(value: float, thresholds: Tuple[float, float] = (90, 80),
     return f"{colors[2]}{value:.1f}%\033[0m"  # Red
 
 
+def format_ms(value) -> str:
+    """지연 시간 표시 (없으면 '-')"""
+    return "-" if value is None else f"{value:.0f}ms"
+
+
 def check_alerts(metrics: dict, recent: dict) -> list:
     """알림 조건 체크"""
     alerts = []
@@ -137,6 +142,12 @@ def render_console(metrics: dict, recent: dict, alerts: list):
             print("Top Errors:")
             for error_type, count in list(recent['recent_errors'].items())[:3]:
                 print(f"  - {error_type}: {count}")
+        if recent.get('latency'):
+            print("Latency (p50 / p95 / p99):")
+            for phase, values in recent['latency'].items():
+                print(f"  {phase or '-'}: {format_ms(values.get('p50'))} / "
+                      f"{format_ms(values.get('p95'))} / {format_ms(values.get('p99'))} "
+                      f"(n={values['count']})")
     
     # 알림 표시
     if alerts:
@@ -7,7 +7,6 @@ GitHub Issue → Gemini → Comment 플로우 로컬 시뮬레이션
 import sys
 import os
 import subprocess
-import json
 from pathlib import Path
 
 # 프로젝트 루트를 Python 경로에 추가
@@ -20,17 +19,15 @@ def main():
     
     # 1. 최근 이슈 정보 가져오기
     print("\n📋 Step 1: 최근 이슈 정보 가져오기...")
-    result = subprocess.run(
-        ["gh", "issue", "view", "28", "-R", "ihw33/ai-orchestra-v02", "--json", "number,title,body"],
-        capture_output=True,
-        text=True
-    )
+    from core.github_client import GitHubError
+    from core.issue_cache import default_issue_cache
     
-    if result.returncode != 0:
-        print(f"❌ 이슈 정보를 가져올 수 없습니다: {result.stderr}")
+    try:
+        issue = default_issue_cache().get("ihw33/ai-orchestra-v02", 28)
+    except GitHubError as e:
+        print(f"❌ 이슈 정보를 가져올 수 없습니다: {e}")
         return 1
     
-    issue = json.loads(result.stdout)
     issue_num = issue["number"]
     issue_title = issue["title"]
     
@@ -8,6 +8,7 @@ from adapters import register_adapter, get_adapter, list_adapters
 from adapters.base import BaseAdapter, AdapterConfig
 from adapters.tmux_adapter import TmuxAdapter
 from core.types import HandshakeResult
+from core.protocol import Ack
 
 
 class TestAdapterRegistry:
@@ -155,4 +156,135 @@ def vulnerable():
         assert params['verb'] == 'ANALYZE'
         assert params['type'] == 'security'
         assert 'payload' in params
-        assert 'vulnerable' in params['payload']
\ No newline at end of file
+        assert 'vulnerable' in params['payload']
+
+class TestGeminiAdapter:
+    """GeminiAdapter 토큰 대기 테스트"""
+
+    def _adapter(self, mocker, outputs):
+        from adapters.gemini_adapter import GeminiAdapter, GeminiConfig
+        mocker.patch.object(GeminiAdapter, 'ensure_session')
+        mocker.patch.object(GeminiAdapter, 'verify_pane_exists')
+        mocker.patch.object(GeminiAdapter, 'send_to_pane', return_value=True)
+        mocker.patch.object(GeminiAdapter, 'capture_output', side_effect=outputs)
+        mocker.patch.object(GeminiAdapter, '_activity', return_value=None)
+        mocker.patch('adapters.gemini_adapter.time.sleep')
+        mocker.patch('adapters.gemini_adapter.kpi')
+        return GeminiAdapter(GeminiConfig(name="gemini"))
+
+    def test_calc_result_comes_from_eot_meta(self, mocker):
+        """프롬프트 에코의 자리표시자는 건너뛰고 EOT 메타의 숫자 결과 사용"""
+        echo = "@@ACK id=t1\n@@RUN id=t1\n@@EOT id=t1 status=OK result={result}\n"
+        adapter = self._adapter(mocker, [echo, echo, echo, echo + "@@EOT id=t1 status=OK result=4\n"])
+        result = adapter.execute_with_handshake('CALC expr="2+2"', "t1")
+        assert result.success is True
+        assert result.status == "OK:RESULT=4"
+
+    def test_general_command_returns_eot_status(self, mocker):
+        output = "@@ACK id=t2\n@@RUN id=t2\n@@EOT id=t2 status=FAIL error=boom\n"
+        adapter = self._adapter(mocker, [output] * 3)
+        result = adapter.execute_with_handshake("ANALYZE type=security", "t2")
+        assert result.status == "FAIL"
+
+    def test_send_is_one_tmux_exec_over_stdin(self, mocker):
+        """프롬프트는 셸 없이 stdin으로 로드하고 붙여넣기/Enter까지 한 번에 실행"""
+        from adapters import gemini_adapter
+        mocker.patch.dict(gemini_adapter._exists_cache, clear=True)
+        run = mocker.patch('adapters.gemini_adapter.subprocess.run')
+        run.return_value.returncode = 0
+        adapter = gemini_adapter.GeminiAdapter(gemini_adapter.GeminiConfig(name="gemini", pane_id="s:0.0"))
+        run.reset_mock()
+
+        assert adapter.send_to_pane("it's \"quoted\" $HOME") is True
+        run.assert_called_once()
+        argv = run.call_args.args[0]
+        assert argv[:2] == ["tmux", "load-buffer"] and argv.count(";") == 2
+        assert run.call_args.kwargs["input"] == "it's \"quoted\" $HOME"
+        assert "shell" not in run.call_args.kwargs
+
+    def test_control_send_timeout_is_not_resent(self, mocker):
+        """제어 모드로 이미 보낸 프롬프트는 응답이 없어도 다시 붙여넣지 않음"""
+        from adapters import gemini_adapter
+        from controllers.tmux_control import TmuxControlError
+        mocker.patch.object(gemini_adapter.GeminiAdapter, 'ensure_session')
+        mocker.patch.object(gemini_adapter.GeminiAdapter, 'verify_pane_exists')
+        mocker.patch.object(gemini_adapter.GeminiAdapter, '_listen_output')
+        control = mocker.patch('adapters.gemini_adapter.get_control_client').return_value
+        control.commands.side_effect = TmuxControlError("tmux command timed out", ["", None, None])
+        mocker.patch('adapters.gemini_adapter.time.sleep')
+        adapter = gemini_adapter.GeminiAdapter(
+            gemini_adapter.GeminiConfig(name="gemini", pane_id="s:0.0", use_control_mode=True)
+        )
+
+        assert adapter.send_to_pane("hello") is False
+        assert control.commands.call_count == 1
+
+    def test_existence_checks_are_cached(self, mocker):
+        from adapters import gemini_adapter
+        mocker.patch.dict(gemini_adapter._exists_cache, clear=True)
+        run = mocker.patch('adapters.gemini_adapter.subprocess.run')
+        run.return_value.returncode = 0
+        gemini_adapter.GeminiAdapter(gemini_adapter.GeminiConfig(name="gemini", pane_id="s:0.0"))
+        assert run.call_count == 2  # has-session + list-panes
+        gemini_adapter.GeminiAdapter(gemini_adapter.GeminiConfig(name="gemini", pane_id="s:0.0"))
+        assert run.call_count == 2
+
+    def test_poll_backs_off_and_skips_idle_captures(self, mocker):
+        """활동 시각이 그대로면 캡처를 건너뛰고 간격을 늘리며, 바뀌면 즉시 캡처 후 초기화"""
+        adapter = self._adapter(mocker, ["", "", "@@ACK id=t3\n"])
+        adapter._activity.side_effect = [1001, 1001, 1001, 1001, 1010]
+        mocker.patch('adapters.gemini_adapter.time.time', side_effect=[1000.0 + i for i in range(100)])
+        waits = []
+        mocker.patch.object(adapter._wake, 'wait', side_effect=lambda t: waits.append(t) or False)
+
+        token = adapter.wait_for_token(Ack, "t3", timeout=50)
+        assert token == Ack("t3")
+        assert adapter.capture_output.call_count == 3  # 첫 캡처, 같은 초 재확인, 활동 변경
+        assert waits == pytest.approx([0.05, 0.075, 0.1125, 0.16875])
+
+    def test_batch_demuxes_interleaved_tokens(self, mocker):
+        """한 프롬프트로 보낸 작업들의 토큰을 ID별로 나눠 EOT 순서대로 반환"""
+        outputs = [
+            "@@ACK id=<id>\n@@ACK id=b0\n@@ACK id=b1\n",
+            "@@ACK id=b0\n@@ACK id=b1\n@@RUN id=b1\n@@EOT id=b1 status=OK result=6\n",
+            "@@RUN id=b0\n@@EOT id=b0 status=FAIL error=x\n",
+        ]
+        adapter = self._adapter(mocker, outputs)
+        results = list(adapter.iter_batch(['CALC expr="2+2"', 'CALC expr="2*3"', "BOGUS"], ["b0", "b1", "b2"]))
+        assert [(r.task_id, r.status) for r in results] == [
+            ("b2", "INVALID_EXEC"), ("b1", "OK:RESULT=6"), ("b0", "FAIL")
+        ]
+        adapter.send_to_pane.assert_called_once()
+        prompt = adapter.send_to_pane.call_args.args[0]
+        assert "- id=b0: CALC 2+2" in prompt and "- id=b1: CALC 2*3" in prompt
+
+    def test_batch_times_out_unfinished_tasks_in_input_order(self, mocker):
+        adapter = self._adapter(mocker, ["@@ACK id=b0\n@@RUN id=b0\n@@EOT id=b0 status=OK\n"] + [""] * 50)
+        adapter.config.timeout_ack = 0.01
+        results = adapter.execute_batch(["ANALYZE type=x", "ANALYZE type=y"], ["b0", "b1"])
+        assert [(r.task_id, r.status) for r in results] == [("b0", "OK"), ("b1", "ACK_TIMEOUT")]
+
+    def test_token_waits_read_only_new_lines_after_send(self, mocker):
+        """토큰 대기는 PaneReader로 전송 이후 줄만 읽음 (이전 실행의 토큰 무시, 200줄 재캡처 없음)"""
+        pane = ["@@ACK id=t4", "@@RUN id=t4", "@@EOT id=t4 status=OK", ""]
+        captured = []
+
+        def tmux_query(self, *args):
+            captured.append(args[0])
+            if args[0] == "display-message":
+                return f"0 2000 {len(pane) - 1}\n"
+            start, end = int(args[args.index("-S") + 1]), int(args[args.index("-E") + 1])
+            return "\n".join(pane[start:end + 1]) + "\n"
+
+        def send(text):
+            pane[-1:] = ["@@ACK id=t4", "@@RUN id=t4", "@@EOT id=t4 status=FAIL error=new", ""]
+            return True
+
+        adapter = self._adapter(mocker, [])
+        mocker.patch.object(type(adapter), '_tmux_query', tmux_query)
+        adapter.send_to_pane.side_effect = send
+
+        result = adapter.execute_with_handshake("ANALYZE type=security", "t4")
+        assert result.status == "FAIL"
+        adapter.capture_output.assert_not_called()
+        assert captured.count("capture-pane") == 1
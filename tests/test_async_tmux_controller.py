@@ -0,0 +1,138 @@
+"""
+비동기 tmux 컨트롤러/어댑터 테스트
+"""
+
+import asyncio
+from unittest.mock import AsyncMock
+from adapters.base import AdapterConfig, AsyncBaseAdapter
+from adapters.tmux_adapter import AsyncTmuxAdapter
+from controllers.async_tmux_controller import AsyncTmuxController
+
+
+def _fake_tmux(captures):
+    """send-keys는 무시하고 capture-pane은 순서대로 응답"""
+    outputs = iter(captures)
+    
+    async def tmux(*args):
+        if args[0] == "capture-pane":
+            return next(outputs)
+        return ""
+    return tmux
+
+
+def test_async_handshake_success(mocker):
+    """비동기 핸드셰이크 성공"""
+    ctl = AsyncTmuxController("%3", poll_interval=0.0)
+    mocker.patch.object(ctl, "_tmux", side_effect=_fake_tmux([
+        "",
+        "@@ACK id=t1\n",
+        "@@ACK id=t1\n@@RUN id=t1\n@@EOT id=t1 status=OK\n",
+    ]))
+    
+    result = asyncio.run(ctl.execute_with_handshake("echo hi", "t1", 1, 1, 1))
+    
+    assert result.success
+    assert result.status == "OK"
+    assert set(result.phases) == {"send", "ack", "run", "eot"}
+
+
+def test_async_handshake_timeout_has_snapshot(mocker):
+    """ACK가 없으면 스냅샷과 함께 실패"""
+    ctl = AsyncTmuxController("%3", poll_interval=0.0)
+    mocker.patch.object(ctl, "_tmux", AsyncMock(return_value="no tokens\n"))
+    
+    result = asyncio.run(ctl.execute_with_handshake("echo hi", "t1", 0.05, 0.05, 0.05))
+    
+    assert not result.success
+    assert "NO_ACK" in result.error
+    assert "snapshot=" in result.error
+
+
+def test_many_handshakes_share_one_loop(mocker):
+    """여러 pane 핸드셰이크를 한 이벤트 루프에서 동시 실행"""
+    async def run_all():
+        controllers = []
+        for i in range(50):
+            ctl = AsyncTmuxController(f"%{i}", poll_interval=0.01)
+            mocker.patch.object(ctl, "_tmux", side_effect=_fake_tmux(
+                [""] * 3 + [f"@@ACK id=t{i}\n@@RUN id=t{i}\n@@EOT id=t{i} status=OK\n"]
+            ))
+            controllers.append(ctl)
+        return await asyncio.gather(*(
+            ctl.execute_with_handshake("echo hi", f"t{i}", 1, 1, 1)
+            for i, ctl in enumerate(controllers)
+        ))
+    
+    results = asyncio.run(run_all())
+    assert all(r.success for r in results)
+    assert [r.task_id for r in results] == [f"t{i}" for i in range(50)]
+
+
+def test_safe_send_uses_base64(mocker):
+    """특수문자는 base64 명령으로 전송"""
+    ctl = AsyncTmuxController("%3")
+    tmux = mocker.patch.object(ctl, "_tmux", AsyncMock(return_value=""))
+    
+    asyncio.run(ctl.send_keys('echo "hi"'))
+    
+    assert "base64" in tmux.call_args_list[0].args[3]
+    assert tmux.call_args_list[1].args == ("send-keys", "-t", "%3", "Enter")
+
+
+def test_async_adapter_sync_wrapper(mocker):
+    """동기 래퍼로 비동기 어댑터 호출"""
+    adapter = AsyncTmuxAdapter(AdapterConfig(name="tmux_async", timeout_ack=1), "%3")
+    assert isinstance(adapter, AsyncBaseAdapter)
+    mocker.patch.object(adapter.controller, "_tmux", side_effect=_fake_tmux([
+        "@@ACK id=t9\n@@RUN id=t9\n@@EOT id=t9 status=OK\n"
+    ]))
+    
+    result = adapter.execute_with_handshake_sync("TEST module=auth", "t9")
+    assert result.success
+
+
+def test_stale_tokens_before_send_are_ignored(mocker):
+    """전송 전 스크롤백에 남은 같은 task_id 토큰은 매칭하지 않음 (전송 직전 위치가 기준선)"""
+    lines = ["@@ACK id=t1", "@@RUN id=t1", "@@EOT id=t1 status=OK", ""]
+    
+    async def tmux(*args):
+        if args[0] == "display-message":
+            return f"0 2000 {len(lines) - 1}\n"
+        if args[0] == "capture-pane" and "-E" in args:
+            start, end = int(args[args.index("-S") + 1]), int(args[args.index("-E") + 1])
+            return "\n".join(lines[start:end + 1]) + "\n"
+        if args[0] == "capture-pane":
+            return "\n".join(lines) + "\n"
+        return ""
+    
+    ctl = AsyncTmuxController("%3", poll_interval=0.0)
+    mocker.patch.object(ctl, "_tmux", side_effect=tmux)
+    
+    result = asyncio.run(ctl.execute_with_handshake("echo hi", "t1", 0.05, 0.05, 0.05))
+    
+    assert not result.success
+    assert "NO_ACK" in result.error
+
+
+def test_pipe_attach_and_kpi_run_off_the_event_loop(mocker):
+    """pipe-pane 연결과 KPI 기록은 이벤트 루프 스레드를 막지 않음"""
+    import threading
+    threads = {}
+    
+    def attach():
+        threads["attach"] = threading.current_thread()
+        raise RuntimeError("no tmux")
+    
+    ctl = AsyncTmuxController("%3", poll_interval=0.0, use_pipe=True)
+    mocker.patch.object(ctl._stream, "attach", side_effect=attach)
+    mocker.patch.object(ctl, "_tmux", side_effect=_fake_tmux(["", "@@ACK id=t1\n@@RUN id=t1\n@@EOT id=t1 status=OK\n"]))
+    mocker.patch("controllers.async_tmux_controller.record_phase_kpi",
+                 side_effect=lambda *args: threads.setdefault("kpi", threading.current_thread()))
+    
+    async def run():
+        threads["loop"] = threading.current_thread()
+        return await ctl.execute_with_handshake("echo hi", "t1", 1, 1, 1)
+    
+    assert asyncio.run(run()).success
+    assert threads["attach"] is not threads["loop"]
+    assert threads["kpi"] is not threads["loop"]
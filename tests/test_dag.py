@@ -0,0 +1,133 @@
+"""
+DAG 파이프라인 엔진 테스트
+"""
+
+import threading
+import time
+
+import pytest
+
+from core.dag import (
+    DagExecutor, Node, Pipeline, load_pipeline,
+    JOIN_ANY, JOIN_ALL_DONE, JOIN_QUORUM, SUCCEEDED, FAILED, SKIPPED, CANCELLED
+)
+
+
+def returns(value, delay=0.0):
+    def run(ctx):
+        time.sleep(delay)
+        return value
+    return run
+
+
+def fails(ctx):
+    raise RuntimeError("boom")
+
+
+def test_fan_out_runs_concurrently_and_fan_in_gets_outputs():
+    pipeline = Pipeline([
+        Node("a", "x", returns(1, 0.2)),
+        Node("b", "y", returns(2, 0.2)),
+        Node("sum", "z", lambda ctx: ctx.inputs["a"] + ctx.inputs["b"] + ctx.inputs["base"],
+             depends_on=("a", "b")),
+    ])
+    started = time.time()
+    results = DagExecutor().run(pipeline, {"base": 10})
+    assert time.time() - started < 0.35
+    assert results["sum"].output == 13
+    assert list(results) == ["a", "b", "sum"]
+
+
+def test_agent_limit_serializes_same_agent():
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def run(ctx):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+
+    pipeline = Pipeline([Node(f"n{i}", "claude", run) for i in range(4)])
+    DagExecutor(limits={"claude": 2}).run(pipeline)
+    assert peak[0] == 2
+
+
+def test_join_policies():
+    pipeline = Pipeline([
+        Node("ok", "a", returns("ok")),
+        Node("bad", "b", fails),
+        Node("all", "c", returns("all"), depends_on=("ok", "bad")),
+        Node("any", "c", lambda ctx: ctx.inputs["ok"], depends_on=("ok", "bad"), join=JOIN_ANY),
+        Node("done", "c", lambda ctx: ctx.inputs["bad"].status, depends_on=("ok", "bad"), join=JOIN_ALL_DONE),
+        Node("after_all", "c", returns(1), depends_on=("all",)),
+    ])
+    results = DagExecutor().run(pipeline)
+    assert results["bad"].status == FAILED and results["bad"].error == "boom"
+    assert results["all"].status == SKIPPED and results["after_all"].status == SKIPPED
+    assert results["any"].output == "ok"
+    assert results["done"].output == FAILED
+
+
+def test_quorum_join_runs_before_slow_dependency():
+    pipeline = Pipeline([
+        Node("fast1", "a", returns(1)),
+        Node("fast2", "b", returns(2)),
+        Node("slow", "c", returns(3, 0.3)),
+        Node("bad", "d", fails),
+        Node("two", "e", lambda ctx: sorted(k for k in ctx.inputs if k != "slow"),
+             depends_on=("fast1", "fast2", "slow"), join=JOIN_QUORUM, quorum=2),
+        Node("three", "f", returns("x"), depends_on=("fast1", "bad", "slow"), join=JOIN_QUORUM, quorum=3),
+    ])
+    results = DagExecutor().run(pipeline)
+    assert results["two"].output == ["fast1", "fast2"]
+    assert results["two"].finished < results["slow"].finished
+    assert results["three"].status == SKIPPED
+    with pytest.raises(ValueError, match="quorum"):
+        Pipeline([Node("a", "x", returns(1)), Node("b", "y", returns(1), depends_on=("a",), join=JOIN_QUORUM, quorum=2)])
+
+
+def test_partial_output_starts_dependent_early_and_failure_cancels_it():
+    def upstream(fail):
+        def run(ctx):
+            ctx.publish("handoff", "partial")
+            time.sleep(0.2)
+            if fail:
+                raise RuntimeError("late failure")
+            return "full"
+        return run
+
+    def downstream(ctx):
+        if ctx.cancel.wait(1.0):
+            return "stopped"
+        return ctx.inputs["up"]
+
+    ok = DagExecutor().run(Pipeline([
+        Node("up", "a", upstream(False)),
+        Node("down", "b", downstream, depends_on=("up:handoff",)),
+    ]))
+    assert ok["down"].output == "partial" and ok["down"].started < ok["up"].finished
+
+    bad = DagExecutor().run(Pipeline([
+        Node("up", "a", upstream(True)),
+        Node("down", "b", downstream, depends_on=("up:handoff",)),
+    ]))
+    assert bad["down"].status == CANCELLED
+
+
+def test_validation_and_declarative_spec():
+    with pytest.raises(ValueError):
+        Pipeline([Node("a", "x", returns(1), depends_on=("b",)), Node("b", "x", returns(1), depends_on=("a",))])
+    with pytest.raises(ValueError):
+        Pipeline([Node("a", "x", returns(1), depends_on=("missing",))])
+
+    spec = {"nodes": [
+        {"name": "one", "action": "const", "params": {"value": 1}},
+        {"name": "two", "action": "const", "params": {"value": 2}, "depends_on": ["one"]},
+    ]}
+    pipeline = load_pipeline(spec, {"const": lambda value: returns(value)})
+    results = DagExecutor().run(pipeline)
+    assert [r.output for r in results.values()] == [1, 2]
+    assert all(r.status == SUCCEEDED for r in results.values())
@@ -0,0 +1,99 @@
+"""
+Gemini pane 풀 테스트 (pane 생성은 가짜 어댑터로 대체)
+"""
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from adapters.gemini_adapter import GeminiConfig
+from adapters.gemini_pool import GeminiPanePool, PaneUnavailable
+from core.types import HandshakeResult
+
+
+@pytest.fixture
+def pool(mocker):
+    counter = iter(range(100))
+
+    def spawn():
+        adapter = Mock()
+        adapter.pane_id = f"%{next(counter)}"
+        adapter.health_check.return_value = True
+        adapter.execute_with_handshake.side_effect = (
+            lambda exec_line, task_id: HandshakeResult(success=True, status="OK", task_id=task_id)
+        )
+        return adapter
+
+    mocker.patch.object(GeminiPanePool, '_spawn', side_effect=spawn)
+    mocker.patch.object(GeminiPanePool, '_tmux')
+    pool = GeminiPanePool(GeminiConfig(name="gemini"), size=2)
+    yield pool
+    pool.close()
+
+
+def test_start_warms_all_panes(pool):
+    assert pool.start() == 2
+    assert sorted(pool.panes) == ["%0", "%1"]
+
+
+def test_lease_is_exclusive_and_times_out(pool):
+    pool.start()
+    with pool.lease() as a, pool.lease() as b:
+        assert a is not b
+        with pytest.raises(PaneUnavailable):
+            with pool.lease(timeout=0.01):
+                pass
+        result = pool.execute_with_handshake("CALC expr=1", "t1", lease_timeout=0.01)
+        assert result.status == "NO_PANE"
+    assert pool.execute_with_handshake("CALC expr=1", "t2").task_id == "t2"
+
+
+def test_unhealthy_pane_is_recycled(pool):
+    pool.start()
+    replaced = threading.Event()
+    original_add = pool._add
+    pool._add = lambda: original_add() and not replaced.set()
+
+    with pool.lease() as adapter:
+        adapter.health_check.return_value = False
+        bad = adapter.pane_id
+
+    assert replaced.wait(2)
+    assert bad not in pool.panes and len(pool.panes) == 2
+    adapter.cleanup.assert_called_once()
+
+
+def test_pane_returned_after_close_is_killed(pool):
+    pool.start()
+    with pool.lease() as adapter:
+        pool.close()
+        idle = [a for a in pool.panes if a != adapter.pane_id]
+        assert idle == []
+    assert pool._idle.empty()
+    assert pool.panes == []
+    adapter.cleanup.assert_called_once()
+
+
+def test_close_joins_replacement_spawns(pool):
+    pool.start()
+    spawning, release = threading.Event(), threading.Event()
+    original_spawn = pool._spawn
+    spawned = []
+
+    def slow_spawn():
+        spawning.set()
+        release.wait(2)
+        spawned.append(original_spawn())
+        return spawned[-1]
+
+    with pool.lease() as adapter:
+        adapter.health_check.return_value = False
+        pool._spawn = slow_spawn
+    assert spawning.wait(2)
+    threading.Timer(0.05, release.set).start()
+    pool.close()
+
+    # 교체 pane은 close가 끝나기 전에 종료되고 유휴 목록에 들어가지 않음
+    assert pool.panes == [] and pool._idle.empty()
+    spawned[0].cleanup.assert_called_once()
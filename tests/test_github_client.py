@@ -0,0 +1,195 @@
+"""
+GitHub 클라이언트/쓰기 큐 테스트 (로컬 대역 서버 사용)
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from core.github_client import GitHubClient, GitHubError, GitHubWriter, progress_marker
+
+
+class FakeGitHub:
+    """GitHub REST API 일부를 흉내 내는 로컬 서버"""
+
+    def __init__(self):
+        self.requests = []
+        self.connections = set()
+        self.comments = {}
+        self.comment_issues = {}  # 코멘트 ID → 이슈 번호
+        self.labels = {}
+        self.limited = 0  # 다음 N개 요청에 secondary rate limit 응답
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status, body=None, headers=None):
+                data = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length)) if length else None
+                fake.requests.append((self.command, self.path, body))
+                fake.connections.add(self.client_address)
+                if fake.limited:
+                    fake.limited -= 1
+                    return self._reply(403, {"message": "secondary rate limit"}, {"Retry-After": "0.1"})
+                if self.command == "GET" and (m := re.fullmatch(r"/repos/o/r/issues/(\d+)", self.path)):
+                    if m.group(1) == "404":
+                        return self._reply(404, {"message": "Not Found"})
+                    return self._reply(200, {"number": int(m.group(1)), "title": "T", "body": 'say "hi"'},
+                                       {"X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": "0"})
+                if self.command == "GET" and (m := re.fullmatch(r"/repos/o/r/issues/(\d+)/comments\?per_page=(\d+)(?:&page=(\d+))?", self.path)):
+                    number, per_page, page = int(m.group(1)), int(m.group(2)), int(m.group(3) or 1)
+                    ids = [i for i in sorted(fake.comments) if fake.comment_issues[i] == number]
+                    chunk = ids[(page - 1) * per_page:page * per_page]
+                    headers = {}
+                    if page * per_page < len(ids):
+                        headers["Link"] = (f'<{fake.url}/repos/o/r/issues/{number}/comments?per_page={per_page}'
+                                           f'&page={page + 1}>; rel="next"')
+                    return self._reply(200, [{"id": i, "body": fake.comments[i]} for i in chunk], headers)
+                if self.command == "POST" and (m := re.fullmatch(r"/repos/o/r/issues/(\d+)/comments", self.path)):
+                    comment_id = len(fake.comments) + 1
+                    fake.comments[comment_id] = body["body"]
+                    fake.comment_issues[comment_id] = int(m.group(1))
+                    return self._reply(201, {"id": comment_id})
+                if self.command == "PATCH" and (m := re.fullmatch(r"/repos/o/r/issues/comments/(\d+)", self.path)):
+                    fake.comments[int(m.group(1))] = body["body"]
+                    return self._reply(200, {"id": int(m.group(1))})
+                if self.command == "POST" and (m := re.fullmatch(r"/repos/o/r/issues/(\d+)/labels", self.path)):
+                    fake.labels.setdefault(int(m.group(1)), []).extend(body["labels"])
+                    return self._reply(200, [])
+                return self._reply(404, {"message": "Not Found"})
+
+            do_GET = do_POST = do_PATCH = _handle
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def fake():
+    server = FakeGitHub()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def client(fake):
+    client = GitHubClient(fake.url, token="t")
+    yield client
+    client.close()
+
+
+def test_client_reuses_one_connection_and_sends_json(fake, client):
+    assert client.get_issue("o/r", 1)["body"] == 'say "hi"'
+    comment_id = client.create_comment("o/r", 1, 'AI said "quote" and `code`\n$(rm -rf /)')
+    client.update_comment("o/r", comment_id, "edited")
+    assert fake.comments[comment_id] == "edited"
+    assert len(fake.connections) == 1
+    assert client.rate_remaining == 4999
+    with pytest.raises(GitHubError) as e:
+        client.get_issue("o/r", 404)
+    assert e.value.status == 404
+
+
+def test_client_retries_after_secondary_rate_limit(fake, client):
+    fake.limited = 2
+    started = time.time()
+    assert client.get_issue("o/r", 1)["number"] == 1
+    assert len(fake.requests) == 3
+    assert time.time() - started >= 0.2
+
+
+def test_writer_coalesces_progress_and_labels(fake, client, mocker):
+    writer = GitHubWriter(client, min_interval=0)
+    gate = threading.Event()
+    apply = writer._apply
+    mocker.patch.object(writer, "_apply", side_effect=lambda op: gate.wait(5) and apply(op))
+
+    writer.comment("o/r", 1, "first")
+    # 첫 쓰기가 막혀 있는 동안 쌓인 작업은 합쳐짐
+    for stage in range(3):
+        writer.progress("o/r", 1, "progress", f"stage {stage}")
+    writer.add_labels("o/r", 1, ["a"])
+    writer.add_labels("o/r", 1, ["b", "a"])
+    gate.set()
+    assert writer.flush(timeout=5)
+
+    writer.progress("o/r", 1, "progress", "done")
+    assert writer.flush(timeout=5)
+    methods = [(method, path.rsplit("/", 1)[-1]) for method, path, _ in fake.requests]
+    assert methods == [("POST", "comments"), ("GET", "comments?per_page=100"), ("POST", "comments"),
+                       ("POST", "labels"), ("PATCH", "2")]
+    assert fake.comments == {1: "first", 2: f"done\n\n{progress_marker('progress')}"}
+    assert fake.labels == {1: ["a", "b"]}
+    assert writer.errors == 0
+
+
+def test_relay_progress_is_one_edited_comment(fake, client, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    from relay_pipeline_system import RelayPipeline
+    from core.issue_cache import IssueCache
+    writer = GitHubWriter(client, min_interval=0)
+    pipeline = RelayPipeline(github=writer, issues=IssueCache(str(tmp_path / "cache.sqlite"), client=client))
+    for stage in pipeline.stages:
+        pipeline._update_issue_progress(1, "o/r", {
+            "stage": stage["stage"].value, "role": stage["role"], "ai": stage["ai"], "success": True,
+            "duration_seconds": 1.0, "output": 'print("ok")', "completed_at": "now",
+        })
+    assert pipeline._get_issue_content(1, "o/r") == '제목: T\n\nsay "hi"'
+    assert writer.flush(timeout=5)
+    assert len(fake.comments) == 1
+    body = fake.comments[1]
+    assert all(stage["role"] in body for stage in pipeline.stages)
+    assert 'print("ok")' in body
+
+
+def test_progress_comment_is_found_after_restart(fake, client):
+    """새 프로세스의 쓰기 큐도 marker로 기존 진행 코멘트를 찾아 수정"""
+    for i in range(1, 121):
+        fake.comments[i], fake.comment_issues[i] = f"other {i}", 1
+    writer = GitHubWriter(client, min_interval=0)
+    writer.progress("o/r", 1, "relay-progress", "stage 1")
+    assert writer.flush(timeout=5)
+
+    restarted = GitHubWriter(client, min_interval=0)
+    restarted.progress("o/r", 1, "relay-progress", "stage 2")
+    restarted.progress("o/r", 2, "relay-progress", "other issue")
+    assert restarted.flush(timeout=5)
+    assert len(fake.comments) == 122
+    # 두 번째 페이지에 있던 코멘트를 찾아 수정
+    assert fake.comments[121] == f"stage 2\n\n{progress_marker('relay-progress')}"
+    assert fake.comment_issues[122] == 2
+    assert restarted.errors == 0
+
+
+def test_exit_flush_does_not_wait_long(client, mocker):
+    mocker.patch("core.github_client.EXIT_FLUSH_TIMEOUT", 0.1)
+    writer = GitHubWriter(client, min_interval=0)
+    gate = threading.Event()
+    mocker.patch.object(writer, "_apply", side_effect=lambda op: gate.wait(5))
+    writer.comment("o/r", 1, "slow")
+    started = time.time()
+    writer._flush_at_exit()
+    assert time.time() - started < 1
+    gate.set()
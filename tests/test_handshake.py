@@ -0,0 +1,83 @@
+"""
+단일 패스 핸드셰이크 상태 머신 테스트
+"""
+
+from core.handshake import HandshakeTracker
+from controllers.tmux_controller import TmuxController
+
+
+def test_burst_completes_in_one_feed():
+    """한 버스트에 세 토큰이 모두 있으면 한 번에 완료"""
+    tracker = HandshakeTracker("t1")
+    tracker.start(now=100.0)
+    
+    reached = tracker.feed_lines(
+        ["noise", "@@ACK id=t1", "@@RUN id=t1 ts=1", "@@EOT id=t1 status=OK"],
+        now=100.5
+    )
+    
+    assert reached == ["ACK", "RUN", "EOT"]
+    assert tracker.done
+    assert tracker.status == "OK"
+    assert set(tracker.timestamps) == {"send", "ack", "run", "eot"}
+
+
+def test_out_of_order_tokens_are_ignored():
+    """현재 단계가 아닌 토큰은 무시"""
+    tracker = HandshakeTracker("t1")
+    tracker.start(now=0.0)
+    
+    assert tracker.feed_lines(["@@RUN id=t1", "@@EOT id=t1 status=OK"], now=1.0) == []
+    assert tracker.phase == "ACK"
+
+
+def test_other_task_ids_are_ignored():
+    """다른 작업 ID 토큰 무시"""
+    tracker = HandshakeTracker("t1")
+    tracker.start(now=0.0)
+    
+    assert tracker.feed("@@ACK id=t2", now=1.0) is None
+    assert tracker.feed("@@ACK id=t1", now=1.0) == "ACK"
+
+
+def test_deadline_is_relative_to_previous_phase():
+    """단계별 마감은 직전 단계 도달 시점 기준"""
+    tracker = HandshakeTracker("t1", timeout_ack=1, timeout_run=2, timeout_eot=3)
+    tracker.start(now=0.0)
+    assert tracker.remaining(now=0.5) == 0.5
+    assert tracker.expired(now=1.0)
+    
+    tracker.feed("@@ACK id=t1", now=0.9)
+    assert tracker.phase == "RUN"
+    assert not tracker.expired(now=2.5)
+    assert tracker.expired(now=2.9)
+
+
+def test_phase_durations():
+    """send→ACK, ACK→RUN, RUN→EOT 소요 시간"""
+    tracker = HandshakeTracker("t1")
+    tracker.start(now=10.0)
+    tracker.feed("@@ACK id=t1", now=10.5)
+    tracker.feed("@@RUN id=t1", now=11.0)
+    tracker.feed("@@EOT id=t1 status=FAIL", now=13.0)
+    
+    assert tracker.phase_durations() == {"ack": 0.5, "run": 0.5, "eot": 2.0}
+    assert tracker.status == "FAIL"
+
+
+def test_controller_single_capture_for_burst(mocker):
+    """세 토큰이 한 번에 출력되면 캡처 한 번으로 완료"""
+    mocker.patch("subprocess.run")
+    capture = mocker.patch.object(
+        TmuxController,
+        'capture_tail',
+        return_value="@@ACK id=t1\n@@RUN id=t1\n@@EOT id=t1 status=OK\n"
+    )
+    
+    ctl = TmuxController("%3", poll_interval=0.0)
+    result = ctl.execute_with_handshake("echo hi", task_id="t1",
+                                        timeout_ack=1, timeout_run=1, timeout_eot=1)
+    
+    assert result.success
+    assert capture.call_count == 1
+    assert set(result.phases) == {"send", "ack", "run", "eot"}
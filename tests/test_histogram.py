@@ -0,0 +1,40 @@
+"""
+로그 버킷 히스토그램 테스트
+"""
+
+import pytest
+from core.histogram import LogHistogram, bin_of, bin_value
+
+
+def test_bin_relative_error():
+    """버킷 대표값은 원래 값과 5% 이내"""
+    for value in (1, 7, 42, 999, 12345, 3_600_000):
+        assert bin_value(bin_of(value)) == pytest.approx(value, rel=0.05)
+    assert bin_of(0) == 0
+    assert bin_of(0.5) == 0
+
+
+def test_percentiles():
+    """백분위 추정"""
+    hist = LogHistogram()
+    for ms in range(1, 1001):
+        hist.add(ms)
+    assert hist.total == 1000
+    assert hist.percentile(50) == pytest.approx(500, rel=0.05)
+    assert hist.percentiles((95, 99)) == {
+        "p95": pytest.approx(950, rel=0.05),
+        "p99": pytest.approx(990, rel=0.05),
+    }
+    assert LogHistogram().percentile(50) is None
+
+
+def test_merge_equals_combined():
+    """병합 결과는 한 히스토그램에 모두 넣은 것과 같음"""
+    a, b, combined = LogHistogram(), LogHistogram(), LogHistogram()
+    for ms in (3, 30, 300):
+        a.add(ms)
+        combined.add(ms)
+    for ms in (5, 50, 5000):
+        b.add(ms)
+        combined.add(ms)
+    assert a.merge(b).counts == combined.counts
@@ -1,9 +1,18 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
+from core.types import HandshakeResult
 from core.idempotency import (
     IdempotencyManager,
     check_duplicate,
     save_result,
-    get_cached_result
+    get_cached_result,
+    SQLiteIdempotencyStore,
+    CLAIMED,
+    DONE,
+    FAILED,
+    PENDING
 )
 
 
@@ -46,4 +55,157 @@ def test_global_helpers():
     
     # 캐시된 결과 가져오기
     cached = get_cached_result(task_id)
-    assert cached == {"status": "OK", "data": "test"}
\ No newline at end of file
+    assert cached == {"status": "OK", "data": "test"}
+
+def test_sqlite_store_persists_across_instances(tmp_path):
+    """다른 인스턴스(=다른 CLI 실행)에서도 결과 조회"""
+    path = str(tmp_path / "idem.sqlite")
+    store = SQLiteIdempotencyStore(path)
+    store.save("T1", {"status": "OK"})
+    store.close()
+    
+    manager = IdempotencyManager(SQLiteIdempotencyStore(path))
+    assert manager.exists("T1")
+    assert manager.get("T1") == {"status": "OK"}
+
+
+def test_sqlite_store_ttl_and_lru(tmp_path, mocker):
+    """TTL 만료 및 최대 크기 초과 시 LRU 삭제"""
+    now = mocker.patch("core.idempotency.time.time", return_value=1000.0)
+    store = SQLiteIdempotencyStore(str(tmp_path / "idem.sqlite"), ttl=60, max_entries=2)
+    store.save("a", 1)
+    now.return_value = 1001.0
+    store.save("b", 2)
+    now.return_value = 1002.0
+    assert store.get("a") == 1  # a가 최근 조회됨
+    store.save("c", 3)
+    assert not store.exists("b")
+    assert store.exists("a") and store.exists("c")
+    
+    now.return_value = 1100.0
+    assert store.get("a") is None
+
+
+def test_claim_is_exclusive(tmp_path):
+    """두 작업자 중 하나만 선점, 완료 후에는 결과 반환"""
+    path = str(tmp_path / "idem.sqlite")
+    first = IdempotencyManager(SQLiteIdempotencyStore(path))
+    second = IdempotencyManager(SQLiteIdempotencyStore(path))
+    
+    assert first.claim("T1") == (CLAIMED, None)
+    assert second.claim("T1") == (PENDING, None)
+    
+    first.release("T1")
+    assert second.claim("T1") == (CLAIMED, None)
+    second.save("T1", "OK")
+    assert first.claim("T1") == (DONE, "OK")
+
+
+def test_claim_lease_expires(tmp_path, mocker):
+    """작업자가 죽어도 선점은 lease 후 만료"""
+    now = mocker.patch("core.idempotency.time.time", return_value=1000.0)
+    store = SQLiteIdempotencyStore(str(tmp_path / "idem.sqlite"))
+    assert store.claim("T1", lease=10) == (CLAIMED, None)
+    now.return_value = 1011.0
+    assert store.claim("T1") == (CLAIMED, None)
+
+
+def test_memory_claim():
+    """backend 없이도 프로세스 내 선점 동작"""
+    manager = IdempotencyManager()
+    assert manager.claim("T1") == (CLAIMED, None)
+    assert manager.claim("T1") == (PENDING, None)
+    manager.save("T1", "OK")
+    assert manager.claim("T1") == (DONE, "OK")
+
+
+def test_execute_once_coalesces_concurrent_callers():
+    """실행 중인 같은 키의 호출은 첫 실행 결과를 공유"""
+    manager = IdempotencyManager()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    
+    def run():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return HandshakeResult(success=True, status="OK", task_id="T1")
+    
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        first = pool.submit(manager.execute_once, "T1", run)
+        started.wait(5)
+        others = [pool.submit(manager.execute_once, "T1", run) for _ in range(3)]
+        release.set()
+        results = [f.result(timeout=5) for f in [first, *others]]
+    
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert manager.execute_once("T1", run) is results[0]  # 완료 후에는 캐시
+
+
+def test_execute_once_negative_cache(mocker):
+    """실패는 negative_ttl 동안만 재사용"""
+    now = mocker.patch("core.idempotency.time.time", return_value=1000.0)
+    manager = IdempotencyManager(negative_ttl=5)
+    failure = HandshakeResult(success=False, status="FAILED", task_id="T1")
+    run = mocker.Mock(return_value=failure)
+    
+    assert manager.execute_once("T1", run) is failure
+    assert manager.execute_once("T1", run) is failure
+    assert run.call_count == 1
+    assert manager.claim("T1") == (FAILED, failure)
+    
+    now.return_value = 1006.0
+    manager.execute_once("T1", run)
+    assert run.call_count == 2
+
+
+def test_execute_once_exception_releases_claim():
+    """예외 시 선점 해제 후 재실행 가능"""
+    manager = IdempotencyManager()
+    
+    def boom():
+        raise RuntimeError("boom")
+    
+    with pytest.raises(RuntimeError):
+        manager.execute_once("T1", boom)
+    assert manager.execute_once("T1", lambda: "OK") == "OK"
+
+
+def test_backend_round_trips_handshake_result(tmp_path):
+    """HandshakeResult는 backend를 거쳐도 그대로 복원"""
+    path = str(tmp_path / "idem.sqlite")
+    result = HandshakeResult(success=True, status="OK", task_id="T1", phases={"send": 1.0})
+    IdempotencyManager(SQLiteIdempotencyStore(path)).execute_once("T1", lambda: result)
+    
+    other = IdempotencyManager(SQLiteIdempotencyStore(path))
+    assert other.execute_once("T1", lambda: pytest.fail("re-executed")) == result
+
+
+def test_single_task_result_is_reused_by_batch_mode(tmp_path, monkeypatch, mocker, capsys):
+    """단일 작업 모드가 저장한 결과를 배치 모드가 같은 저장소에서 그대로 재사용"""
+    import core.idempotency
+    import main
+    monkeypatch.setenv("IDEMPOTENCY_DB", str(tmp_path / "idem.sqlite"))
+    monkeypatch.setattr(core.idempotency, "_default_manager", core.idempotency._default_manager)
+    controller = mocker.patch("main.TmuxController").return_value
+    controller.execute_with_handshake.return_value = HandshakeResult(success=True, status="OK", task_id="t1")
+    
+    monkeypatch.setattr("sys.argv", ["main.py", "--pane", "%3", "--task", "t1", "--cmd", "echo hi"])
+    with pytest.raises(SystemExit) as e:
+        main.main()
+    assert e.value.code == 0
+    stored = SQLiteIdempotencyStore(str(tmp_path / "idem.sqlite")).get("t1")
+    assert stored == HandshakeResult(success=True, status="OK", task_id="t1")
+    
+    factory = mocker.patch("controllers.scheduler.registry_adapter_factory")
+    batch = tmp_path / "batch.txt"
+    batch.write_text("TEST task_id=t1 target=gemini\n")
+    monkeypatch.setattr("sys.argv", ["main.py", "--batch", str(batch)])
+    with pytest.raises(SystemExit) as e:
+        main.main()
+    assert e.value.code == 0
+    # 캐시된 결과를 쓰므로 어댑터를 만들지 않음
+    factory.return_value.assert_not_called()
+    assert "✅ t1: EOT OK (OK)" in capsys.readouterr().out
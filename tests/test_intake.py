@@ -0,0 +1,224 @@
+"""
+이슈 접수 (영속 큐, 웹훅 수신, 조건부 폴링) 테스트
+"""
+
+import hashlib
+import hmac
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from core.github_client import GitHubClient
+from core.intake import IssueIntake, IssueQueue, DONE, FAILED, QUEUED
+
+
+def labeled(number, label="relay-pipeline", repo="o/r"):
+    return {
+        "action": "labeled",
+        "label": {"name": label},
+        "issue": {"number": number, "state": "open", "labels": [{"name": label}]},
+        "repository": {"full_name": repo},
+    }
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "intake.sqlite")
+
+
+def test_processed_state_survives_restart(queue_path):
+    queue = IssueQueue(queue_path, lease=0.05)
+    assert queue.enqueue("relay", "o/r", 1)
+    assert queue.enqueue("relay", "o/r", 2)
+    assert not queue.enqueue("relay", "o/r", 1)
+    # 소비자마다 처리 상태가 따로
+    assert queue.enqueue("multi-ai", "o/r", 1)
+
+    item = queue.claim("relay")
+    assert (item.number, item.attempts) == (1, 1)
+    queue.complete(item)
+    queue.claim("relay")  # 2번은 처리 중에 종료
+    queue.close()
+    time.sleep(0.1)
+
+    queue = IssueQueue(queue_path)
+    assert not queue.enqueue("relay", "o/r", 1)
+    assert queue.state("relay", "o/r", 1) == DONE
+    # lease가 지난 처리 중 항목은 다시 꺼냄
+    item = queue.claim("relay")
+    assert (item.number, item.attempts) == (2, 2)
+    assert queue.claim("relay") is None
+
+
+def test_claim_waits_for_enqueue(queue_path):
+    queue = IssueQueue(queue_path)
+    threading.Timer(0.1, queue.enqueue, ("relay", "o/r", 5)).start()
+    item = queue.claim("relay", timeout=2)
+    assert item.number == 5
+
+
+def test_webhook_server_queues_labeled_issues(queue_path):
+    source = IssueIntake("relay", ["relay-pipeline"], IssueQueue(queue_path))
+    server = source.serve(port=0, secret="s3cret")
+    try:
+        def post(payload, secret="s3cret"):
+            body = json.dumps(payload).encode()
+            signature = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+            request = urllib.request.Request(
+                f"http://127.0.0.1:{server.port}/", data=body,
+                headers={"X-GitHub-Event": "issues", "X-Hub-Signature-256": signature}
+            )
+            try:
+                return urllib.request.urlopen(request, timeout=5).status
+            except urllib.error.HTTPError as e:
+                return e.code
+
+        assert post(labeled(7)) == 202
+        assert post(labeled(8, label="other")) == 202
+        assert post(labeled(9), secret="wrong") == 401
+    finally:
+        server.stop()
+    assert source.queue.state("relay", "o/r", 7) == QUEUED
+    assert source.queue.state("relay", "o/r", 8) is None
+    assert source.queue.state("relay", "o/r", 9) is None
+
+
+def test_poll_is_conditional_on_etag_and_since(queue_path, mocker):
+    issues = [
+        {"number": 3, "updated_at": "2025-08-20T00:00:00Z"},
+        {"number": 4, "updated_at": "2025-08-21T00:00:00Z"},
+        {"number": 5, "updated_at": "2025-08-22T00:00:00Z", "pull_request": {}},
+    ]
+    github = mocker.Mock()
+    github.request.side_effect = [
+        (200, {"etag": 'W/"abc"'}, issues),
+        (304, {}, None),
+    ]
+    github.next_page.side_effect = GitHubClient("https://api.github.com").next_page
+    source = IssueIntake("relay", ["relay-pipeline"], IssueQueue(queue_path), github=github)
+    assert source.poll("o/r") == 2
+    # 재시작 후에도 ETag/since 유지
+    source = IssueIntake("relay", ["relay-pipeline"], IssueQueue(queue_path), github=github)
+    assert source.poll("o/r") == 0
+
+    first, second = github.request.call_args_list
+    assert first.kwargs["headers"] is None and "since" not in first.args[1]
+    assert "since=2025-08-21T00%3A00%3A00Z" in second.args[1]
+    assert second.kwargs["headers"] == {"If-None-Match": 'W/"abc"'}
+    assert source.queue.state("relay", "o/r", 5) is None
+
+
+def test_poll_follows_link_pagination(queue_path, mocker):
+    """첫 페이지 이후 이슈도 큐에 넣고, 중간 페이지가 실패하면 since를 저장하지 않음"""
+    def page(numbers, next_page=None):
+        link = {"link": f'<https://api.github.com/repositories/1/issues?page={next_page}>; rel="next", '
+                        f'<https://api.github.com/repositories/1/issues?page=9>; rel="last"'} if next_page else {}
+        return [{"number": n, "updated_at": f"2025-08-{n:02d}T00:00:00Z"} for n in numbers], link
+
+    first, first_link = page(range(1, 4), 2)
+    second, second_link = page(range(4, 7), 3)
+    third, _ = page([7])
+    github = mocker.Mock()
+    github.request.side_effect = [
+        (200, {"etag": 'W/"p1"', **first_link}, first),
+        (500, {}, {"message": "boom"}),
+        (200, {"etag": 'W/"p1"', **first_link}, first),
+        (200, second_link, second),
+        (200, {}, third),
+    ]
+    github.next_page.side_effect = GitHubClient("https://api.github.com").next_page
+    source = IssueIntake("relay", ["relay-pipeline"], IssueQueue(queue_path), github=github)
+
+    assert source.poll("o/r") == 3
+    assert source.queue.poll_state("o/r:relay-pipeline") == (None, None)
+    assert source.poll("o/r") == 4
+    assert source.queue.poll_state("o/r:relay-pipeline") == ('W/"p1"', "2025-08-07T00:00:00Z")
+    assert [call.args[1] for call in github.request.call_args_list[3:]] == [
+        "repositories/1/issues?page=2", "repositories/1/issues?page=3"
+    ]
+
+
+def test_run_records_failures_and_stops(queue_path, mocker):
+    github = mocker.Mock(**{"request.return_value": (304, {}, None)})
+    source = IssueIntake("relay", ["relay-pipeline"], IssueQueue(queue_path), workers=1, github=github)
+    source.handle_webhook(labeled(1))
+    source.handle_webhook(labeled(2))
+    stop = threading.Event()
+    seen = []
+
+    def process(item):
+        seen.append(item.number)
+        if item.number == 1:
+            raise RuntimeError("boom")
+        stop.set()
+
+    source.run("o/r", process, stop)
+    assert seen == [1, 2]
+    assert source.queue.state("relay", "o/r", 1) == FAILED
+    assert source.queue.state("relay", "o/r", 2) == DONE
+
+
+def test_claim_rotates_fairly_across_labels_and_repos(queue_path):
+    queue = IssueQueue(queue_path)
+    for number in (1, 2, 3):
+        queue.enqueue("relay", "o/r", number, "busy")
+    queue.enqueue("relay", "o/r", 4, "quiet")
+    queue.enqueue("relay", "o/other", 5, "busy")
+    claimed = [queue.claim("relay") for _ in range(3)]
+    assert [item.number for item in claimed] == [1, 4, 5]
+    queue.complete(claimed[1])
+    queue.complete(claimed[2])
+    # 처리 중 항목이 있는 그룹은 다른 그룹이 비었을 때만
+    assert queue.claim("relay").number == 2
+
+
+def test_worker_pool_processes_issues_concurrently(queue_path, mocker):
+    github = mocker.Mock(**{"request.return_value": (304, {}, None)})
+    source = IssueIntake("relay", ["relay-pipeline"], IssueQueue(queue_path), workers=3, github=github)
+    for number in range(6):
+        source.handle_webhook(labeled(number))
+    stop = threading.Event()
+    done = []
+    lock = threading.Lock()
+
+    def process(item):
+        time.sleep(0.2)
+        with lock:
+            done.append(item.number)
+            if len(done) == 6:
+                stop.set()
+
+    started = time.time()
+    source.run("o/r", process, stop)
+    assert sorted(done) == list(range(6))
+    assert time.time() - started < 0.8
+    stats = source.report()
+    assert stats["backlog"] == 0 and stats["finished"] == 6 and stats["drain_per_min"] > 0
+
+
+def test_workflow_webhook_enqueues_instead_of_processing(queue_path, tmp_path, monkeypatch, mocker):
+    from core import issue_cache
+    from multi_ai_orchestrator import AutomatedWorkflow
+    monkeypatch.setenv("ISSUE_CACHE_DB", str(tmp_path / "issue_cache.sqlite"))
+    monkeypatch.setattr(issue_cache, "_default_cache", None)
+    workflow = AutomatedWorkflow(IssueQueue(queue_path))
+    process = mocker.patch.object(workflow.orchestrator, "process_github_issue")
+    assert workflow.handle_webhook(labeled(11, label="multi-ai"))
+    assert not workflow.handle_webhook(labeled(11, label="multi-ai"))
+    process.assert_not_called()
+    assert workflow.intake.queue.pending("multi-ai") == 1
+
+
+def test_webhook_invalidates_issue_cache(queue_path, tmp_path, mocker):
+    from core.issue_cache import IssueCache
+    client = mocker.Mock(**{"request.return_value": (200, {}, {"number": 1, "title": "T", "body": "b"})})
+    cache = IssueCache(str(tmp_path / "cache.sqlite"), client=client)
+    source = IssueIntake("relay", ["relay-pipeline"], IssueQueue(queue_path), github=client, issues=cache)
+    cache.get("o/r", 1)
+    source.handle_webhook(labeled(1, label="unrelated"), "issues")
+    cache.get("o/r", 1)
+    assert client.request.call_count == 2
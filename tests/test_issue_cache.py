@@ -0,0 +1,145 @@
+"""
+이슈 캐시 (TTL, ETag 재검증, 웹훅 무효화) 테스트
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from core.github_client import GitHubError
+from core.issue_cache import IssueCache, load_cache_policy, parse_duration
+
+ISSUE = {"number": 7, "title": "T", "body": "본문", "state": "open", "labels": [], "updated_at": "x",
+         "user": {"login": "someone"}}
+
+
+@pytest.fixture
+def client(mocker):
+    return mocker.Mock()
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "issue_cache.sqlite")
+
+
+def test_policy_is_read_from_memory_policy_file(tmp_path):
+    ttl, events = load_cache_policy()
+    assert ttl == 3600 and events == {"pull_request", "issues"}
+    assert load_cache_policy(str(tmp_path / "missing.yml")) == (3600, {"pull_request", "issues"})
+    assert parse_duration("30m") == 1800 and parse_duration("24h") == 86400
+    with pytest.raises(ValueError):
+        parse_duration("soon")
+
+
+def test_core_package_imports_without_pyyaml():
+    """PyYAML과 I/O 모듈은 정책/캐시를 실제로 쓸 때만 필요"""
+    code = (
+        "import sys; sys.modules['yaml'] = None\n"
+        "import core, core.protocol, core.types, core.issue_cache\n"
+        "assert 'http.server' not in sys.modules and 'core.intake' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, cwd=str(Path(__file__).parent.parent))
+
+
+def test_cache_uses_policy_file_values(tmp_path, client, cache_path):
+    policy = tmp_path / "memory_policy.yml"
+    policy.write_text(
+        "memory_categories:\n"
+        "  cache_only:\n"
+        "    github_state:\n"
+        "      retention: \"15m\"\n"
+        "      invalidation: \"webhook:issue_comment\"\n",
+        encoding="utf-8"
+    )
+    cache = IssueCache(cache_path, client=client, policy_path=str(policy))
+    assert cache.ttl == 900 and cache.invalidate_on == {"issue_comment"}
+    payload = {"issue": {"number": 7}, "repository": {"full_name": "o/r"}}
+    assert not cache.handle_webhook("issues", payload)
+    assert cache.handle_webhook("issue_comment", payload)
+
+
+def test_ttl_hit_then_conditional_revalidation(client, cache_path):
+    client.request.side_effect = [(200, {"etag": '"v1"'}, ISSUE), (304, {}, None)]
+    cache = IssueCache(cache_path, client=client)
+    assert cache.get("o/r", 7)["body"] == "본문"
+    assert "user" not in cache.get("o/r", 7)
+    assert client.request.call_count == 1 and cache.hits == 1
+
+    # 디스크에 남아 있으므로 새 인스턴스에서도 사용, TTL이 지나면 ETag로 재검증
+    cache = IssueCache(cache_path, client=client, ttl=0)
+    assert cache.get("o/r", 7)["title"] == "T"
+    assert client.request.call_args.kwargs["headers"] == {"If-None-Match": '"v1"'}
+    assert cache.revalidated == 1
+
+
+def test_webhook_invalidates_per_policy(client, cache_path):
+    client.request.return_value = (200, {"etag": '"v1"'}, ISSUE)
+    cache = IssueCache(cache_path, client=client)
+    cache.get("o/r", 7)
+    payload = {"issue": {"number": 7}, "repository": {"full_name": "o/r"}}
+    assert not cache.handle_webhook("push", payload)
+    cache.get("o/r", 7)
+    assert client.request.call_count == 1
+
+    assert cache.handle_webhook("issues", payload)
+    cache.get("o/r", 7)
+    assert client.request.call_count == 2
+    # 무효화 후에는 조건 없이 전체 조회
+    assert client.request.call_args.kwargs["headers"] is None
+
+
+def test_stale_copy_is_used_when_github_fails(client, cache_path):
+    client.request.side_effect = [(200, {}, ISSUE), (502, {}, {"message": "bad gateway"}),
+                                  (404, {}, {"message": "Not Found"})]
+    cache = IssueCache(cache_path, client=client, ttl=0)
+    cache.get("o/r", 7)
+    assert cache.get("o/r", 7)["body"] == "본문"
+    with pytest.raises(GitHubError):
+        cache.get("o/r", 8)
+
+
+def test_stale_copy_is_used_when_connection_keeps_failing(client, cache_path):
+    import http.client
+    client.request.side_effect = [(200, {}, ISSUE), http.client.RemoteDisconnected("closed")]
+    cache = IssueCache(cache_path, client=client, ttl=0)
+    cache.get("o/r", 7)
+    assert cache.get("o/r", 7)["body"] == "본문"
+
+
+def test_learning_pipeline_treats_fetch_failure_as_no_issues(client, cache_path):
+    from persona_training_system import AutomatedLearningPipeline
+    client.request.return_value = (401, {}, {"message": "Bad credentials"})
+    pipeline = AutomatedLearningPipeline(IssueCache(cache_path, client=client))
+    assert pipeline.process_from_github("o/r") is None
+
+
+def test_learning_pipeline_reads_issues_through_conditional_list(client, cache_path, mocker):
+    from persona_training_system import AutomatedLearningPipeline
+    client.request.side_effect = [(200, {"etag": 'W/"l1"'}, [ISSUE]), (304, {}, None)]
+    pipeline = AutomatedLearningPipeline(IssueCache(cache_path, client=client))
+    dataset = mocker.patch.object(pipeline.training_system, "create_fine_tuning_dataset", return_value="ds")
+    assert pipeline.process_from_github("o/r") == "ds"
+    assert pipeline.process_from_github("o/r") == "ds"
+    assert dataset.call_args.args[0] == ["Issue #7: T\n\n본문"]
+    assert client.request.call_args.kwargs["headers"] == {"If-None-Match": 'W/"l1"'}
+
+
+def test_open_issue_list_is_revalidated_with_etag(client, cache_path):
+    listed = [ISSUE, {**ISSUE, "number": 8, "pull_request": {}}]
+    client.request.side_effect = [(200, {"etag": 'W/"l1"'}, listed), (304, {}, None), (304, {}, None),
+                                  (200, {}, ISSUE)]
+    cache = IssueCache(cache_path, client=client, ttl=0)
+    assert [issue["number"] for issue in cache.list_open("o/r")] == [7]
+
+    # 재시작 후에도 저장된 ETag로 조건부 요청, 304면 저장된 이슈 사용
+    cache = IssueCache(cache_path, client=client, ttl=0)
+    assert cache.list_open("o/r")[0]["body"] == "본문"
+    assert client.request.call_args.kwargs["headers"] == {"If-None-Match": 'W/"l1"'}
+    # 웹훅으로 무효화된 이슈만 다시 조회
+    cache.handle_webhook("issues", {"issue": {"number": 7}, "repository": {"full_name": "o/r"}})
+    assert cache.list_open("o/r")[0]["body"] == "본문"
+    assert client.request.call_args.args[1] == "repos/o/r/issues/7"
+    assert client.request.call_count == 4
@@ -0,0 +1,329 @@
+"""
+KPI 추적기 테스트
+"""
+
+import time
+import pytest
+from core.kpi import KPITracker
+
+
+@pytest.fixture
+def make_tracker(tmp_path, monkeypatch):
+    """싱글톤을 우회해 임시 DB로 새 추적기 생성"""
+    trackers = []
+    
+    def make(**kwargs):
+        monkeypatch.setattr(KPITracker, "_instance", None)
+        tracker = KPITracker(str(tmp_path / f"kpi{len(trackers)}.sqlite"), **kwargs)
+        trackers.append(tracker)
+        return tracker
+    
+    yield make
+    for tracker in trackers:
+        tracker.close()
+
+
+def _count(tracker):
+    with tracker._lock:
+        return tracker.db.execute("SELECT COUNT(*) FROM kpi_events").fetchone()[0]
+
+
+def test_direct_mode_writes_immediately(make_tracker):
+    """write-behind 비활성 시 즉시 기록"""
+    tracker = make_tracker(write_behind=False)
+    tracker.record(kind='handshake', phase='ack', success=True, task_id='T1')
+    assert _count(tracker) == 1
+
+
+def test_write_behind_buffers_until_flush(make_tracker):
+    """write-behind 모드는 flush 전까지 버퍼에 보관"""
+    tracker = make_tracker(write_behind=True, flush_interval_ms=60000, flush_batch=1000)
+    for i in range(5):
+        tracker.record(kind='handshake', phase='ack', success=True, task_id=f'T{i}')
+    
+    assert _count(tracker) == 0
+    assert tracker.flush() == 5
+    assert _count(tracker) == 5
+
+
+def test_flusher_writes_when_batch_full(make_tracker):
+    """flush_batch개가 모이면 백그라운드에서 기록"""
+    tracker = make_tracker(write_behind=True, flush_interval_ms=60000, flush_batch=3)
+    for i in range(3):
+        tracker.record(kind='exec', verb='TEST', success=True)
+    
+    deadline = time.time() + 2
+    while _count(tracker) < 3 and time.time() < deadline:
+        time.sleep(0.01)
+    assert _count(tracker) == 3
+
+
+def test_flusher_writes_on_interval(make_tracker):
+    """배치가 차지 않아도 주기마다 기록"""
+    tracker = make_tracker(write_behind=True, flush_interval_ms=20, flush_batch=1000)
+    tracker.record(kind='exec', verb='TEST', success=True)
+    
+    deadline = time.time() + 2
+    while _count(tracker) < 1 and time.time() < deadline:
+        time.sleep(0.01)
+    assert _count(tracker) == 1
+
+
+def test_buffer_overflow_is_bounded(make_tracker):
+    """버퍼가 가득 차면 오래된 이벤트부터 버리고 집계"""
+    tracker = make_tracker(write_behind=True, flush_interval_ms=60000,
+                           flush_batch=1000, buffer_size=3)
+    for i in range(5):
+        tracker.record(kind='exec', verb='TEST', task_id=f'T{i}')
+    
+    assert tracker.dropped == 2
+    tracker.flush()
+    with tracker._lock:
+        kept = [r[0] for r in tracker.db.execute("SELECT task_id FROM kpi_events ORDER BY id")]
+    assert kept == ['T2', 'T3', 'T4']
+
+
+def test_close_flushes_and_switches_to_direct(make_tracker):
+    """종료 시 남은 이벤트 기록 후 직접 기록 모드로 전환"""
+    tracker = make_tracker(write_behind=True, flush_interval_ms=60000, flush_batch=1000)
+    tracker.record(kind='exec', verb='TEST', success=True)
+    tracker.close()
+    
+    assert _count(tracker) == 1
+    tracker.record(kind='exec', verb='TEST', success=True)
+    assert _count(tracker) == 2
+
+
+def test_rollup_sees_buffered_events(make_tracker):
+    """집계 전에 버퍼를 비워 최신 이벤트 반영"""
+    tracker = make_tracker(write_behind=True, flush_interval_ms=60000, flush_batch=1000)
+    tracker.record(kind='handshake', phase='eot', success=True)
+    tracker.record(kind='handshake', phase='eot', success=False)
+    
+    metrics = tracker.rollup_today()
+    assert metrics["handshake_success_rate"] == 50.0
+
+
+def test_wal_journal_mode(make_tracker):
+    """WAL 저널 모드 사용"""
+    tracker = make_tracker(write_behind=False)
+    mode = tracker.db.execute("PRAGMA journal_mode").fetchone()[0]
+    assert mode == "wal"
+
+
+def _insert(tracker, ts, **fields):
+    row = dict(kind='exec', phase=None, verb=None, success=None, duration_ms=None,
+               error_type=None, ai_agent=None, task_id=None)
+    row.update(fields)
+    with tracker._lock:
+        tracker.db.execute(
+            """INSERT INTO kpi_events (ts, kind, phase, verb, success, duration_ms,
+                                       error_type, ai_agent, task_id)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+            (ts, row['kind'], row['phase'], row['verb'], row['success'],
+             row['duration_ms'], row['error_type'], row['ai_agent'], row['task_id'])
+        )
+        tracker.db.commit()
+
+
+def test_rollup_is_incremental(make_tracker):
+    """두 번째 집계는 새 이벤트만 누적"""
+    tracker = make_tracker(write_behind=False)
+    now = int(time.time())
+    _insert(tracker, now, verb='TEST', success=1, duration_ms=100)
+    _insert(tracker, now, verb='TEST', success=0, duration_ms=300)
+    
+    metrics = tracker.rollup_today()
+    assert metrics["exec_TEST_success_rate"] == 50.0
+    assert metrics["exec_TEST_avg_ms"] == 200
+    
+    _insert(tracker, now, verb='TEST', success=1, duration_ms=200)
+    with tracker._lock:
+        assert tracker._fold_new_events() == 1
+        assert tracker._fold_new_events() == 0
+    
+    metrics = tracker.rollup_today()
+    assert metrics["exec_TEST_success_rate"] == pytest.approx(200 / 3)
+    assert tracker.get_today_metrics()["exec_TEST_avg_ms"] == 200
+
+
+def test_concurrent_folds_count_events_once(make_tracker):
+    """다른 프로세스의 집계가 끼어들어도 같은 범위를 두 번 누적하지 않음"""
+    import threading
+    tracker = make_tracker(write_behind=False)
+    other = object.__new__(KPITracker)  # 같은 DB를 쓰는 다른 프로세스 역할
+    KPITracker.__init__(other, tracker.db.execute("PRAGMA database_list").fetchone()[2],
+                        write_behind=False)
+    now = int(time.time())
+    for _ in range(10):
+        _insert(tracker, now, verb='TEST', success=1)
+    
+    def fold_other():
+        other._fold_new_events()
+        other.db.commit()
+    
+    racer = threading.Thread(target=fold_other)
+    get_state = tracker._get_state
+    
+    def interleaved(key, default=0):
+        # high-water mark를 읽은 직후 다른 프로세스가 집계 시도
+        value = get_state(key, default)
+        if not racer.is_alive() and racer.ident is None:
+            racer.start()
+            racer.join(timeout=0.3)
+        return value
+    
+    tracker._get_state = interleaved
+    with tracker._lock:
+        tracker._fold_new_events()
+    racer.join(timeout=5)
+    other.close()
+    
+    with tracker._lock:
+        total = tracker.db.execute(
+            "SELECT SUM(total) FROM kpi_agg WHERE res='day'"
+        ).fetchone()[0]
+    assert total == 10
+
+
+def test_rollup_ignores_previous_days(make_tracker):
+    """어제 이벤트는 오늘 집계에 포함되지 않음"""
+    tracker = make_tracker(write_behind=False)
+    now = int(time.time())
+    _insert(tracker, now - 2 * 86400, kind='handshake', phase='eot', success=0)
+    _insert(tracker, now, kind='handshake', phase='eot', success=1)
+    _insert(tracker, now, kind='error', error_type='auto_recovered', success=0)
+    _insert(tracker, now, kind='error', error_type='ack_timeout', success=0)
+    
+    metrics = tracker.rollup_today()
+    assert metrics["handshake_success_rate"] == 100.0
+    assert metrics["error_recovery_rate"] == 50.0
+
+
+def test_minute_buckets_are_maintained(make_tracker):
+    """분 단위 버킷도 함께 누적"""
+    tracker = make_tracker(write_behind=False)
+    _insert(tracker, 120, kind='handshake', phase='ack', success=1)
+    _insert(tracker, 150, kind='handshake', phase='ack', success=1)
+    _insert(tracker, 185, kind='handshake', phase='ack', success=0)
+    tracker.rollup_today()
+    
+    with tracker._lock:
+        rows = tracker.db.execute(
+            "SELECT bucket, total, ok FROM kpi_agg WHERE res='minute' ORDER BY bucket"
+        ).fetchall()
+    assert rows == [(120, 2, 2), (180, 1, 0)]
+
+
+def test_latency_percentiles_per_dimension(make_tracker):
+    """단계/동사/에이전트별 p50/p95/p99"""
+    tracker = make_tracker(write_behind=False)
+    now = int(time.time())
+    for ms in range(1, 101):
+        _insert(tracker, now, kind='handshake', phase='ack', verb='TEST',
+                ai_agent='gemini', success=1, duration_ms=ms * 10)
+    _insert(tracker, now, kind='handshake', phase='ack', verb='TEST',
+            ai_agent='claude', success=1, duration_ms=5000)
+    
+    stats = tracker.get_latency_percentiles(phase='ack', verb='TEST', ai_agent='gemini')
+    assert stats["count"] == 100
+    assert stats["p50"] == pytest.approx(500, rel=0.06)
+    assert stats["p99"] == pytest.approx(990, rel=0.06)
+    
+    by_agent = tracker.get_latency_breakdown(group_by=("ai_agent",), phase='ack')
+    assert by_agent[("claude",)]["p50"] == pytest.approx(5000, rel=0.06)
+    assert tracker.get_latency_percentiles(phase='run') == {"count": 0}
+
+
+def test_latency_histograms_fold_incrementally(make_tracker):
+    """히스토그램도 새 이벤트만 누적"""
+    tracker = make_tracker(write_behind=False)
+    now = int(time.time())
+    _insert(tracker, now, kind='handshake', phase='eot', duration_ms=100)
+    assert tracker.get_latency_percentiles(phase='eot')["count"] == 1
+    _insert(tracker, now, kind='handshake', phase='eot', duration_ms=100)
+    assert tracker.get_latency_percentiles(phase='eot')["count"] == 2
+    assert tracker.get_recent_stats()["latency"]["eot"]["count"] == 2
+    
+    with pytest.raises(ValueError):
+        tracker.get_latency_breakdown(group_by=("task_id",))
+
+
+def test_compact_applies_retention(make_tracker):
+    """보존 기간이 지난 원본/분 버킷만 삭제하고 일 버킷은 유지"""
+    tracker = make_tracker(write_behind=False,
+                           retention_days={"raw": 1, "minute": 1, "hour": 30})
+    now = int(time.time())
+    old = now - 3 * 86400
+    _insert(tracker, old, kind='handshake', phase='eot', success=1, duration_ms=100)
+    _insert(tracker, now, kind='handshake', phase='eot', success=1, duration_ms=100)
+    
+    deleted = tracker.compact(chunk_size=1)
+    assert deleted["raw"] == 1
+    assert deleted["minute"] == 2  # kpi_agg + kpi_hist
+    assert deleted["hour"] == 0
+    assert _count(tracker) == 1
+    
+    with tracker._lock:
+        days = tracker.db.execute(
+            "SELECT bucket FROM kpi_agg WHERE res='day' ORDER BY bucket"
+        ).fetchall()
+    assert days == [(old // 86400 * 86400,), (now // 86400 * 86400,)]
+    assert tracker.get_latency_percentiles(phase='eot')["count"] == 1
+
+
+def test_compact_keeps_unfolded_events(make_tracker):
+    """집계 전 이벤트는 보존 기간이 지나도 먼저 집계 후 삭제"""
+    tracker = make_tracker(write_behind=False, retention_days={"raw": 1})
+    old = int(time.time()) - 3 * 86400
+    _insert(tracker, old, verb='TEST', success=1)
+    tracker.compact()
+    
+    assert _count(tracker) == 0
+    with tracker._lock:
+        assert tracker.db.execute(
+            "SELECT SUM(total) FROM kpi_agg WHERE res='day' AND verb='TEST'"
+        ).fetchone()[0] == 1
+
+
+def test_resolution_follows_range_and_retention(make_tracker):
+    """조회 범위에 맞는 해상도 선택"""
+    tracker = make_tracker(write_behind=False,
+                           retention_days={"minute": 2, "hour": 90})
+    now = int(time.time())
+    assert tracker._resolution_for(now - 3600, now) == ("minute", 60)
+    assert tracker._resolution_for(now - 86400, now) == ("hour", 3600)
+    assert tracker._resolution_for(now - 3 * 86400, now - 3 * 86400 + 60) == ("hour", 3600)
+    assert tracker._resolution_for(now - 365 * 86400, now) == ("day", 86400)
+
+
+def test_legacy_database_is_upgraded(tmp_path, monkeypatch):
+    """auto_vacuum 도입 전 DB도 compact 가능 (증분 모드 전환은 명시적 단계에서만)"""
+    import sqlite3
+    path = tmp_path / "legacy.sqlite"
+    db = sqlite3.connect(path)
+    db.executescript("""
+        CREATE TABLE kpi_agg (
+            res TEXT NOT NULL, bucket INTEGER NOT NULL, kind TEXT NOT NULL,
+            phase TEXT NOT NULL DEFAULT '', verb TEXT NOT NULL DEFAULT '',
+            ai_agent TEXT NOT NULL DEFAULT '', error_type TEXT NOT NULL DEFAULT '',
+            total INTEGER NOT NULL DEFAULT 0, ok INTEGER NOT NULL DEFAULT 0,
+            sum_ms INTEGER NOT NULL DEFAULT 0, cnt_ms INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY(res, bucket, kind, phase, verb, ai_agent, error_type)
+        );
+    """)
+    db.commit()
+    db.close()
+    
+    monkeypatch.setattr(KPITracker, "_instance", None)
+    tracker = KPITracker(str(path), write_behind=False)
+    try:
+        tracker.compact()
+        # compact(flusher)는 전체 VACUUM을 하지 않음
+        assert tracker.db.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+        assert tracker.enable_incremental_vacuum()
+        assert tracker.db.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        assert not tracker.enable_incremental_vacuum()
+        tracker.compact()
+    finally:
+        tracker.close()
@@ -0,0 +1,72 @@
+"""
+Multi-AI 오케스트레이터 수집 테스트 (가짜 AI 실행 파일 사용)
+"""
+
+import sys
+import time
+
+import pytest
+
+FAKE_AI = '''#!{python}
+import sys, time
+delay = float(sys.argv[1])
+time.sleep(delay)
+print("answer after", delay, flush=True)
+'''
+
+
+@pytest.fixture
+def orchestrator(tmp_path, mocker):
+    ai = tmp_path / "fake_ai"
+    ai.write_text(FAKE_AI.format(python=sys.executable))
+    ai.chmod(0o755)
+
+    from multi_ai_orchestrator import MultiAIOrchestrator
+
+    def make(review_quorum=None, delays=(("gemini", 0.1, 5), ("claude", 0.2, 5), ("codex", 30, 1.0))):
+        orchestrator = MultiAIOrchestrator(review_quorum=review_quorum)
+        for name, delay, timeout in delays:
+            orchestrator.ais[name].update(cmd=f"{ai} {delay}", timeout=timeout)
+        orchestrator.posted = []
+        orchestrator.reviewed = []
+        mocker.patch.object(orchestrator, '_get_issue_body', return_value="이슈")
+        mocker.patch.object(orchestrator, '_post_results_to_issue',
+                            side_effect=lambda n, repo, results: orchestrator.posted.append((time.time(), *results)))
+        mocker.patch.object(orchestrator, '_request_final_review',
+                            side_effect=lambda results: orchestrator.reviewed.append((time.time(), sorted(results))) or "리뷰")
+        mocker.patch.object(orchestrator, '_post_review_to_issue')
+        return orchestrator
+    return make
+
+
+def test_hung_agent_times_out_and_results_are_posted_as_they_finish(orchestrator):
+    orchestrator = orchestrator()
+    started = time.time()
+    results, review = orchestrator.process_github_issue(1)
+    assert time.time() - started < 5
+    assert results["codex"]["error"] == "Timed out after 1.0s" and not results["codex"]["success"]
+    assert results["gemini"]["success"] and "answer after" in results["gemini"]["output"]
+    assert [name for _, name in orchestrator.posted] == ["gemini", "claude", "codex"]
+    # 빠른 AI 결과는 멈춘 AI의 마감 전에 게시
+    assert orchestrator.posted[0][0] - started < 0.9
+    assert orchestrator.reviewed[0][1] == ["claude", "codex", "gemini"]
+    assert review == "리뷰"
+
+
+def test_quorum_starts_review_before_slowest_agent(orchestrator):
+    orchestrator = orchestrator(review_quorum=2)
+    started = time.time()
+    orchestrator.process_github_issue(1)
+    reviewed_at, reviewed = orchestrator.reviewed[0]
+    assert reviewed == ["claude", "gemini"]
+    assert reviewed_at - started < 0.9
+
+
+def test_quorum_review_does_not_wait_for_slow_claude_analysis(orchestrator):
+    orchestrator = orchestrator(review_quorum=2, delays=(
+        ("gemini", 0.1, 5), ("codex", 0.2, 5), ("claude", 30, 1.0)))
+    started = time.time()
+    orchestrator.process_github_issue(1)
+    reviewed_at, reviewed = orchestrator.reviewed[0]
+    assert reviewed == ["codex", "gemini"]
+    assert reviewed_at - started < 0.9
@@ -0,0 +1,143 @@
+"""
+오프셋 추적 pane 리더 테스트
+"""
+
+from controllers.pane_reader import PaneReader, SnapshotDiff, parse_position
+
+
+class FakePane:
+    """history + 화면 줄을 흉내 내는 가짜 tmux pane (마지막 줄 = 커서 줄)"""
+
+    def __init__(self, height=5, history_limit=1000):
+        self.height = height
+        self.history_limit = history_limit
+        self.lines = [""]
+        self.calls = []
+
+    def write(self, *lines):
+        # 커서 줄을 완성하고 새 커서 줄에서 대기
+        self.lines[-1:] = list(lines) + [""]
+        overflow = len(self.lines) - self.height - self.history_limit
+        if overflow > 0:
+            del self.lines[:overflow]
+
+    @property
+    def history_size(self):
+        return max(0, len(self.lines) - self.height)
+
+    def tmux(self, *args):
+        self.calls.append(args[0])
+        if args[0] == "display-message":
+            cursor_y = len(self.lines) - 1 - self.history_size
+            return f"{self.history_size} {self.history_limit} {cursor_y}\n"
+        start = int(args[args.index("-S") + 1]) + self.history_size
+        end = int(args[args.index("-E") + 1]) + self.history_size
+        return "\n".join(self.lines[start:end + 1]) + "\n"
+
+    def capture_tail(self, n):
+        self.calls.append("capture-tail")
+        return "\n".join(self.lines[-n:]) + "\n"
+
+
+def test_parse_position():
+    assert parse_position("12 2000 3\n") == (12, 2000, 3)
+    assert parse_position("") is None
+    assert parse_position(object()) is None
+
+
+def test_reads_only_new_complete_lines():
+    """기준선 이후 완성된 줄만, 이미 읽은 스크롤백은 다시 가져오지 않음"""
+    pane = FakePane()
+    pane.write(*[f"old{i}" for i in range(20)])
+    reader = PaneReader("%1", pane.tmux, pane.capture_tail)
+    reader.mark()
+    assert reader.read_new() == []
+
+    pane.write("a", "b")
+    assert reader.read_new() == ["a", "b"]
+    pane.write("c")
+    pane.calls.clear()
+    assert reader.read_new() == ["c"]
+    assert pane.calls == ["display-message", "capture-pane"]
+
+
+def test_repeated_lines_are_not_dropped():
+    """같은 내용의 줄이 다시 출력되어도 새 줄로 반환"""
+    pane = FakePane()
+    reader = PaneReader("%1", pane.tmux, pane.capture_tail)
+    reader.mark()
+    pane.write("@@ACK id=t1", "@@ACK id=t1")
+    assert reader.read_new() == ["@@ACK id=t1", "@@ACK id=t1"]
+    pane.write("@@ACK id=t1")
+    assert reader.read_new() == ["@@ACK id=t1"]
+
+
+def test_unread_lines_are_returned_first():
+    pane = FakePane()
+    reader = PaneReader("%1", pane.tmux, pane.capture_tail)
+    reader.mark()
+    pane.write("a", "b")
+    lines = reader.read_new()
+    reader.unread(lines[1:])
+    assert reader.read_new() == ["b"]
+
+
+def test_falls_back_to_snapshot_diff_at_history_limit():
+    """history_limit에 도달해 위치가 고정되면 스냅샷 차분 사용"""
+    pane = FakePane(height=3, history_limit=2)
+    pane.write("x1", "x2", "x3", "x4", "x5")
+    reader = PaneReader("%1", pane.tmux, pane.capture_tail, window=10)
+    reader.mark()
+    pane.write("new1", "new2")
+    assert reader.read_new() == ["new1", "new2"]
+
+
+def test_unparseable_position_uses_snapshots_without_requery():
+    """위치 조회 불가 시 한 번만 묻고 이후 스냅샷만 사용"""
+    snapshots = iter(["a\n", "a\nb\n", "a\nb\nb\n"])
+    calls = []
+
+    def tmux(*args):
+        calls.append(args[0])
+        return "not a position"
+
+    reader = PaneReader("%1", tmux, lambda n: next(snapshots))
+    reader.mark()
+    assert [reader.read_new() for _ in range(3)] == [["a"], ["b"], ["b"]]
+    assert calls == ["display-message"]
+
+
+def test_snapshot_diff_handles_scroll_and_prompt_edits():
+    diff = SnapshotDiff(window=4)
+    assert diff.feed(["1", "2", "3", "$", "", ""]) == ["1", "2", "3", "$"]
+    # 창이 밀려도 겹치는 부분 뒤만 반환
+    assert diff.feed(["3", "$", "4", "5"]) == ["4", "5"]
+    # 마지막 줄(프롬프트)에 입력이 이어진 경우
+    diff.reset(["$ "])
+    assert diff.feed(["$ echo hi", "hi"]) == ["$ echo hi", "hi"]
+
+
+def test_async_reader_shares_the_same_logic():
+    """AsyncPaneReader는 코루틴 tmux 호출로 같은 증분 읽기 수행"""
+    import asyncio
+    from controllers.pane_reader import AsyncPaneReader
+
+    pane = FakePane()
+    pane.write(*[f"old{i}" for i in range(20)])
+
+    async def tmux(*args):
+        return pane.tmux(*args)
+
+    async def capture_tail(n):
+        return pane.capture_tail(n)
+
+    async def run():
+        reader = AsyncPaneReader("%1", tmux, capture_tail)
+        await reader.mark()
+        pane.write("a", "b")
+        first = await reader.read_new()
+        reader.unread(first[1:])
+        return first, await reader.read_new(), await reader.read_new()
+
+    assert asyncio.run(run()) == (["a", "b"], ["b"], [])
+    assert "capture-tail" not in pane.calls
@@ -0,0 +1,87 @@
+"""
+pipe-pane 스트리밍 리더 테스트
+"""
+
+import os
+import pytest
+from unittest.mock import MagicMock
+from controllers.pane_stream import PaneStream
+from controllers.tmux_controller import TmuxController
+
+
+@pytest.fixture
+def stream(tmp_path, mocker):
+    """pipe-pane 호출만 가짜로 대체한 스트림"""
+    mocker.patch("subprocess.run", return_value=MagicMock(returncode=0))
+    s = PaneStream("%3", path=str(tmp_path / "pane.fifo"))
+    s.attach()
+    yield s
+    s.detach()
+
+
+def _write(stream, data: str):
+    fd = os.open(stream.path, os.O_WRONLY | os.O_NONBLOCK)
+    try:
+        os.write(fd, data.encode())
+    finally:
+        os.close(fd)
+
+
+def test_read_lines_returns_only_complete_lines(stream):
+    """완성된 줄만 반환하고 나머지는 다음 읽기로 이월"""
+    _write(stream, "@@ACK id=t1\r\n@@RUN id=")
+    assert stream.read_lines(timeout=1) == ["@@ACK id=t1"]
+    
+    _write(stream, "t1\n")
+    assert stream.read_lines(timeout=1) == ["@@RUN id=t1"]
+
+
+def test_read_lines_times_out_without_output(stream):
+    """출력이 없으면 빈 목록"""
+    assert stream.read_lines(timeout=0.05) == []
+
+
+def test_unread_lines_are_returned_first(stream):
+    """되돌린 줄이 먼저 반환"""
+    stream.unread(["a", "b"])
+    assert stream.read_lines() == ["a", "b"]
+
+
+def test_detach_removes_fifo(tmp_path, mocker):
+    """해제 시 FIFO 정리"""
+    mocker.patch("subprocess.run", return_value=MagicMock(returncode=0))
+    s = PaneStream("%3", path=str(tmp_path / "pane.fifo"))
+    s.attach()
+    assert os.path.exists(s.path)
+    s.detach()
+    assert not s.attached
+    assert not os.path.exists(s.path)
+
+
+def test_controller_handshake_via_stream(mocker):
+    """스트리밍 모드에서는 capture-pane 폴링 없이 토큰 감지"""
+    mocker.patch("subprocess.run")
+    capture = mocker.patch.object(TmuxController, 'capture_tail', return_value="")
+    
+    ctl = TmuxController("%3", use_pipe=True)
+    fake = MagicMock(attached=True)
+    fake.read_lines.side_effect = [
+        ["noise", "@@ACK id=t1", "@@RUN id=t1", "@@EOT id=t1 status=OK"],
+        ["@@RUN id=t1", "@@EOT id=t1 status=OK"],
+        ["@@EOT id=t1 status=OK"],
+    ]
+    ctl._stream = fake
+    
+    result = ctl.execute_with_handshake("echo hi", task_id="t1",
+                                        timeout_ack=1, timeout_run=1, timeout_eot=1)
+    assert result.success
+    assert result.status == "OK"
+    capture.assert_not_called()
+
+
+def test_controller_falls_back_when_pipe_fails(mocker):
+    """pipe-pane 연결 실패 시 폴링 모드로 폴백"""
+    mocker.patch.object(PaneStream, 'attach', side_effect=RuntimeError("no tmux"))
+    ctl = TmuxController("%3", use_pipe=True)
+    assert ctl.attach_stream() is False
+    assert ctl._stream is None
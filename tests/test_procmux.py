@@ -0,0 +1,81 @@
+"""
+프로세스 멀티플렉서 테스트
+"""
+
+import sys
+import threading
+import time
+
+import pytest
+
+from core.procmux import AgentSlots, ProcessMultiplexer
+
+
+@pytest.fixture
+def mux():
+    mux = ProcessMultiplexer()
+    yield mux
+    mux.close()
+
+
+def py(code):
+    return [sys.executable, "-c", code]
+
+
+def test_results_complete_in_finish_order_and_hung_process_is_killed(mux):
+    started = time.time()
+    hung = mux.submit(py("import sys, time; print('partial', flush=True); time.sleep(30)"), timeout=0.5)
+    slow = mux.submit(py("import time; time.sleep(0.2); print('slow')"))
+    fast = mux.submit(py("import sys; print('fast'); print('warn', file=sys.stderr)"))
+
+    result = fast.result(timeout=5)
+    assert result.ok and result.stdout == "fast\n" and result.stderr == "warn\n"
+    assert not slow.done()
+    assert slow.result(timeout=5).stdout == "slow\n"
+
+    result = hung.result(timeout=5)
+    assert result.timed_out and not result.ok
+    assert result.stdout == "partial\n"
+    assert time.time() - started < 3
+
+
+def test_large_output_on_both_pipes_does_not_deadlock(mux):
+    code = "import sys; sys.stdout.write('o' * 200000); sys.stderr.write('e' * 200000)"
+    result = mux.run(py(code), timeout=10)
+    assert result.returncode == 0
+    assert len(result.stdout) == len(result.stderr) == 200000
+
+
+def test_lingering_process_does_not_stall_other_jobs(mux):
+    # 파이프를 닫고도 계속 실행되는 프로세스의 종료를 기다리는 동안 다른 결과는 바로 완료
+    lingering = mux.submit(py("import os, time; os.close(1); os.close(2); time.sleep(0.6)"))
+    time.sleep(0.2)
+    started = time.time()
+    fast = mux.submit(py("print('fast')"))
+    assert fast.result(timeout=5).stdout == "fast\n"
+    assert time.time() - started < 0.3
+    assert lingering.result(timeout=5).returncode == 0
+
+
+def test_agent_slots_cap_per_binary():
+    slots = AgentSlots(default_limit=2, limits={"claude": 1})
+    events = []
+
+    def run(binary, name):
+        with slots.slot(binary):
+            events.append(("start", name))
+            time.sleep(0.1)
+            events.append(("end", name))
+
+    threads = [threading.Thread(target=run, args=(binary, name)) for binary, name in
+               (("/usr/bin/claude", "c1"), ("claude", "c2"), ("gemini", "g1"), ("gemini", "g2"))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    claude = [event for event in events if event[1].startswith("c")]
+    # 같은 실행 파일은 하나씩, gemini 둘은 동시에
+    assert [kind for kind, _ in claude] == ["start", "end", "start", "end"]
+    gemini = [kind for kind, name in events if name.startswith("g")]
+    assert gemini[:2] == ["start", "start"]
+    assert slots.active("claude") == 0
@@ -1,7 +1,8 @@
 import pytest
 from core.protocol import (
     format_ack, format_run, format_eot,
-    parse_ack, parse_run, parse_eot
+    parse_ack, parse_run, parse_eot,
+    match_token, scan, parse_meta, Ack, Run, Eot
 )
 
 
@@ -32,4 +33,35 @@ def test_parse_invalid_tokens():
     assert parse_ack("@@RUN id=test") is None
     assert parse_run("@@ACK id=test") is None
     assert parse_eot("invalid") is None
-    assert parse_ack("") is None
\ No newline at end of file
+    assert parse_ack("") is None
+
+def test_match_token_types():
+    """통합 매처는 토큰 종류별 객체 반환"""
+    assert match_token("@@ACK id=t1") == Ack("t1")
+    assert match_token("  @@RUN id=t1 ts=5 ") == Run("t1", "5")
+    assert match_token("@@EOT id=t1 status=FAIL dur_ms=3") == Eot("t1", "FAIL")
+    assert match_token("plain output") is None
+    assert match_token("echo @@ACK id=t1") is None
+    assert match_token("@@EOT id=t1 status=MAYBE") is None
+
+
+def test_match_token_strips_ansi_only_when_needed():
+    assert match_token("\x1b[33m@@ACK id=t1\x1b[0m") == Ack("t1")
+    assert match_token("@\x1b[0m@RUN id=t1") == Run("t1")
+
+
+def test_scan_whole_buffer():
+    """버퍼 전체에서 순서대로 추출 (EOT 메타는 다음 줄로 넘어가지 않음)"""
+    buffer = "noise\n@@ACK id=a\n\x1b[32m@@RUN id=a\x1b[0m\nmore\n@@EOT id=a status=OK x=1\n@@ACK id=b\n"
+    assert list(scan(buffer)) == [Ack("a"), Run("a"), Eot("a", "OK"), Ack("b")]
+    assert list(scan("no tokens here")) == []
+
+
+def test_eot_meta_is_typed_and_from_same_match():
+    """EOT 메타데이터는 같은 매칭에서 나오고 숫자는 변환됨"""
+    e = parse_eot(format_eot("t1", result=42, duration=1.5, artifact="out/a.txt"))
+    assert e.meta == {"result": 42, "duration": 1.5, "artifact": "out/a.txt"}
+    assert parse_eot("@@EOT id=t1 status=OK").meta == {}
+    assert parse_meta('note="two words" bare') == {"note": "two words"}
+    eots = [t for t in scan("@@EOT id=a status=OK result=-3\n@@EOT id=b status=FAIL error=boom\n")]
+    assert [e.meta for e in eots] == [{"result": -3}, {"error": "boom"}]
@@ -0,0 +1,71 @@
+"""
+릴레이 파이프라인 스트리밍 단계 테스트 (가짜 AI 실행 파일 사용)
+"""
+
+import sys
+import time
+from datetime import datetime
+
+import pytest
+
+FAKE_AI = '''#!{python}
+import os, sys, time
+prompt = sys.argv[2]
+def out(text, delay=0):
+    print(text, flush=True)
+    time.sleep(delay)
+if "[STAGE 1" in prompt:
+    out("## 코드\\nA = 1")
+    out("## 다음 단계 전달 사항\\n- A 확인")
+    out("## 상태", 1.0)
+    if os.environ.get("FAKE_AI_FAIL") != "1":
+        out("코드 생성 완료")
+elif "[STAGE 2" in prompt:
+    if os.environ.get("FAKE_AI_FAIL") == "1":
+        time.sleep(30)
+    out("테스트 통과")
+else:
+    out("리뷰 완료 APPROVED")
+'''
+
+
+@pytest.fixture
+def pipeline(tmp_path, monkeypatch, mocker):
+    monkeypatch.chdir(tmp_path)
+    ai = tmp_path / "fake_ai"
+    ai.write_text(FAKE_AI.format(python=sys.executable))
+    ai.chmod(0o755)
+
+    from relay_pipeline_system import RelayPipeline
+    pipeline = RelayPipeline()
+    for stage in pipeline.stages:
+        stage["ai"] = str(ai)
+    # 모든 단계가 같은 가짜 AI를 쓰므로 에이전트 동시 실행 제한을 늘림
+    pipeline.agent_limits = {str(ai): 3}
+    mocker.patch.object(pipeline, '_get_issue_content', return_value="요구사항")
+    mocker.patch.object(pipeline, '_update_issue_progress')
+    mocker.patch.object(pipeline, '_post_final_result')
+    mocker.patch.object(pipeline, '_save_pipeline_run')
+    return pipeline
+
+
+def test_next_stage_starts_after_handoff_section(pipeline):
+    """전달 사항 섹션이 끝나면 구현 단계 종료 전에 테스트 단계 시작, 리뷰는 구현 완료 후 테스트와 병렬"""
+    run = pipeline.process_issue(1)
+    assert run["final_status"] == "COMPLETED"
+    implement, testing, review = run["stages"]
+    assert testing["started_at"] < implement["completed_at"] <= review["started_at"]
+    assert implement["handoff_seconds"] < implement["duration_seconds"]
+    # 다음 단계 입력은 전달 사항까지의 부분 출력
+    assert 0 < testing["input_length"] < len(implement["output"])
+    assert all(stage["time_to_first_feedback"] < 1.0 for stage in run["stages"])
+
+
+def test_failed_stage_cancels_started_downstream(pipeline, monkeypatch):
+    monkeypatch.setenv("FAKE_AI_FAIL", "1")
+    started = time.time()
+    run = pipeline.process_issue(1)
+    assert run["final_status"] == "FAILED"
+    # 먼저 시작한 테스트는 취소되고 리뷰는 실행되지 않음
+    assert [(stage["role"], stage["success"]) for stage in run["stages"]] == [("구현", False), ("테스트 & 검증", False)]
+    assert time.time() - started < 10
@@ -0,0 +1,190 @@
+"""
+멀티 pane 핸드셰이크 스케줄러 테스트
+"""
+
+import threading
+import time
+import pytest
+from controllers.scheduler import HandshakeScheduler, registry_adapter_factory
+from core.types import HandshakeResult
+
+
+class RecordingAdapter:
+    """실행 순서와 pane별 동시 실행 수를 기록하는 가짜 어댑터"""
+    
+    def __init__(self, target, log, delay=0.02):
+        self.target = target
+        self.log = log
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+    
+    def execute_with_handshake(self, exec_line, task_id):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        self.log.append((self.target, task_id))
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return HandshakeResult(success=not task_id.startswith("bad"), status="OK", task_id=task_id)
+
+
+@pytest.fixture
+def adapters():
+    log = []
+    created = {}
+    
+    def factory(target):
+        created[target] = RecordingAdapter(target, log)
+        return created[target]
+    return factory, created, log
+
+
+def test_one_in_flight_task_per_pane(adapters):
+    """pane당 동시에 하나의 작업만 실행"""
+    factory, created, _ = adapters
+    scheduler = HandshakeScheduler(adapter_factory=factory, max_concurrency=4)
+    
+    futures = [scheduler.submit(f'TEST task_id=t{i} pane="%{i % 2}"') for i in range(6)]
+    results = [f.result(timeout=5) for f in futures]
+    scheduler.shutdown()
+    
+    assert all(r.success for r in results)
+    assert set(created) == {"%0", "%1"}
+    assert all(a.max_active == 1 for a in created.values())
+
+
+def test_priority_order_within_pane(adapters):
+    """같은 pane 큐에서는 priority 순서로 실행"""
+    factory, _, log = adapters
+    scheduler = HandshakeScheduler(adapter_factory=factory, max_concurrency=1)
+    
+    scheduler.submit("TEST task_id=first target=gemini")
+    scheduler.submit("TEST task_id=low target=gemini priority=low")
+    scheduler.submit("TEST task_id=high target=gemini priority=high")
+    assert scheduler.drain(timeout=5)
+    scheduler.shutdown()
+    
+    assert [task for _, task in log] == ["first", "high", "low"]
+
+
+def test_fifo_policy(adapters):
+    """FIFO 정책은 priority 무시"""
+    factory, _, log = adapters
+    scheduler = HandshakeScheduler(adapter_factory=factory, max_concurrency=1, policy="fifo")
+    
+    scheduler.submit_many([
+        "TEST task_id=a target=gemini",
+        "# comment",
+        "TEST task_id=b target=gemini priority=low",
+        "TEST task_id=c target=gemini priority=high",
+    ])
+    scheduler.shutdown()
+    
+    assert [task for _, task in log] == ["a", "b", "c"]
+
+
+def test_stats_report_depth_and_throughput(adapters):
+    """큐 깊이와 처리량 노출"""
+    factory, _, _ = adapters
+    scheduler = HandshakeScheduler(adapter_factory=factory, max_concurrency=1)
+    
+    for i in range(3):
+        scheduler.submit(f"TEST task_id=t{i} target=gemini")
+    scheduler.submit("TEST task_id=bad1 target=claude")
+    stats = scheduler.stats()
+    assert stats["in_flight"] == 1
+    assert stats["queued"] == 3
+    
+    scheduler.shutdown()
+    stats = scheduler.stats()
+    assert stats["completed"] == 3
+    assert stats["failed"] == 1
+    assert stats["queued"] == 0
+    assert stats["throughput_per_s"] > 0
+
+
+def test_adapter_errors_become_failed_results():
+    """어댑터 생성/실행 예외는 실패 결과로 변환"""
+    def factory(target):
+        raise ValueError(f"Unknown target: {target}")
+    
+    scheduler = HandshakeScheduler(adapter_factory=factory)
+    result = scheduler.submit("TEST task_id=t1 target=nobody").result(timeout=5)
+    scheduler.shutdown()
+    
+    assert not result.success
+    assert result.status == "ERROR"
+    assert "nobody" in result.error
+
+
+def test_missing_target_or_task_id_rejected(adapters):
+    """대상/작업 ID 누락은 제출 시점에 거부"""
+    factory, _, _ = adapters
+    scheduler = HandshakeScheduler(adapter_factory=factory)
+    with pytest.raises(ValueError, match="target"):
+        scheduler.submit("TEST task_id=t1")
+    with pytest.raises(ValueError, match="task_id"):
+        scheduler.submit("TEST target=gemini")
+    scheduler.shutdown()
+
+
+def test_registry_factory_builds_tmux_adapter_for_panes(mocker):
+    """pane 대상은 레지스트리의 tmux 어댑터로 생성"""
+    mocker.patch("adapters.tmux_adapter.TmuxController")
+    adapter = registry_adapter_factory(timeout_eot=60)("%3")
+    
+    assert adapter.pane_id == "%3"
+    assert adapter.config.timeout_eot == 60
+    with pytest.raises(ValueError):
+        registry_adapter_factory()("no-such-role")
+
+
+def test_duplicate_task_ids_are_coalesced(adapters):
+    """대기/실행 중인 task_id를 다시 제출하면 같은 Future 반환"""
+    factory, _, log = adapters
+    scheduler = HandshakeScheduler(adapter_factory=factory)
+    
+    first = scheduler.submit("TEST task_id=dup target=gemini")
+    second = scheduler.submit("TEST task_id=dup target=claude")
+    assert second is first
+    first.result(timeout=5)
+    scheduler.shutdown()
+    
+    assert log == [("gemini", "dup")]
+    assert scheduler.stats()["coalesced"] == 1
+
+
+def test_idempotency_reuses_completed_results(adapters):
+    """idempotency 관리자 지정 시 완료된 작업은 다시 실행하지 않음"""
+    from core.idempotency import IdempotencyManager
+    factory, _, log = adapters
+    scheduler = HandshakeScheduler(adapter_factory=factory, idempotency=IdempotencyManager())
+    
+    first = scheduler.submit("TEST task_id=t1 target=gemini").result(timeout=5)
+    again = scheduler.submit("TEST task_id=t1 target=gemini").result(timeout=5)
+    scheduler.shutdown()
+    
+    assert again is first
+    assert log == [("gemini", "t1")]
+
+
+def test_legacy_cached_string_result_does_not_stall_target(adapters, tmp_path):
+    """저장소에 남은 이전 형식(문자열) 결과도 HandshakeResult로 반환하고 대상을 풀어줌"""
+    from core.idempotency import IdempotencyManager, SQLiteIdempotencyStore
+    factory, _, log = adapters
+    store = SQLiteIdempotencyStore(str(tmp_path / "idem.sqlite"))
+    store.save("t1", "OK:RESULT=2")
+    scheduler = HandshakeScheduler(adapter_factory=factory, idempotency=IdempotencyManager(store))
+    
+    cached = scheduler.submit("TEST task_id=t1 target=gemini").result(timeout=5)
+    after = scheduler.submit("TEST task_id=t2 target=gemini").result(timeout=5)
+    scheduler.shutdown()
+    
+    assert isinstance(cached, HandshakeResult)
+    assert cached.success and cached.status == "OK:RESULT=2"
+    assert after.success
+    assert log == [("gemini", "t2")]
+    assert scheduler.stats()["in_flight"] == 0
@@ -0,0 +1,152 @@
+"""
+tmux 제어 모드 클라이언트 테스트
+"""
+
+import io
+import pytest
+from concurrent.futures import Future
+from unittest.mock import MagicMock
+from controllers.tmux_control import (
+    TmuxControlClient, TmuxControlError,
+    quote_arg, build_command, decode_output
+)
+
+
+def test_quote_arg():
+    """인자 인용 규칙"""
+    assert quote_arg("%3") == "%3"
+    assert quote_arg("session:0.0") == "session:0.0"
+    assert quote_arg("echo hi") == '"echo hi"'
+    assert quote_arg('say "x" $HOME') == '"say \\"x\\" \\$HOME"'
+    assert quote_arg("a\nb") == '"a\\nb"'
+    assert quote_arg("") == '""'
+
+
+def test_build_command_chains():
+    """여러 명령을 한 줄로 연결"""
+    line = build_command(["send-keys", "-t", "%3", "ls -la"], ["send-keys", "-t", "%3", "Enter"])
+    assert line == 'send-keys -t %3 "ls -la" ; send-keys -t %3 Enter'
+    assert "\n" not in build_command(["set-buffer", "a\nb"])
+
+
+def test_decode_output():
+    """%output 8진수 이스케이프 복원"""
+    assert decode_output("hi\\015\\012") == "hi\r\n"
+    assert decode_output("back\\134slash") == "back\\slash"
+
+
+def _client_with_stream(lines):
+    client = TmuxControlClient()
+    proc = MagicMock()
+    proc.stdout = io.BytesIO("".join(l + "\n" for l in lines).encode())
+    client._proc = proc
+    return client
+
+
+def test_read_loop_resolves_blocks_in_order():
+    """응답 블록은 보낸 순서대로 Future에 연결 (attach 초기 블록 무시)"""
+    client = _client_with_stream([
+        "%begin 1 10 0", "%end 1 10 0",
+        "%begin 1 11 1", "%1", "%2", "%end 1 11 1",
+        "%begin 1 12 1", "%end 1 99 1", "still inside", "%error 1 12 1",
+    ])
+    first, second = Future(), Future()
+    client._pending.extend([first, second])
+    
+    client._read_loop()
+    
+    assert first.result(timeout=0) == "%1\n%2"
+    with pytest.raises(TmuxControlError, match="still inside"):
+        second.result(timeout=0)
+
+
+def test_read_loop_dispatches_output_notifications():
+    """%output 알림은 pane 리스너로 전달"""
+    client = _client_with_stream(["%output %3 @@ACK id=t1\\015\\012", "%output %4 other"])
+    received = []
+    client.add_output_listener("%3", received.append)
+    
+    client._read_loop()
+    
+    assert received == ["@@ACK id=t1\r\n"]
+
+
+def test_pending_commands_fail_when_client_exits():
+    """연결 종료 시 대기 중인 명령은 실패"""
+    client = _client_with_stream(["%exit"])
+    pending = Future()
+    client._pending.append(pending)
+    
+    client._read_loop()
+    
+    with pytest.raises(TmuxControlError):
+        pending.result(timeout=0)
+
+
+def test_commands_send_one_line_per_command():
+    """명령마다 한 줄로 보내고 실패한 명령만 None으로 표시"""
+    client = TmuxControlClient()
+    client._proc = MagicMock()
+    client._proc.poll.return_value = None
+    written = []
+    
+    def write(data):
+        written.append(data)
+        first, second = list(client._pending)
+        first.set_exception(TmuxControlError("can't find pane: %9"))
+        client._pending.clear()
+        second.set_result("")
+    
+    client._proc.stdin.write.side_effect = write
+    
+    with pytest.raises(TmuxControlError, match="can't find pane") as exc:
+        client.commands([["send-keys", "-t", "%9", "ls"], ["send-keys", "-t", "%9", "Enter"]])
+    
+    assert written == [b"send-keys -t %9 ls\nsend-keys -t %9 Enter\n"]
+    assert exc.value.results == [None, ""]
+    assert exc.value.written
+
+
+def test_commands_report_unwritten_after_exit():
+    """연결이 이미 끊겨 보내지 못한 명령은 written=False"""
+    client = TmuxControlClient()
+    client._proc = MagicMock()
+    client._proc.poll.return_value = None
+    client._exited = True
+    
+    with pytest.raises(TmuxControlError) as exc:
+        client.commands([["send-keys", "-t", "%3", "ls"]])
+    
+    assert not exc.value.written
+    client._proc.stdin.write.assert_not_called()
+
+
+def test_error_block_does_not_shift_later_replies():
+    """%error 블록 뒤의 응답도 각자의 Future에 연결"""
+    client = _client_with_stream([
+        "%begin 1 20 1", "can't find pane: %9", "%error 1 20 1",
+        "%begin 1 21 1", "can't find pane: %9", "%error 1 21 1",
+        "%begin 1 22 1", "later", "%end 1 22 1",
+    ])
+    text, enter, later = Future(), Future(), Future()
+    client._pending.extend([text, enter, later])
+    
+    client._read_loop()
+    
+    assert text.exception(timeout=0) is not None
+    assert enter.exception(timeout=0) is not None
+    assert later.result(timeout=0) == "later"
+
+
+def test_start_fails_when_attach_fails(mocker):
+    """세션이 없어 attach가 실패하면 start에서 오류"""
+    proc = MagicMock()
+    proc.stdout = io.BytesIO(b"")
+    proc.poll.return_value = 1
+    mocker.patch("subprocess.Popen", return_value=proc)
+    client = TmuxControlClient()
+    
+    with pytest.raises(TmuxControlError, match="attach-session failed") as exc:
+        client.start(timeout=1)
+    assert not exc.value.written
+    assert not client.alive
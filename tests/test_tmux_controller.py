@@ -63,4 +63,42 @@ def test_send_keys_error(mocker):
     
     ctl = TmuxController(pane_id="%3")
     with pytest.raises(RuntimeError):
-        ctl.send_keys("test")
\ No newline at end of file
+        ctl.send_keys("test")
+
+def test_control_timeout_does_not_replay_send_keys(mocker):
+    """이미 보낸 send-keys는 응답이 없어도 프로세스 호출로 다시 보내지 않음"""
+    from controllers.tmux_control import TmuxControlError
+    control = MagicMock()
+    control.commands.side_effect = TmuxControlError("tmux command timed out", ["", None])
+    mocker.patch("controllers.tmux_controller.get_control_client", return_value=control)
+    run = mocker.patch("subprocess.run", return_value=MagicMock(returncode=0, stdout=""))
+    
+    ctl = TmuxController(pane_id="%3", use_control=True)
+    with pytest.raises(RuntimeError, match="timed out"):
+        ctl.send_keys("ls")
+    with pytest.raises(RuntimeError):
+        ctl.send_keys('echo "hi"')
+    
+    run.assert_not_called()
+
+
+def test_control_failure_falls_back_to_subprocess(mocker):
+    """보내지 못한 명령과 읽기 전용 명령만 프로세스 호출로 재실행"""
+    from controllers.tmux_control import TmuxControlError
+    control = MagicMock()
+    mocker.patch("controllers.tmux_controller.get_control_client", return_value=control)
+    run = mocker.patch("subprocess.run", return_value=MagicMock(returncode=0, stdout="screen\n"))
+    ctl = TmuxController(pane_id="%3", use_control=True)
+    
+    control.commands.side_effect = TmuxControlError("client exited", [None, None], written=False)
+    ctl.send_keys("ls")
+    assert [c.args[0] for c in run.call_args_list] == [
+        ["tmux", "send-keys", "-t", "%3", "ls"], ["tmux", "send-keys", "-t", "%3", "Enter"]
+    ]
+    
+    run.reset_mock()
+    control.commands.side_effect = TmuxControlError("tmux command timed out", [None])
+    assert ctl.capture_tail(5) == "screen\n"
+    run.assert_called_once_with(
+        ["tmux", "capture-pane", "-t", "%3", "-p", "-S", "-5"], check=True, capture_output=True, text=True
+    )